@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # GeoDjango
+    'django.contrib.postgres',  # Trigram search
     'rest_framework',
     'drf_spectacular',
     'pois',
@@ -32,6 +33,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Chooses the database each request reads from (before anything queries)
+    'pois.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,6 +62,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'geoapi.wsgi.application'
+ASGI_APPLICATION = 'geoapi.asgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -72,9 +76,44 @@ DATABASES = {
         'HOST': os.environ.get('POSTGRES_HOST', 'db'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
         'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', '600')),
+        # Ping persistent connections before reuse so ones dropped by the
+        # server or pooler are replaced instead of failing a request
+        'CONN_HEALTH_CHECKS': os.environ.get('DJANGO_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('POSTGRES_CONNECT_TIMEOUT', '10')),
+        },
     }
 }
 
+# Set when POSTGRES_HOST is a PgBouncer in transaction pooling mode: consecutive
+# transactions may run on different server connections, so psycopg must not
+# prepare statements on them
+DATABASE_TRANSACTION_POOLING = (
+    os.environ.get('DATABASE_TRANSACTION_POOLING', 'False').lower() == 'true'
+)
+if DATABASE_TRANSACTION_POOLING:
+    DATABASES['default']['OPTIONS']['prepare_threshold'] = None
+
+# Read replicas: comma-separated host[:port] list, added as replica1,
+# replica2, ... with the primary's credentials. Safe-method requests read from
+# them (pois.db_router); under tests they mirror the default database
+DATABASE_REPLICAS = [
+    replica.strip() for replica in os.environ.get('DATABASE_REPLICAS', '').split(',')
+    if replica.strip()
+]
+DATABASE_REPLICA_ALIASES = []
+for number, replica in enumerate(DATABASE_REPLICAS, start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICA_ALIASES.append(f'replica{number}')
+DATABASE_ROUTERS = ['pois.db_router.ReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -122,9 +161,28 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# Invalidation relies on counters shared by every process: use Redis in
+# production; the local-memory fallback is only coherent for one process
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Django REST Framework
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': None,  # Disable pagination for POI API
+    # Keyset pagination: each page is an index range scan, never an OFFSET
+    'DEFAULT_PAGINATION_CLASS': 'pois.pagination.CreatedAtKeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('POI_PAGE_SIZE', '100')),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -142,6 +200,133 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# POI API
+# Radius engine: 'geography' (functional GIST on location::geography) or
+# 'projected' (bbox prefilter + local UTM recheck)
+POI_RADIUS_ENGINE = os.environ.get('POI_RADIUS_ENGINE', 'geography')
+
+# Upper bound for the page_size query parameter on paginated endpoints
+POI_MAX_PAGE_SIZE = int(os.environ.get('POI_MAX_PAGE_SIZE', '1000'))
+
+# Rows per keyset page of the streaming export (and per cursor fetch of
+# export_snapshot)
+POI_EXPORT_CHUNK_SIZE = int(os.environ.get('POI_EXPORT_CHUNK_SIZE', '2000'))
+
+# Viewport endpoint: points returned before switching to grid clusters, the
+# zoom from which points are always returned, and cluster grid sizing
+POI_BBOX_MAX_POINTS = int(os.environ.get('POI_BBOX_MAX_POINTS', '500'))
+POI_CLUSTER_MAX_ZOOM = int(os.environ.get('POI_CLUSTER_MAX_ZOOM', '18'))
+POI_CLUSTER_GRID_PER_TILE = int(os.environ.get('POI_CLUSTER_GRID_PER_TILE', '4'))
+POI_CLUSTER_MAX_CELLS_PER_AXIS = int(os.environ.get('POI_CLUSTER_MAX_CELLS_PER_AXIS', '64'))
+
+# Batch radius endpoint: most queries (e.g. route stops) per request
+POI_BATCH_MAX_QUERIES = int(os.environ.get('POI_BATCH_MAX_QUERIES', '200'))
+
+# Text search: share of the rank given to text similarity when a radius is
+# given (the rest is proximity)
+POI_SEARCH_TEXT_WEIGHT = float(os.environ.get('POI_SEARCH_TEXT_WEIGHT', '0.7'))
+
+# Autocomplete: nearest prefix matches ranked per request, the share of the
+# rank given to rating, the distance (km) at which proximity halves, how
+# finely the user's position is snapped (degrees) and the response cache TTL
+POI_AUTOCOMPLETE_POOL = int(os.environ.get('POI_AUTOCOMPLETE_POOL', '100'))
+POI_AUTOCOMPLETE_RATING_WEIGHT = float(os.environ.get('POI_AUTOCOMPLETE_RATING_WEIGHT', '0.3'))
+POI_AUTOCOMPLETE_DISTANCE_SCALE_KM = float(
+    os.environ.get('POI_AUTOCOMPLETE_DISTANCE_SCALE_KM', '5')
+)
+POI_AUTOCOMPLETE_SNAP_DEGREES = float(os.environ.get('POI_AUTOCOMPLETE_SNAP_DEGREES', '0.01'))
+POI_AUTOCOMPLETE_CACHE_TTL = int(os.environ.get('POI_AUTOCOMPLETE_CACHE_TTL', '60'))
+
+# Corridor endpoint: most vertices a route may have
+POI_CORRIDOR_MAX_POINTS = int(os.environ.get('POI_CORRIDOR_MAX_POINTS', '5000'))
+
+# Density aggregate endpoint: most grid cells a region may span
+POI_AGGREGATE_MAX_CELLS = int(os.environ.get('POI_AGGREGATE_MAX_CELLS', '10000'))
+
+# In-process spatial index (needs numpy): regions held in memory, given as
+# name=min_lng,min_lat,max_lng,max_lat separated by ';' (empty disables)
+POI_MEMORY_INDEX_REGIONS = [
+    (name.strip(), tuple(float(value) for value in bbox.split(',')))
+    for name, bbox in (
+        region.split('=', 1)
+        for region in os.environ.get('POI_MEMORY_INDEX_REGIONS', '').split(';')
+        if region.strip()
+    )
+]
+# Grid cell size (degrees), seconds changes are collected before a rebuild,
+# and changed rows past which regions are re-read in full
+POI_MEMORY_INDEX_CELL_DEGREES = float(os.environ.get('POI_MEMORY_INDEX_CELL_DEGREES', '0.01'))
+POI_MEMORY_INDEX_APPLY_INTERVAL = float(os.environ.get('POI_MEMORY_INDEX_APPLY_INTERVAL', '1'))
+POI_MEMORY_INDEX_MAX_DELTA = int(os.environ.get('POI_MEMORY_INDEX_MAX_DELTA', '10000'))
+# Session connection for LISTEN; defaults to the database connection, but
+# must bypass a transaction-pooling PgBouncer
+POI_MEMORY_INDEX_LISTEN_HOST = os.environ.get('POI_MEMORY_INDEX_LISTEN_HOST', '')
+POI_MEMORY_INDEX_LISTEN_PORT = os.environ.get('POI_MEMORY_INDEX_LISTEN_PORT', '')
+
+# Database-free serving: radius, nearest and bbox answered from the snapshot
+# file written by ``manage.py export_snapshot``; other POI endpoints are
+# unavailable. A replaced file is picked up within the check interval (seconds)
+POI_SNAPSHOT_SERVING = os.environ.get('POI_SNAPSHOT_SERVING', 'False').lower() == 'true'
+POI_SNAPSHOT_PATH = os.environ.get('POI_SNAPSHOT_PATH', str(BASE_DIR / 'pois.snapshot'))
+POI_SNAPSHOT_CHECK_INTERVAL = float(os.environ.get('POI_SNAPSHOT_CHECK_INTERVAL', '1'))
+
+# Read replicas (DATABASE_REPLICAS): 'round_robin' or 'least_latency'
+# selection, how far behind (seconds) a replica may replay before reads fall
+# back to the primary, how often lag is checked, and how long a client reads
+# from the primary after a write (0 disables)
+POI_REPLICA_SELECTION = os.environ.get('POI_REPLICA_SELECTION', 'round_robin')
+POI_REPLICA_MAX_LAG_SECONDS = float(os.environ.get('POI_REPLICA_MAX_LAG_SECONDS', '5'))
+POI_REPLICA_CHECK_INTERVAL = float(os.environ.get('POI_REPLICA_CHECK_INTERVAL', '2'))
+POI_READ_YOUR_WRITES_SECONDS = int(os.environ.get('POI_READ_YOUR_WRITES_SECONDS', '5'))
+
+# Response cache TTLs (seconds). Writes evict affected entries immediately, so
+# these only bound memory use, not staleness
+POI_RADIUS_CACHE_TTL = int(os.environ.get('POI_RADIUS_CACHE_TTL', '3600'))
+POI_LIST_CACHE_TTL = int(os.environ.get('POI_LIST_CACHE_TTL', '3600'))
+
+# Finest geohash precision used to key cached radius results (6 ~ 1.2 x 0.6 km)
+POI_CACHE_MAX_PRECISION = int(os.environ.get('POI_CACHE_MAX_PRECISION', '6'))
+
+# Build radius responses from values() rows instead of PointOfInterestSerializer
+# (same JSON output, no model instances)
+POI_RADIUS_FAST_PATH = os.environ.get('POI_RADIUS_FAST_PATH', 'False').lower() == 'true'
+
+# Radius query normalisation (off by default): centres snap to this grid
+# (degrees; 0 disables) and radii round up to a bucket, so nearby queries share
+# one cached superset of at most POI_RADIUS_SUPERSET_MAX_ROWS rows
+POI_RADIUS_SNAP_DEGREES = float(os.environ.get('POI_RADIUS_SNAP_DEGREES', '0'))
+POI_RADIUS_BUCKETS_KM = [
+    float(bucket) for bucket in
+    os.environ.get('POI_RADIUS_BUCKETS_KM', '1,2,5,10,20,50,100').split(',')
+]
+POI_RADIUS_SUPERSET_MAX_ROWS = int(os.environ.get('POI_RADIUS_SUPERSET_MAX_ROWS', '5000'))
+
+# Vector tiles: deepest zoom served (and invalidated on writes) and how long
+# encoded tiles stay cached (seconds)
+POI_TILE_MAX_ZOOM = int(os.environ.get('POI_TILE_MAX_ZOOM', '20'))
+POI_TILE_CACHE_TTL = int(os.environ.get('POI_TILE_CACHE_TTL', '3600'))
+
+# psycopg 3 connection pool behind the async radius/nearest endpoints (per
+# process and event loop)
+POI_ASYNC_POOL_MIN_SIZE = int(os.environ.get('POI_ASYNC_POOL_MIN_SIZE', '2'))
+POI_ASYNC_POOL_MAX_SIZE = int(os.environ.get('POI_ASYNC_POOL_MAX_SIZE', '20'))
+# Seconds a request waits for a free pooled connection before failing, and
+# how long connections live (in total / idle) before they are recycled
+POI_ASYNC_POOL_TIMEOUT = float(os.environ.get('POI_ASYNC_POOL_TIMEOUT', '10'))
+POI_ASYNC_POOL_MAX_LIFETIME = float(os.environ.get('POI_ASYNC_POOL_MAX_LIFETIME', '3600'))
+POI_ASYNC_POOL_MAX_IDLE = float(os.environ.get('POI_ASYNC_POOL_MAX_IDLE', '600'))
+
+# Bulk upsert endpoint limits and idempotency-key retention (seconds)
+POI_BULK_MAX_ITEMS = int(os.environ.get('POI_BULK_MAX_ITEMS', '5000'))
+POI_IDEMPOTENCY_TTL = int(os.environ.get('POI_IDEMPOTENCY_TTL', '86400'))
+
+# Health probes: seconds between background system metric samples and how
+# long a database/PostGIS check result is reused
+POI_HEALTH_SAMPLE_INTERVAL = float(os.environ.get('POI_HEALTH_SAMPLE_INTERVAL', '5'))
+POI_HEALTH_DB_TTL = float(os.environ.get('POI_HEALTH_DB_TTL', '2'))
+# Readiness poi_count: 'estimate' (pg_class statistics, constant time) or 'none'
+POI_READY_COUNT = os.environ.get('POI_READY_COUNT', 'estimate')
+
 # Performance optimizations
 if os.environ.get('DJANGO_OPTIMIZE_QUERIES', 'True').lower() == 'true':
     # Enable query optimization
@@ -0,0 +1,64 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c gunicorn.conf.py geoapi.wsgi:application
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn -c gunicorn.conf.py geoapi.asgi:application
+
+Workers are sized from the CPU count unless ``WEB_CONCURRENCY`` is set. Each
+worker holds its own database connections (one per thread under gthread,
+the async pool plus the sync thread under uvicorn), so the total is logged
+at startup and checked against ``DATABASE_MAX_CONNECTIONS``: the connection
+budget of the server or pooler in front of it.
+"""
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+async_workers = 'uvicorn' in worker_class.lower()
+
+# Event loop workers do not block on I/O, so one per core is enough; empty
+# values (as passed through by compose) fall back to the defaults
+workers = int(
+    os.environ.get('WEB_CONCURRENCY') or (cpu_count if async_workers else cpu_count * 2 + 1)
+)
+threads = int(os.environ.get('GUNICORN_THREADS') or (1 if async_workers else 4))
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers periodically (jittered so they do not restart together)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def connections_per_worker():
+    """Database connections one worker can hold open at once."""
+    if async_workers:
+        # Async pool, plus the thread Django runs sync views on
+        return int(os.environ.get('POI_ASYNC_POOL_MAX_SIZE', '20')) + 1
+    return threads
+
+
+def when_ready(server):
+    per_worker = connections_per_worker()
+    total = workers * per_worker
+    server.log.info(
+        'Serving with %d %s workers x %d threads: up to %d database connections '
+        '(%d per worker)', workers, worker_class, threads, total, per_worker
+    )
+    budget = int(os.environ.get('DATABASE_MAX_CONNECTIONS', '0'))
+    if budget and total > budget:
+        server.log.warning(
+            'Workers may open %d database connections but DATABASE_MAX_CONNECTIONS '
+            'is %d; lower WEB_CONCURRENCY, GUNICORN_THREADS or POI_ASYNC_POOL_MAX_SIZE',
+            total, budget
+        )
@@ -12,6 +12,7 @@ class PointOfInterestAdmin(admin.ModelAdmin):
     """
     list_display = ('name', 'category', 'rating', 'created_at', 'coordinates_display')
     list_filter = ('category', 'rating', 'created_at')
+    # ILIKE '%q%' on these is served by the pois_text_trgm_idx trigram index
     search_fields = ('name', 'description', 'address')
     readonly_fields = ('created_at', 'updated_at')
     
@@ -7,4 +7,8 @@ from django.apps import AppConfig
 class PoisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pois'
-    verbose_name = 'Points of Interest' 
\ No newline at end of file
+    verbose_name = 'Points of Interest'
+    
+    def ready(self):
+        # Connect cache invalidation signal handlers
+        from . import invalidation  # noqa: F401 
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Async PostgreSQL access for the async POI views.
+
+Django's async ORM still runs each query in a single sync thread, so
+concurrent requests queue behind one another. These helpers compile an
+ORM queryset to SQL and run it on an ``AsyncConnectionPool`` from psycopg 3
+instead: one event loop keeps many spatial queries in flight, bounded by
+``POI_ASYNC_POOL_MAX_SIZE`` connections. Requests wait at most
+``POI_ASYNC_POOL_TIMEOUT`` seconds for a connection, and connections are
+checked before use and recycled after ``POI_ASYNC_POOL_MAX_LIFETIME``.
+"""
+import asyncio
+
+from django.conf import settings
+from django.db import connections
+
+try:
+    from psycopg import AsyncClientCursor
+    from psycopg.conninfo import make_conninfo
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # pragma: no cover - only needed under ASGI
+    AsyncConnectionPool = None
+
+# One pool per event loop; a pool cannot be shared across loops
+_pools = {}
+
+
+def _conninfo():
+    # Read from the connection so the test database is used under tests
+    db = connections['default'].settings_dict
+    return make_conninfo(**{
+        key: value for key, value in (
+            ('dbname', db['NAME']),
+            ('user', db['USER']),
+            ('password', db['PASSWORD']),
+            ('host', db['HOST']),
+            ('port', db['PORT']),
+        ) if value
+    })
+
+
+async def get_pool():
+    """Open (once per event loop) and return the async connection pool."""
+    if AsyncConnectionPool is None:
+        raise RuntimeError('Async views require psycopg[pool] to be installed')
+
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        kwargs = {
+            # Client-side binding, as Django does, so compiled SQL runs unchanged
+            'autocommit': True,
+            'cursor_factory': AsyncClientCursor,
+            **{
+                key: value
+                for key, value in connections['default'].settings_dict['OPTIONS'].items()
+                if key in ('connect_timeout', 'prepare_threshold')
+            },
+        }
+        pool = AsyncConnectionPool(
+            _conninfo(),
+            min_size=settings.POI_ASYNC_POOL_MIN_SIZE,
+            max_size=settings.POI_ASYNC_POOL_MAX_SIZE,
+            kwargs=kwargs,
+            timeout=settings.POI_ASYNC_POOL_TIMEOUT,
+            max_lifetime=settings.POI_ASYNC_POOL_MAX_LIFETIME,
+            max_idle=settings.POI_ASYNC_POOL_MAX_IDLE,
+            # Health-check connections as they are handed out
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        _pools[loop] = pool
+        await pool.open()
+    return pool
+
+
+async def fetch_dicts(queryset):
+    """Evaluate a ``values()`` queryset on the async pool; returns a list of dicts."""
+    sql, params = queryset.query.sql_with_params()
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+
+async def close_pools():
+    """Close the pool of the running event loop (e.g. on ASGI shutdown)."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
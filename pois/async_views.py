@@ -0,0 +1,125 @@
+"""
+Async radius and nearest endpoints for ASGI deployments.
+
+Same parameters and response bodies as the ``radius_search`` and ``nearest``
+actions of ``PointOfInterestViewSet``. Queries are built with the same ORM
+helpers, compiled to SQL and awaited on the psycopg 3 pool, so one process
+overlaps many PostGIS round trips instead of parking a thread on each.
+Responses are not cached: these endpoints always hit the database.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from .async_db import fetch_dicts
+from .models import PointOfInterest
+from .pagination import DistanceKeysetPagination
+from .renderers import FastJSONRenderer
+from .serializers import (
+    NearestQuerySerializer,
+    RadiusQuerySerializer,
+    fast_point_representation,
+    fast_point_rows,
+    requested_fields,
+)
+from .spatial import nearest_queryset, radius_queryset
+
+
+def _json_response(data, status=200):
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type='application/json'
+    )
+
+
+def _filtered(queryset, data):
+    if data.get('category'):
+        queryset = queryset.filter(category=data['category'])
+    if data.get('min_rating') is not None:
+        queryset = queryset.filter(rating__gte=data['min_rating'])
+    return queryset
+
+
+@require_GET
+async def radius_search(request):
+    """
+    Async radius search; see ``PointOfInterestViewSet.radius_search``.
+
+    Performance optimizations:
+    - Query awaited on the async pool; the event loop serves other requests
+    - values() rows encoded without model instances or serializers
+    """
+    # DRF request for query_params, used by the validators and paginator
+    request = Request(request)
+    serializer = RadiusQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return _json_response(serializer.errors, status=400)
+    data = serializer.validated_data
+    try:
+        fields = requested_fields(request.query_params)
+    except serializers.ValidationError as exc:
+        return _json_response(exc.detail, status=400)
+
+    engine = data.get('engine') or settings.POI_RADIUS_ENGINE
+    queryset = _filtered(radius_queryset(
+        PointOfInterest.objects.all(), data['lng'], data['lat'], data['radius_km'],
+        engine=engine
+    ), data)
+
+    paginator = DistanceKeysetPagination()
+    try:
+        page = paginator.page_queryset(fast_point_rows(queryset, fields), request)
+    except APIException as exc:
+        # Bad cursors raise NotFound; render it as DRF's exception handler would
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return _json_response(detail, status=exc.status_code)
+    rows = await fetch_dicts(page)
+    results = [fast_point_representation(row, fields) for row in paginator.paginate_rows(rows)]
+
+    return _json_response({
+        'count': len(results),
+        'next': paginator.get_next_link(),
+        'query': {
+            'center': {'lat': data['lat'], 'lng': data['lng']},
+            'radius_km': data['radius_km'],
+            'category': data.get('category'),
+            'min_rating': data.get('min_rating'),
+            'engine': engine
+        },
+        'results': results
+    })
+
+
+@require_GET
+async def nearest(request):
+    """
+    Async k-nearest search; see ``PointOfInterestViewSet.nearest``.
+    """
+    request = Request(request)
+    serializer = NearestQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return _json_response(serializer.errors, status=400)
+    data = serializer.validated_data
+    try:
+        fields = requested_fields(request.query_params)
+    except serializers.ValidationError as exc:
+        return _json_response(exc.detail, status=400)
+
+    queryset = nearest_queryset(
+        _filtered(PointOfInterest.objects.all(), data), data['lng'], data['lat'], data['k']
+    )
+    rows = await fetch_dicts(fast_point_rows(queryset, fields))
+    results = [fast_point_representation(row, fields) for row in rows]
+
+    return _json_response({
+        'count': len(results),
+        'query': {
+            'center': {'lat': data['lat'], 'lng': data['lng']},
+            'k': data['k'],
+            'category': data.get('category'),
+            'min_rating': data.get('min_rating')
+        },
+        'results': results
+    })
@@ -0,0 +1,258 @@
+"""
+Write-aware response caching for POI queries.
+
+Cached responses are versioned by generation counters instead of expiring on
+a short TTL:
+
+- Radius results are keyed by the geohash cell containing the query centre,
+  at the finest precision whose cells are at least as large as the query
+  circle. Any POI inside the circle therefore lies in that cell or one of its
+  8 neighbours.
+- A write at a point bumps the generation of its cell and the 8 neighbours at
+  every precision, so exactly the cached radius queries that could contain
+  the point stop matching their key; everything else stays warm.
+- List pages depend on every row and share one generation.
+- A global epoch, bumped by bulk loads that bypass model signals, is part of
+  every key.
+
+A bump moves a generation to a fresh random value rather than incrementing
+it: generations only have to change and never repeat, so all the keys of a
+write (or of a batch of writes) are replaced with one ``set_many``.
+
+Generations are read before the query runs, so a response computed while a
+write commits is stored under the old generation and never served.
+
+Radius queries can also be normalised: the centre is snapped to a grid and
+the radius rounded up to a bucket large enough to contain the exact circle.
+The superset for the snapped query is cached once and every exact query
+nearby is answered from it in process. Hit/miss counters size the trade-off
+between hit rate and superset payload.
+"""
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .spatial import bounding_box, haversine_m
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+EPOCH_KEY = 'poi_cache_epoch'
+LIST_GENERATION_KEY = 'poi_list_gen'
+
+# Superset radius is padded for sphere vs spheroid distance differences
+SUPERSET_RADIUS_MARGIN = 1.01
+
+SUPERSET_STATS_KEYS = {
+    'hits': 'poi_superset_hits',
+    'misses': 'poi_superset_misses',
+    'bypassed': 'poi_superset_bypassed',
+    'candidate_rows': 'poi_superset_candidate_rows',
+    'matched_rows': 'poi_superset_matched_rows',
+}
+
+
+def get_generations(*keys):
+    """Current generation of each key (0 when unset), in one cache round trip."""
+    found = cache.get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def increment(key, delta=1):
+    """Increment a persistent counter, creating it if needed."""
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, delta, None)
+
+
+def bump_generations(keys):
+    """Move generation counters to a new value, in one cache round trip."""
+    keys = list(keys)
+    if keys:
+        # Generations never expire so a key is never reused for stale data;
+        # concurrent bumps cannot cancel out, each leaves an unseen value
+        cache.set_many(dict.fromkeys(keys, secrets.token_hex(8)), None)
+
+
+def bump_generation(key):
+    """Move one generation counter to a new value."""
+    bump_generations([key])
+
+
+def cell_degrees(precision):
+    """(width, height) in degrees of a geohash cell at ``precision``."""
+    bits = 5 * precision
+    return 360.0 / 2 ** ((bits + 1) // 2), 180.0 / 2 ** (bits // 2)
+
+
+def cell_index(lng, lat, precision):
+    """Integer (column, row) of the geohash cell containing (lng, lat)."""
+    width, height = cell_degrees(precision)
+    columns, rows = round(360.0 / width), round(180.0 / height)
+    column = min(int((lng + 180.0) // width), columns - 1)
+    row = min(int((lat + 90.0) // height), rows - 1)
+    return column, row
+
+
+def geohash(column, row, precision):
+    """Geohash string of a cell: interleaved column/row bits, longitude first."""
+    bits = 5 * precision
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+    value = 0
+    for position in range(bits):
+        if position % 2 == 0:
+            bit = (column >> (lng_bits - 1 - position // 2)) & 1
+        else:
+            bit = (row >> (lat_bits - 1 - position // 2)) & 1
+        value = (value << 1) | bit
+    return ''.join(
+        GEOHASH_ALPHABET[(value >> (5 * (precision - 1 - i))) & 31]
+        for i in range(precision)
+    )
+
+
+def neighbour_cells(lng, lat, precision):
+    """Geohashes of the cell containing (lng, lat) and its 8 neighbours."""
+    width, height = cell_degrees(precision)
+    columns, rows = round(360.0 / width), round(180.0 / height)
+    column, row = cell_index(lng, lat, precision)
+    cells = set()
+    for dcolumn in (-1, 0, 1):
+        for drow in (-1, 0, 1):
+            # Columns wrap at the antimeridian, rows stop at the poles
+            neighbour_row = row + drow
+            if 0 <= neighbour_row < rows:
+                cells.add(geohash((column + dcolumn) % columns, neighbour_row, precision))
+    return cells
+
+
+def radius_precision(lng, lat, radius_km):
+    """
+    Finest geohash precision whose cells span the whole query circle.
+
+    Returns 0 (a single world cell) for circles larger than any cell or
+    crossing the antimeridian.
+    """
+    xmin, ymin, xmax, ymax = bounding_box(lng, lat, radius_km * 1000)
+    half_width, half_height = (xmax - xmin) / 2, (ymax - ymin) / 2
+    for precision in range(settings.POI_CACHE_MAX_PRECISION, 0, -1):
+        width, height = cell_degrees(precision)
+        if width >= half_width and height >= half_height:
+            return precision
+    return 0
+
+
+def _cell_generation_key(cell):
+    return f'poi_cell_gen_{cell or "world"}'
+
+
+def _request_digest(request):
+    # Host and full query string: responses embed absolute "next" links
+    return hashlib.sha256(request.build_absolute_uri().encode('utf-8')).hexdigest()
+
+
+def radius_cache_key(request, lng, lat, radius_km):
+    """Cache key of a radius response at the current generation of its cell."""
+    precision = radius_precision(lng, lat, radius_km)
+    cell = geohash(*cell_index(lng, lat, precision), precision)
+    epoch, generation = get_generations(EPOCH_KEY, _cell_generation_key(cell))
+    return f'poi_radius_{epoch}_{cell}_{generation}_{_request_digest(request)}'
+
+
+def list_cache_key(request):
+    """Cache key of a list page at the current list generation."""
+    epoch, generation = get_generations(EPOCH_KEY, LIST_GENERATION_KEY)
+    return f'poi_list_{epoch}_{generation}_{_request_digest(request)}'
+
+
+def autocomplete_cache_key(prefix, lng, lat, category, limit):
+    """
+    Cache key of an autocomplete response.
+
+    Keyed on the lower-cased prefix and the centre snapped to
+    ``POI_AUTOCOMPLETE_SNAP_DEGREES``, so nearby users typing the same prefix
+    share entries; short TTLs bound staleness instead of invalidation.
+    """
+    (epoch,) = get_generations(EPOCH_KEY)
+    digest = hashlib.sha256(prefix.lower().encode('utf-8')).hexdigest()
+    return f'poi_autocomplete_{epoch}_{digest}_{lng}_{lat}_{category or ""}_{limit}'
+
+
+def normalize_radius_query(lng, lat, radius_km):
+    """
+    Snap a radius query to its cacheable superset.
+
+    Returns ``(lng, lat, radius_km)`` of a query on the snapping grid whose
+    circle contains the exact one, or None when normalisation is disabled or
+    no radius bucket is large enough.
+    """
+    step = settings.POI_RADIUS_SNAP_DEGREES
+    if step <= 0:
+        return None
+
+    snapped_lng = max(min(round(lng / step) * step, 180.0), -180.0)
+    snapped_lat = max(min(round(lat / step) * step, 90.0), -90.0)
+    offset_km = haversine_m(lng, lat, snapped_lng, snapped_lat) / 1000
+    needed_km = (radius_km + offset_km) * SUPERSET_RADIUS_MARGIN
+    for bucket_km in sorted(settings.POI_RADIUS_BUCKETS_KM):
+        if bucket_km >= needed_km:
+            return round(snapped_lng, 6), round(snapped_lat, 6), bucket_km
+    return None
+
+
+def superset_cache_key(lng, lat, radius_km, category=None, min_rating=None, fields=None):
+    """Cache key of a snapped radius superset at the current generation of its cell."""
+    precision = radius_precision(lng, lat, radius_km)
+    cell = geohash(*cell_index(lng, lat, precision), precision)
+    epoch, generation = get_generations(EPOCH_KEY, _cell_generation_key(cell))
+    filters = f'{category or ""}:{"" if min_rating is None else min_rating}'
+    projection = ','.join(fields) if fields is not None else 'all'
+    return (f'poi_superset_{epoch}_{cell}_{generation}_{lng}_{lat}_{radius_km}_'
+            f'{filters}_{projection}')
+
+
+def record_superset_lookup(outcome, candidate_rows=0, matched_rows=0):
+    """Count a superset ``hits``/``misses``/``bypassed`` outcome and rows scanned."""
+    increment(SUPERSET_STATS_KEYS[outcome])
+    if candidate_rows:
+        increment(SUPERSET_STATS_KEYS['candidate_rows'], candidate_rows)
+    if matched_rows:
+        increment(SUPERSET_STATS_KEYS['matched_rows'], matched_rows)
+
+
+def superset_stats():
+    """Current superset counters with derived hit rate and row overhead."""
+    names = list(SUPERSET_STATS_KEYS)
+    stats = dict(zip(names, get_generations(*SUPERSET_STATS_KEYS.values())))
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    # Superset rows scanned per row actually inside the exact circle
+    stats['rows_per_match'] = (
+        round(stats['candidate_rows'] / stats['matched_rows'], 2)
+        if stats['matched_rows'] else None
+    )
+    return stats
+
+
+def point_generation_keys(lng, lat):
+    """Generation keys of every cell whose radius results could contain (lng, lat)."""
+    keys = {_cell_generation_key('')}
+    for precision in range(1, settings.POI_CACHE_MAX_PRECISION + 1):
+        keys.update(
+            _cell_generation_key(cell) for cell in neighbour_cells(lng, lat, precision)
+        )
+    return keys
+
+
+def invalidate_point(lng, lat):
+    """Evict cached radius results that could contain (lng, lat) and all lists."""
+    bump_generations(point_generation_keys(lng, lat) | {LIST_GENERATION_KEY})
+
+
+def invalidate_all():
+    """Evict every cached POI response, e.g. after a bulk load."""
+    bump_generation(EPOCH_KEY)
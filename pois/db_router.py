@@ -0,0 +1,220 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` picks the database a request reads from, once,
+so every query of the request sees the same snapshot: a replica for safe
+methods (GET, HEAD, OPTIONS), the primary for other methods and for clients
+that wrote within the last ``POI_READ_YOUR_WRITES_SECONDS``. That window
+starts with a cookie, set on successful responses to requests that actually
+wrote: ``ReplicaRouter`` notes every write it routes, so read-only POSTs such
+as batch radius search do not pin the client. ``ReplicaRouter`` sends reads
+to the request's alias and every write, migration and read outside a
+request to ``default``.
+
+Replicas are picked round-robin or by lowest measured latency
+(``POI_REPLICA_SELECTION``). A daemon thread per process checks each replica
+every ``POI_REPLICA_CHECK_INTERVAL`` seconds; replicas replaying more than
+``POI_REPLICA_MAX_LAG_SECONDS`` behind, disconnected from the primary,
+failing, or not checked recently are skipped, and with none left reads go to
+the primary.
+"""
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = 'round_robin'
+LEAST_LATENCY = 'least_latency'
+
+# Set on successful writes; holds the time the client stops being pinned
+PIN_COOKIE = 'poi_primary_until'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Seconds behind the primary, or NULL (never eligible) when the replica has no
+# streaming WAL receiver: having replayed everything it received says nothing
+# once it can receive no more. While streaming, a replica that has replayed
+# everything it received is current, however long ago the primary last wrote.
+# Without pg_read_all_stats the receiver's status reads as NULL; its row
+# still shows that one is running
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (
+        SELECT 1 FROM pg_stat_wal_receiver WHERE status IS NULL OR status = 'streaming'
+    ) THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+# Weight of the newest latency sample in the moving average
+LATENCY_SMOOTHING = 0.3
+
+# Alias reads of the current request go to; None means the primary
+_read_alias = contextvars.ContextVar('poi_read_alias', default=None)
+
+# {'wrote': bool} of the current request; None outside routed requests
+_request_writes = contextvars.ContextVar('poi_request_writes', default=None)
+
+
+def read_alias():
+    """Database alias reads are routed to in the current context."""
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+class ReplicaPool:
+    """
+    Replica aliases with their last measured lag and latency.
+
+    Without ``checks``, no thread is started and results come only from
+    ``record()``.
+    """
+
+    def __init__(self, aliases=None, checks=True):
+        self._aliases = aliases
+        self.checks = checks
+        # alias -> (checked_at, lag_seconds, latency_seconds)
+        self._status = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    @property
+    def aliases(self):
+        if self._aliases is None:
+            return settings.DATABASE_REPLICA_ALIASES
+        return self._aliases
+
+    def start(self):
+        """Start the checking thread for this process (again after a fork)."""
+        if not self.checks or not self.aliases or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._status = {}
+            threading.Thread(target=self._run, name='poi-replica-check', daemon=True).start()
+
+    def _run(self):
+        while True:
+            for alias in self.aliases:
+                self.check(alias)
+            time.sleep(settings.POI_REPLICA_CHECK_INTERVAL)
+
+    def check(self, alias):
+        """Measure one replica's lag and round trip."""
+        started = time.monotonic()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(REPLICA_LAG_SQL)
+                lag = cursor.fetchone()[0]
+        except Exception:
+            logger.warning('Replica %s failed its lag check', alias, exc_info=True)
+            connections[alias].close()
+            self._status.pop(alias, None)
+            return
+        self.record(alias, float('inf') if lag is None else float(lag), time.monotonic() - started)
+
+    def record(self, alias, lag, latency):
+        previous = self._status.get(alias)
+        if previous is not None:
+            latency = LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * previous[2]
+        self._status[alias] = (time.monotonic(), lag, latency)
+
+    def eligible(self):
+        """Replicas checked recently and within the lag limit."""
+        now = time.monotonic()
+        max_age = 3 * settings.POI_REPLICA_CHECK_INTERVAL
+        eligible = []
+        for alias in self.aliases:
+            status = self._status.get(alias)
+            if (status is not None and now - status[0] <= max_age
+                    and status[1] <= settings.POI_REPLICA_MAX_LAG_SECONDS):
+                eligible.append(alias)
+        return eligible
+
+    def choose(self):
+        """Replica alias to read from, or None for the primary."""
+        eligible = self.eligible()
+        if not eligible:
+            return None
+        if settings.POI_REPLICA_SELECTION == LEAST_LATENCY:
+            return min(eligible, key=lambda alias: self._status[alias][2])
+        return eligible[next(self._counter) % len(eligible)]
+
+
+replica_pool = ReplicaPool()
+
+
+class ReplicaRouter:
+    """Reads go to the alias chosen for the request; everything else to default."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route each request's reads to a replica or the primary.
+
+    The chosen alias is reported in the ``X-Read-Database`` header.
+    """
+
+    pool = replica_pool
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def pinned(self, request):
+        """Whether the client wrote recently enough to need the primary."""
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def __call__(self, request):
+        alias = None
+        if request.method in SAFE_METHODS and not self.pinned(request):
+            self.pool.start()
+            alias = self.pool.choose()
+
+        writes = {'wrote': False}
+        alias_token = _read_alias.set(alias)
+        writes_token = _request_writes.set(writes)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_writes.reset(writes_token)
+            _read_alias.reset(alias_token)
+
+        window = settings.POI_READ_YOUR_WRITES_SECONDS
+        if writes['wrote'] and response.status_code < 400 and self.pool.aliases and window > 0:
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + window:.3f}', max_age=window,
+                httponly=True, samesite='Lax'
+            )
+        if self.pool.aliases:
+            response['X-Read-Database'] = alias or DEFAULT_DB_ALIAS
+        return response
@@ -1,10 +1,115 @@
 """
 Health check views for monitoring and readiness checks.
+
+Probes never block on measurement: system metrics are sampled by a
+background thread and the database/PostGIS check is a single query whose
+result is reused for ``POI_HEALTH_DB_TTL`` seconds, so a probe answers from
+process memory in well under 5 ms. Under ``POI_SNAPSHOT_SERVING`` the
+probes check the mapped snapshot file instead of the database.
 """
+from django.conf import settings
 from django.http import JsonResponse
 from django.db import connection
 import psutil
 import os
+import threading
+import time
+
+
+class SystemSampler:
+    """
+    Samples memory, disk and CPU usage on a daemon thread.
+    
+    CPU usage is measured between consecutive samples, so no caller ever
+    waits on a measurement interval.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._sample = None
+    
+    def start(self):
+        """Start sampling in this process (idempotent, fork-safe)."""
+        with self._lock:
+            # Forked workers do not inherit the parent's sampling thread
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            psutil.cpu_percent(interval=None)
+            self._sample = self._take(cpu_percent=None)
+            threading.Thread(target=self._run, name='health-sampler', daemon=True).start()
+    
+    def _take(self, cpu_percent):
+        return {
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_percent': psutil.disk_usage('/').percent,
+            'cpu_percent': cpu_percent,
+            'sampled_at': time.monotonic(),
+        }
+    
+    def _run(self):
+        while True:
+            time.sleep(settings.POI_HEALTH_SAMPLE_INTERVAL)
+            try:
+                self._sample = self._take(psutil.cpu_percent(interval=None))
+            except Exception:
+                # Keep serving the last sample rather than killing the thread
+                pass
+    
+    def sample(self):
+        """Latest metrics and their age in seconds."""
+        self.start()
+        sample = dict(self._sample)
+        sample['sample_age_seconds'] = round(time.monotonic() - sample.pop('sampled_at'), 3)
+        return sample
+
+
+system_sampler = SystemSampler()
+
+# (checked_at, postgis_version, error) of the last database probe
+_database_probe = (None, None, None)
+
+
+def database_status():
+    """
+    Check database connectivity and PostGIS in one query.
+    
+    Returns ``(postgis_version, error)``; exactly one is None. The result,
+    failures included, is reused for ``POI_HEALTH_DB_TTL`` seconds.
+    """
+    global _database_probe
+    checked_at, version, error = _database_probe
+    now = time.monotonic()
+    if checked_at is not None and now - checked_at < settings.POI_HEALTH_DB_TTL:
+        return version, error
+    
+    version, error = None, None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT PostGIS_Version()")
+            version = cursor.fetchone()[0]
+    except Exception as e:
+        error = str(e)
+    _database_probe = (now, version, error)
+    return version, error
+
+
+def snapshot_status():
+    """
+    Summary of the served snapshot file.
+    
+    Returns ``(snapshot, error)``; exactly one is None.
+    """
+    from .snapshot import SnapshotError, snapshot_file
+    try:
+        snapshot = snapshot_file.get()
+    except SnapshotError as e:
+        return None, str(e)
+    return {
+        'created_at': snapshot.created_at,
+        'poi_count': len(snapshot),
+    }, None
 
 
 def health_check(request):
@@ -15,37 +120,49 @@ def health_check(request):
         - 200: Service is healthy
         - 500: Service is unhealthy
     """
-    try:
-        # Check database connectivity
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-        
-        # Check PostGIS functionality
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT PostGIS_Version()")
-        
-        # Check system resources
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        health_data = {
+    if settings.POI_SNAPSHOT_SERVING:
+        snapshot, error = snapshot_status()
+        if error is not None:
+            return JsonResponse({'status': 'unhealthy', 'error': error}, status=500)
+        return JsonResponse({
             'status': 'healthy',
-            'database': 'connected',
-            'postgis': 'available',
-            'system': {
-                'memory_percent': memory.percent,
-                'disk_percent': disk.percent,
-                'cpu_percent': psutil.cpu_percent(interval=1)
-            }
-        }
-        
-        return JsonResponse(health_data, status=200)
-        
-    except Exception as e:
+            'snapshot': snapshot,
+            'system': system_sampler.sample()
+        }, status=200)
+    
+    postgis_version, error = database_status()
+    if error is not None:
         return JsonResponse({
             'status': 'unhealthy',
-            'error': str(e)
+            'error': error
         }, status=500)
+    
+    health_data = {
+        'status': 'healthy',
+        'database': 'connected',
+        'postgis': 'available',
+        'postgis_version': postgis_version,
+        'system': system_sampler.sample()
+    }
+    
+    return JsonResponse(health_data, status=200)
+
+
+def estimated_poi_count():
+    """
+    Row count of the POI table from ``pg_class.reltuples``.
+    
+    Constant time at any table size; the estimate is refreshed by
+    autovacuum/ANALYZE. Returns None until the table is first analysed.
+    """
+    from .models import PointOfInterest
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [PointOfInterest._meta.db_table]
+        )
+        estimate = cursor.fetchone()[0]
+    return estimate if estimate >= 0 else None
 
 
 def ready_check(request):
@@ -56,32 +173,43 @@ def ready_check(request):
         - Database connectivity
         - PostGIS availability
         - Basic application functionality
+    
+    Under ``POI_SNAPSHOT_SERVING`` only the snapshot file is checked.
+    
+    ``POI_READY_COUNT`` selects the reported ``poi_count``: ``estimate``
+    (from table statistics) or ``none`` to leave it out.
     """
+    if settings.POI_SNAPSHOT_SERVING:
+        snapshot, error = snapshot_status()
+        if error is not None:
+            return JsonResponse({'status': 'not_ready', 'error': error}, status=503)
+        return JsonResponse({'status': 'ready', 'snapshot': snapshot}, status=200)
+    
     try:
-        # Check database connectivity
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-        
-        # Check PostGIS functionality
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT PostGIS_Version()")
-        
-        # Check if POI model is accessible
-        from .models import PointOfInterest
-        try:
-            poi_count = PointOfInterest.objects.count()
-        except Exception as model_exc:
-            poi_count = None
-            # Optionally, you could log model_exc here
+        # Check database connectivity and PostGIS (shared with health_check)
+        postgis_version, error = database_status()
+        if error is not None:
+            raise RuntimeError(error)
         
         ready_data = {
             'status': 'ready',
             'database': 'connected',
             'postgis': 'available',
-            'models': 'accessible' if poi_count is not None else 'unavailable',
-            'poi_count': poi_count
         }
         
+        # Check if POI model is accessible; the row count is the planner's
+        # estimate rather than a COUNT(*), or left out entirely
+        if settings.POI_READY_COUNT != 'none':
+            try:
+                poi_count = estimated_poi_count()
+            except Exception as model_exc:
+                ready_data['models'] = 'unavailable'
+                poi_count = None
+            else:
+                ready_data['models'] = 'accessible'
+            ready_data['poi_count'] = poi_count
+            ready_data['poi_count_estimated'] = True
+        
         return JsonResponse(ready_data, status=200)
         
     except Exception as e:
@@ -0,0 +1,145 @@
+"""
+Cache invalidation on POI writes.
+
+Model signals cover saves and deletes from the API, the admin and the ORM;
+bulk paths that skip signals call ``invalidate_locations`` or
+``invalidate_all`` themselves. Invalidation runs after the transaction
+commits, so no reader can re-cache the pre-write rows under the new
+generation.
+
+With read replicas, a reader may still re-cache pre-write rows from a
+replica that has not replayed the write yet. The generation bumps therefore
+repeat once every replica serving reads must have caught up, evicting
+anything cached in between: ``POI_REPLICA_MAX_LAG_SECONDS`` plus three check
+intervals, the age up to which a replica's last check keeps it eligible.
+One thread per process runs the repeats, merging the keys due in the same
+second into one cache write; any still pending at exit are bumped early
+rather than lost.
+"""
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache, tiles
+from .models import PointOfInterest
+
+logger = logging.getLogger(__name__)
+
+# Targeted eviction writes about 80 generation keys per point (fewer when
+# points share cells) in one set_many; above this many points a single epoch
+# bump is cheaper
+MAX_TARGETED_LOCATIONS = 25
+
+
+class ReplicaLagEvictions:
+    """Generation bumps to repeat once replicas have replayed a write."""
+
+    def __init__(self):
+        # Due second (monotonic) -> generation keys to bump then
+        self._buckets = {}
+        self._condition = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def schedule(self, keys):
+        """Bump ``keys`` again after the replica lag bound; no-op without replicas."""
+        if not settings.DATABASE_REPLICA_ALIASES:
+            return
+        self.start()
+        delay = settings.POI_REPLICA_MAX_LAG_SECONDS + 3 * settings.POI_REPLICA_CHECK_INTERVAL
+        due = math.ceil(time.monotonic() + delay)
+        with self._condition:
+            self._buckets.setdefault(due, set()).update(keys)
+            self._condition.notify()
+
+    def start(self):
+        """Start the thread for this process (again after a fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._buckets = {}
+            self._condition = threading.Condition()
+            threading.Thread(target=self._run, name='poi-replica-evictions', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._buckets:
+                    self._condition.wait()
+                due = min(self._buckets)
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                keys = self._buckets.pop(due)
+            self._bump(keys)
+
+    def flush(self):
+        """Bump every pending key now, e.g. when the process exits."""
+        with self._condition:
+            keys = set().union(*self._buckets.values())
+            self._buckets.clear()
+        self._bump(keys)
+
+    def _bump(self, keys):
+        try:
+            cache.bump_generations(keys)
+        except Exception:
+            logger.exception('Failed to repeat cache invalidation after replica lag')
+
+
+replica_lag_evictions = ReplicaLagEvictions()
+atexit.register(replica_lag_evictions.flush)
+
+
+def point_generation_keys(points):
+    """Cell, list and tile generation keys covering ``points``."""
+    keys = {cache.LIST_GENERATION_KEY}
+    for lng, lat in points:
+        keys |= cache.point_generation_keys(lng, lat)
+        keys |= tiles.point_generation_keys(lng, lat)
+    return keys
+
+
+def invalidate_locations(*locations):
+    """Evict cached radius results, lists and tiles covering each point."""
+    points = {(location.x, location.y) for location in locations if location is not None}
+    if not points:
+        return
+    if len(points) > MAX_TARGETED_LOCATIONS:
+        invalidate_all()
+        return
+    keys = point_generation_keys(points)
+    cache.bump_generations(keys)
+    replica_lag_evictions.schedule(keys)
+
+
+def invalidate_all():
+    """Evict every cached POI response and tile."""
+    cache.invalidate_all()
+    replica_lag_evictions.schedule([cache.EPOCH_KEY])
+
+
+@receiver(post_save, sender=PointOfInterest, dispatch_uid='poi_invalidate_on_save')
+def invalidate_on_save(sender, instance, **kwargs):
+    # A moved POI leaves its old cells as well as entering new ones
+    locations = (instance._loaded_location, instance.location)
+    instance._loaded_location = instance.location
+    transaction.on_commit(lambda: invalidate_locations(*locations))
+
+
+@receiver(post_delete, sender=PointOfInterest, dispatch_uid='poi_invalidate_on_delete')
+def invalidate_on_delete(sender, instance, **kwargs):
+    location = instance.location
+    transaction.on_commit(lambda: invalidate_locations(location))
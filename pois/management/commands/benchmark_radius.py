@@ -0,0 +1,140 @@
+"""
+Management command to benchmark the radius engines at increasing table sizes.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from pois.models import PointOfInterest
+from pois.spatial import RADIUS_ENGINES, radius_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the pois table with synthetic rows and report the query plan and '
+        'latency of each radius engine at every requested size'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10_000, 1_000_000, 10_000_000],
+            help='Table sizes to benchmark, grown in ascending order'
+        )
+        parser.add_argument(
+            '--engines',
+            nargs='+',
+            choices=RADIUS_ENGINES,
+            default=list(RADIUS_ENGINES),
+            help='Radius engines to compare'
+        )
+        parser.add_argument(
+            '--radius-km',
+            type=float,
+            default=5.0,
+            help='Search radius in kilometers (default: 5.0)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Timed queries per engine and size (default: 50)'
+        )
+        parser.add_argument(
+            '--region',
+            type=float,
+            nargs=4,
+            default=[-75.0, 40.0, -73.0, 41.5],
+            metavar=('MIN_LNG', 'MIN_LAT', 'MAX_LNG', 'MAX_LAT'),
+            help='Area the synthetic POIs are spread over (default: NYC metro)'
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Empty the pois table first (required if it already has rows)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['sizes'])
+        region = options['region']
+
+        if options['truncate']:
+            with connection.cursor() as cursor:
+                cursor.execute('TRUNCATE pois RESTART IDENTITY')
+        elif PointOfInterest.objects.exists():
+            raise CommandError(
+                'The pois table is not empty; rerun with --truncate on a '
+                'disposable database'
+            )
+
+        current = 0
+        for size in sizes:
+            self.stdout.write(f'Growing pois to {size} rows...')
+            self.fill(current, size, region)
+            current = size
+
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE pois')
+
+            for engine in options['engines']:
+                self.benchmark(engine, size, region, options)
+
+    def fill(self, start, stop, region):
+        """Insert synthetic POIs with ids in (start, stop] using generate_series."""
+        min_lng, min_lat, max_lng, max_lat = region
+        categories = [choice[0] for choice in PointOfInterest.CATEGORY_CHOICES]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO pois (name, category, location, description, address,
+                                  phone, website, rating, created_at, updated_at)
+                SELECT 'Benchmark POI ' || g,
+                       (%s::text[])[1 + (g %% %s)],
+                       ST_SetSRID(ST_MakePoint(%s + random() * %s,
+                                               %s + random() * %s), 4326),
+                       '', '', '', '',
+                       round((random() * 5)::numeric, 2),
+                       now(), now()
+                FROM generate_series(%s, %s) AS g
+                """,
+                [
+                    categories, len(categories),
+                    min_lng, max_lng - min_lng, min_lat, max_lat - min_lat,
+                    start + 1, stop,
+                ]
+            )
+
+    def benchmark(self, engine, size, region, options):
+        """Print the plan for one query, then time repeated random-centre queries."""
+        min_lng, min_lat, max_lng, max_lat = region
+        radius_km = options['radius_km']
+
+        def query(lng, lat):
+            return radius_queryset(
+                PointOfInterest.objects.all(), lng, lat, radius_km, engine=engine
+            ).order_by('distance_m', 'id')[:100]
+
+        center = ((min_lng + max_lng) / 2, (min_lat + max_lat) / 2)
+        plan = query(*center).explain(analyze=True, buffers=True)
+        self.stdout.write(self.style.SUCCESS(f'\n[{engine}] {size} rows, plan:'))
+        self.stdout.write(plan)
+
+        timings = []
+        for _ in range(options['iterations']):
+            lng = random.uniform(min_lng, max_lng)
+            lat = random.uniform(min_lat, max_lat)
+            start = time.perf_counter()
+            list(query(lng, lat).values_list('id', 'distance_m'))
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'[{engine}] {size} rows: median {statistics.median(timings):.2f}ms, '
+            f'p95 {p95:.2f}ms, max {timings[-1]:.2f}ms'
+        )
@@ -3,11 +3,8 @@ Management command to generate random Points of Interest.
 """
 import random
 import math
-from decimal import Decimal
-from django.core.management.base import BaseCommand, CommandError
-from django.contrib.gis.geos import Point
-from django.utils import timezone
-from pois.models import PointOfInterest
+from django.core.management.base import BaseCommand
+from pois.bulk import BulkLoader
 
 
 class Command(BaseCommand):
@@ -38,6 +35,17 @@ class Command(BaseCommand):
             default=10.0,
             help='Radius in kilometers to generate POIs within (default: 10.0)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows per COPY batch (default: 10000)'
+        )
+        parser.add_argument(
+            '--rebuild-indexes',
+            action='store_true',
+            help='Drop secondary indexes during the load and rebuild them afterwards'
+        )
 
     def handle(self, *args, **options):
         count = options['count']
@@ -98,7 +106,23 @@ class Command(BaseCommand):
             )
         )
 
-        created_count = 0
+        loader = BulkLoader(
+            batch_size=options['batch_size'],
+            rebuild_indexes=options['rebuild_indexes'],
+            progress=self.stdout.write
+        )
+        created_count = loader.load(
+            self.generate_rows(count, center_lat, center_lng, radius_km, florida_categories)
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully created {created_count} POIs around Oviedo, Florida!'
+            )
+        )
+
+    def generate_rows(self, count, center_lat, center_lng, radius_km, florida_categories):
+        """Yield staging rows for random POIs around the center point."""
         for i in range(count):
             # Generate random point within radius
             angle = random.uniform(0, 2 * math.pi)
@@ -137,25 +161,14 @@ class Command(BaseCommand):
             # Generate website
             website = f"https://www.{name.lower().replace(' ', '')}.com"
             
-            # Create POI
-            poi = PointOfInterest.objects.create(
-                name=name,
-                category=category,
-                description=description,
-                location=Point(lng, lat, srid=4326),
-                address=address,
-                phone=phone,
-                website=website,
-                rating=rating
-            )
-            
-            created_count += 1
-            
-            if created_count % 20 == 0:
-                self.stdout.write(f'Created {created_count} POIs...')
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Successfully created {created_count} POIs around Oviedo, Florida!'
-            )
-        ) 
\ No newline at end of file
+            yield {
+                'name': name,
+                'category': category,
+                'description': description,
+                'address': address,
+                'phone': phone,
+                'website': website,
+                'rating': rating,
+                'lng': lng,
+                'lat': lat,
+            }
@@ -5,8 +5,7 @@ import csv
 import random
 import os
 from django.core.management.base import BaseCommand
-from django.contrib.gis.geos import Point
-from django.utils import timezone
+from pois.bulk import BulkLoader
 from pois.models import PointOfInterest
 
 
@@ -30,11 +29,28 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing POI data before loading'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows per COPY batch (default: 10000)'
+        )
+        parser.add_argument(
+            '--rebuild-indexes',
+            action='store_true',
+            help='Drop secondary indexes during the load and rebuild them afterwards'
+        )
     
     def handle(self, *args, **options):
         csv_file = options.get('csv_file')
         count = options.get('count')
         clear = options.get('clear')
+        self.loader = BulkLoader(
+            batch_size=options.get('batch_size') or 10000,
+            rebuild_indexes=options.get('rebuild_indexes', False),
+            progress=self.stdout.write,
+            on_invalid=self.report_invalid_row
+        )
         
         if clear:
             self.stdout.write('Clearing existing POI data...')
@@ -50,44 +66,37 @@ class Command(BaseCommand):
         """Load POI data from CSV file."""
         self.stdout.write(f'Loading POI data from {csv_file}...')
         
-        created_count = 0
         with open(csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    # Parse coordinates
-                    lng = float(row.get('longitude', 0))
-                    lat = float(row.get('latitude', 0))
-                    
-                    # Create Point object
-                    location = Point(lng, lat, srid=4326)
-                    
-                    # Create POI
-                    poi, created = PointOfInterest.objects.get_or_create(
-                        name=row.get('name', 'Unknown'),
-                        location=location,
-                        defaults={
-                            'category': row.get('category', 'landmark'),
-                            'description': row.get('description', ''),
-                            'address': row.get('address', ''),
-                            'phone': row.get('phone', ''),
-                            'website': row.get('website', ''),
-                            'rating': float(row.get('rating', 0)) if row.get('rating') else None,
-                        }
-                    )
-                    
-                    if created:
-                        created_count += 1
-                        
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.WARNING(f'Error loading row: {row} - {e}')
-                    )
+            created_count = self.loader.load(self.read_csv_rows(file))
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully loaded {created_count} POIs from CSV')
         )
     
+    def read_csv_rows(self, file):
+        """Stream staging rows from CSV, skipping rows that fail to parse."""
+        for row in csv.DictReader(file):
+            try:
+                yield {
+                    'name': row.get('name') or 'Unknown',
+                    'category': row.get('category') or 'landmark',
+                    'description': row.get('description', ''),
+                    'address': row.get('address', ''),
+                    'phone': row.get('phone', ''),
+                    'website': row.get('website', ''),
+                    'rating': float(row['rating']) if row.get('rating') else None,
+                    'lng': float(row.get('longitude', 0)),
+                    'lat': float(row.get('latitude', 0)),
+                }
+            except (TypeError, ValueError) as e:
+                self.stdout.write(
+                    self.style.WARNING(f'Error loading row: {row} - {e}')
+                )
+    
+    def report_invalid_row(self, row, error):
+        """Report a parsed row the database would refuse; it is skipped."""
+        self.stdout.write(self.style.WARNING(f'Error loading row: {row} - {error}'))
+    
     def generate_random_pois(self, count):
         """Generate random NYC landmarks."""
         self.stdout.write(f'Generating {count} random NYC landmarks...')
@@ -187,53 +196,35 @@ class Command(BaseCommand):
             'max_lng': -73.7004
         }
         
-        created_count = 0
-        
-        # First, create the predefined landmarks
-        for landmark in nyc_landmarks:
-            lng, lat = landmark['coordinates']
-            location = Point(lng, lat, srid=4326)
-            
-            poi, created = PointOfInterest.objects.get_or_create(
-                name=landmark['name'],
-                location=location,
-                defaults={
+        def rows():
+            # Predefined landmarks first; existing ones are left untouched
+            for landmark in nyc_landmarks:
+                lng, lat = landmark['coordinates']
+                yield {
+                    'name': landmark['name'],
                     'category': landmark['category'],
                     'description': landmark['description'],
                     'address': landmark['address'],
                     'rating': landmark['rating'],
+                    'lng': lng,
+                    'lat': lat,
                 }
-            )
             
-            if created:
-                created_count += 1
-        
-        # Generate additional random POIs
-        remaining_count = count - len(nyc_landmarks)
-        if remaining_count > 0:
-            for i in range(remaining_count):
-                # Generate random coordinates within NYC bounds
-                lat = random.uniform(nyc_bounds['min_lat'], nyc_bounds['max_lat'])
-                lng = random.uniform(nyc_bounds['min_lng'], nyc_bounds['max_lng'])
-                
-                location = Point(lng, lat, srid=4326)
-                
-                # Generate random POI data
+            # Generate additional random POIs within NYC bounds
+            remaining_count = count - len(nyc_landmarks)
+            for i in range(max(remaining_count, 0)):
                 category = random.choice(categories)
-                name = f"Random {category.title()} {i+1}"
-                description = f"A randomly generated {category} in NYC"
-                rating = round(random.uniform(3.0, 5.0), 1)
-                
-                poi = PointOfInterest.objects.create(
-                    name=name,
-                    category=category,
-                    description=description,
-                    location=location,
-                    rating=rating,
-                    address=f"Random Address {i+1}, NYC"
-                )
-                
-                created_count += 1
+                yield {
+                    'name': f"Random {category.title()} {i+1}",
+                    'category': category,
+                    'description': f"A randomly generated {category} in NYC",
+                    'address': f"Random Address {i+1}, NYC",
+                    'rating': round(random.uniform(3.0, 5.0), 1),
+                    'lng': random.uniform(nyc_bounds['min_lng'], nyc_bounds['max_lng']),
+                    'lat': random.uniform(nyc_bounds['min_lat'], nyc_bounds['max_lat']),
+                }
+        
+        created_count = self.loader.load(rows())
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {created_count} POIs')
@@ -0,0 +1,421 @@
+"""
+In-process spatial index over the POIs of configured hot regions.
+
+Each region in ``POI_MEMORY_INDEX_REGIONS`` is held as a column snapshot of
+NumPy arrays (ids, lng/lat, category codes, ratings in hundredths, names)
+sorted into a uniform grid of ``POI_MEMORY_INDEX_CELL_DEGREES`` cells, with a
+directory of the first row of every cell. Radius and nearest queries whose
+bounding box lies inside a region read only the cells the box overlaps and
+compute haversine distances for them in one vectorised pass. Anything else
+gets None back and the caller queries PostGIS.
+
+Freshness: statement-level triggers on ``pois`` (migration 0009) send the
+ids each statement changed on the ``poi_changes`` channel. A listener thread
+holds one session connection for ``LISTEN`` (which does not work through
+transaction pooling, so ``POI_MEMORY_INDEX_LISTEN_HOST`` can point past
+PgBouncer) and queues the ids. An applier thread re-reads the changed rows in
+batches and swaps in rebuilt snapshots; readers never lock, they keep using
+the snapshot they started with. Regions are read in full at startup, after
+the listener reconnects (notifications may have been missed) and when a
+batch changes more than ``POI_MEMORY_INDEX_MAX_DELTA`` rows. Until a full read
+completes, and while the listener is disconnected, every query falls back.
+
+Distances are on the mean-radius sphere, like the superset cache, so they
+can differ from PostGIS spheroid distances by a few metres per kilometre.
+"""
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .models import PointOfInterest
+from .spatial import EARTH_RADIUS_M, STX, STY, BBoxOverlaps, bounding_box, make_envelope
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the index is optional
+    np = None
+
+try:
+    import psycopg
+    from psycopg.conninfo import make_conninfo
+except ImportError:  # pragma: no cover - psycopg 2 deployments
+    psycopg = None
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'poi_changes'
+
+# Response fields a snapshot row can produce
+SNAPSHOT_FIELDS = frozenset(('id', 'name', 'category', 'rating', 'coordinates', 'distance_km'))
+
+CATEGORY_CODES = [code for code, _ in PointOfInterest.CATEGORY_CHOICES]
+CATEGORY_INDEX = {code: index for index, code in enumerate(CATEGORY_CODES)}
+
+# Ratings are stored in hundredths; rows without one hold NO_RATING
+NO_RATING = -1
+
+# Radius (metres) nearest queries start from, doubling until k rows are found
+NEAREST_START_M = 500.0
+
+# Seconds between listener reconnection attempts
+LISTEN_RETRY_SECONDS = 5.0
+
+# TCP keepalives for the listener, which otherwise only reads: a connection
+# dropped without a FIN or RST fails within about a minute instead of leaving
+# notifies() blocked (and the index silently stale) forever
+LISTEN_KEEPALIVES = {
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3,
+    'tcp_user_timeout': 60000,
+}
+
+# Queued in place of changed ids to ask the applier for a full read
+RELOAD = object()
+
+
+def haversine_m(lng, lat, lngs, lats):
+    """Great-circle distances in metres from one point to arrays of points."""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lngs - lng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def parse_change(payload):
+    """Queue item for a ``poi_changes`` payload: the changed ids, or RELOAD."""
+    try:
+        change = json.loads(payload)
+        return RELOAD if change.get('truncate') else [int(pk) for pk in change['ids']]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        # Which rows changed is unknown, so re-read the regions
+        logger.warning('Malformed %s payload: %r', NOTIFY_CHANNEL, payload)
+        return RELOAD
+
+
+def snapshot_columns(rows):
+    """Turn (id, name, category, rating, lng, lat) rows into column arrays."""
+    ids, names, categories, ratings, lngs, lats = zip(*rows) if rows else ((),) * 6
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'name': np.array(names, dtype=object),
+        'category': np.array([CATEGORY_INDEX[code] for code in categories], dtype=np.int8),
+        'rating': np.array(
+            [NO_RATING if rating is None else round(rating * 100) for rating in ratings],
+            dtype=np.int16
+        ),
+        'lng': np.array(lngs, dtype=np.float64),
+        'lat': np.array(lats, dtype=np.float64),
+    }
+
+
+def filter_rows(columns, indexes, category=None, min_rating=None):
+    """Keep the row ``indexes`` of ``columns`` matching category and rating."""
+    if category:
+        indexes = indexes[columns['category'][indexes] == CATEGORY_INDEX[category]]
+    if min_rating is not None:
+        # Smallest rating in hundredths satisfying rating >= min_rating
+        threshold = math.ceil(round(min_rating * 100, 6))
+        indexes = indexes[columns['rating'][indexes] >= threshold]
+    return indexes
+
+
+class RegionIndex:
+    """
+    Immutable snapshot of the POIs inside one bounding box.
+
+    Rows are sorted by grid cell (row-major), then id, and ``cell_start[c]`` is
+    the first row of cell ``c``: the cells of one grid row between two
+    columns are a single contiguous slice.
+    """
+
+    def __init__(self, bbox, cell_degrees, columns):
+        self.bbox = bbox
+        self.cell_degrees = cell_degrees
+        min_lng, min_lat, max_lng, max_lat = bbox
+        self.nx = max(1, math.ceil((max_lng - min_lng) / cell_degrees))
+        self.ny = max(1, math.ceil((max_lat - min_lat) / cell_degrees))
+
+        cells = self.cell_of(columns['lng'], columns['lat'])
+        order = np.lexsort((columns['id'], cells))
+        self.columns = {name: values[order] for name, values in columns.items()}
+        self.cell_start = np.searchsorted(cells[order], np.arange(self.nx * self.ny + 1))
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def _column(self, lng):
+        column = np.floor((np.asarray(lng) - self.bbox[0]) / self.cell_degrees)
+        return np.clip(column, 0, self.nx - 1).astype(np.int64)
+
+    def _row(self, lat):
+        row = np.floor((np.asarray(lat) - self.bbox[1]) / self.cell_degrees)
+        return np.clip(row, 0, self.ny - 1).astype(np.int64)
+
+    def cell_of(self, lngs, lats):
+        return self._row(lats) * self.nx + self._column(lngs)
+
+    def contains(self, lngs, lats):
+        """Mask of the points inside the region."""
+        min_lng, min_lat, max_lng, max_lat = self.bbox
+        return (lngs >= min_lng) & (lngs <= max_lng) & (lats >= min_lat) & (lats <= max_lat)
+
+    def covers(self, xmin, ymin, xmax, ymax):
+        min_lng, min_lat, max_lng, max_lat = self.bbox
+        return min_lng <= xmin and xmax <= max_lng and min_lat <= ymin and ymax <= max_lat
+
+    def candidates(self, xmin, ymin, xmax, ymax):
+        """Row indexes of every cell overlapping the box."""
+        first_column, last_column = int(self._column(xmin)), int(self._column(xmax))
+        rows = np.arange(int(self._row(ymin)), int(self._row(ymax)) + 1) * self.nx
+        starts = self.cell_start[rows + first_column]
+        ends = self.cell_start[rows + last_column + 1]
+        return np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+
+    def within(self, lng, lat, radius_m, category=None, min_rating=None):
+        """
+        Rows within ``radius_m`` of (lng, lat) matching the filters.
+
+        Returns (row indexes, distances in metres) ordered by (distance, id).
+        """
+        indexes = filter_rows(
+            self.columns, self.candidates(*bounding_box(lng, lat, radius_m)), category, min_rating
+        )
+
+        distances = haversine_m(
+            lng, lat, self.columns['lng'][indexes], self.columns['lat'][indexes]
+        )
+        inside = distances <= radius_m
+        indexes, distances = indexes[inside], distances[inside]
+        order = np.lexsort((self.columns['id'][indexes], distances))
+        return indexes[order], distances[order]
+
+    def rows(self, indexes, distances):
+        """``fast_point_representation`` rows for the given row indexes."""
+        columns = {name: values[indexes].tolist() for name, values in self.columns.items()}
+        return [
+            {
+                'id': columns['id'][i],
+                'name': columns['name'][i],
+                'category': CATEGORY_CODES[columns['category'][i]],
+                'rating': (
+                    None if columns['rating'][i] == NO_RATING
+                    else Decimal(columns['rating'][i]).scaleb(-2)
+                ),
+                'lng': columns['lng'][i],
+                'lat': columns['lat'][i],
+                'distance_m': distance_m,
+            }
+            for i, distance_m in enumerate(distances.tolist())
+        ]
+
+
+class MemoryIndex:
+    """
+    Region snapshots kept fresh from ``poi_changes`` notifications.
+
+    ``start()`` launches the listener and applier threads once per process
+    (after a fork too); ``radius()`` and ``nearest()`` answer from whichever
+    snapshots are current, or return None.
+    """
+
+    def __init__(self, regions=None, cell_degrees=None):
+        if regions is None:
+            regions = settings.POI_MEMORY_INDEX_REGIONS
+        self.region_bboxes = dict(regions)
+        self.cell_degrees = cell_degrees or settings.POI_MEMORY_INDEX_CELL_DEGREES
+        self.regions = {}
+        self.ready = False
+        self._changes = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+        # Whether a LISTEN session is open, and a counter bumped whenever one
+        # opens or closes: a full read is only fresh if one session spans it
+        self._listening = False
+        self._session = 0
+
+    @property
+    def enabled(self):
+        return np is not None and bool(self.region_bboxes)
+
+    @property
+    def listening(self):
+        # Indexes loaded without start() (tests, shells) have no listener to lose
+        return self._pid is None or self._listening
+
+    def start(self):
+        """Start the listener and applier threads for this process."""
+        if not self.enabled or psycopg is None or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Snapshots inherited from a parent process are not kept fresh
+            self._pid = os.getpid()
+            self.regions = {}
+            self.ready = False
+            self._listening = False
+            self._changes = queue.Queue()
+            for target, name in ((self._listen, 'listen'), (self._apply_changes, 'apply')):
+                threading.Thread(
+                    target=target, name=f'poi-memory-index-{name}', daemon=True
+                ).start()
+
+    def fetch(self, bbox=None, ids=None):
+        """Read snapshot rows inside ``bbox`` or with the given ids."""
+        queryset = PointOfInterest.objects.all()
+        if bbox is not None:
+            queryset = queryset.filter(BBoxOverlaps('location', make_envelope(*bbox)))
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        return list(queryset.values_list(
+            'id', 'name', 'category', 'rating', STX('location'), STY('location')
+        ))
+
+    def load(self):
+        """
+        Read every region from the database and swap the snapshots in.
+
+        The index only becomes ready if the same LISTEN session was open for
+        the whole read; otherwise the listener's next RELOAD reads again.
+        """
+        session = self._session
+        self.regions = {
+            name: RegionIndex(bbox, self.cell_degrees, snapshot_columns(self.fetch(bbox=bbox)))
+            for name, bbox in self.region_bboxes.items()
+        }
+        with self._lock:
+            self.ready = self.listening and self._session == session
+        logger.info(
+            'Loaded in-memory POI index: %s',
+            ', '.join(f'{name} ({len(region)} POIs)' for name, region in self.regions.items())
+        )
+
+    def apply(self, ids):
+        """Re-read the rows with ``ids`` and rebuild the regions around them."""
+        ids = np.fromiter(ids, dtype=np.int64)
+        changed = snapshot_columns(self.fetch(ids=ids.tolist()))
+        regions = {}
+        for name, region in self.regions.items():
+            # Deleted rows and rows moved out of the region are simply not re-added
+            kept = ~np.isin(region.columns['id'], ids)
+            added = region.contains(changed['lng'], changed['lat'])
+            regions[name] = RegionIndex(region.bbox, self.cell_degrees, {
+                column: np.concatenate((values[kept], changed[column][added]))
+                for column, values in region.columns.items()
+            })
+        self.regions = regions
+
+    def covering_region(self, xmin, ymin, xmax, ymax):
+        if not self.ready:
+            return None
+        for region in self.regions.values():
+            if region.covers(xmin, ymin, xmax, ymax):
+                return region
+        return None
+
+    def radius(self, lng, lat, radius_m, category=None, min_rating=None):
+        """
+        Rows within ``radius_m`` of (lng, lat), ordered by (distance, id).
+
+        None when no loaded region covers the search box.
+        """
+        region = self.covering_region(*bounding_box(lng, lat, radius_m))
+        if region is None:
+            return None
+        return region.rows(*region.within(lng, lat, radius_m, category, min_rating))
+
+    def nearest(self, lng, lat, k, category=None, min_rating=None):
+        """
+        The ``k`` rows closest to (lng, lat), ordered by (distance, id).
+
+        The search radius doubles until it holds k matches; None once its box
+        leaves the covered regions.
+        """
+        radius_m = NEAREST_START_M
+        while True:
+            region = self.covering_region(*bounding_box(lng, lat, radius_m))
+            if region is None:
+                return None
+            indexes, distances = region.within(lng, lat, radius_m, category, min_rating)
+            # A radius past half the circumference already spans the region
+            if len(indexes) >= k or radius_m > math.pi * EARTH_RADIUS_M:
+                return region.rows(indexes[:k], distances[:k])
+            radius_m *= 2
+
+    def _conninfo(self):
+        db = connections['default'].settings_dict
+        return make_conninfo(**{
+            key: value for key, value in (
+                ('dbname', db['NAME']),
+                ('user', db['USER']),
+                ('password', db['PASSWORD']),
+                ('host', settings.POI_MEMORY_INDEX_LISTEN_HOST or db['HOST']),
+                ('port', settings.POI_MEMORY_INDEX_LISTEN_PORT or db['PORT']),
+                ('connect_timeout', db['OPTIONS'].get('connect_timeout')),
+            ) if value
+        }, **LISTEN_KEEPALIVES)
+
+    def _listen(self):
+        while True:
+            try:
+                with psycopg.connect(self._conninfo(), autocommit=True) as connection:
+                    connection.execute(f'LISTEN {NOTIFY_CHANNEL}')
+                    self._set_listening(True)
+                    # Listening before the full read, so no change falls between
+                    self._changes.put(RELOAD)
+                    for notify in connection.notifies():
+                        self._changes.put(parse_change(notify.payload))
+            except psycopg.Error:
+                logger.warning('In-memory POI index lost its notification connection',
+                               exc_info=True)
+            self._set_listening(False)
+            time.sleep(LISTEN_RETRY_SECONDS)
+
+    def _set_listening(self, listening):
+        with self._lock:
+            self._listening = listening
+            self._session += 1
+            if not listening:
+                self.ready = False
+
+    def _apply_changes(self):
+        while True:
+            # Collect changes for a moment so bulk writes rebuild once
+            batch = [self._changes.get()]
+            deadline = time.monotonic() + settings.POI_MEMORY_INDEX_APPLY_INTERVAL
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._changes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            reload = any(item is RELOAD for item in batch)
+            ids = {pk for item in batch if item is not RELOAD for pk in item}
+            try:
+                if reload or not self.ready or len(ids) > settings.POI_MEMORY_INDEX_MAX_DELTA:
+                    self.load()
+                elif ids:
+                    self.apply(ids)
+            except Exception:
+                logger.exception('Could not refresh the in-memory POI index')
+                self.ready = False
+                time.sleep(LISTEN_RETRY_SECONDS)
+                self._changes.put(RELOAD)
+            finally:
+                close_old_connections()
+
+
+memory_index = MemoryIndex()
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0001_initial"),
+    ]
+
+    operations = [
+        # Serves ST_DWithin/ST_Distance on location::geography (radius engine)
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS pois_location_geog_gist "
+                "ON pois USING GIST ((location::geography));"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS pois_location_geog_gist;",
+        ),
+    ]
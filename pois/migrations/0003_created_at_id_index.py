@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0002_location_geography_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pointofinterest",
+            index=models.Index(
+                fields=["created_at", "id"], name="pois_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0003_created_at_id_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pointofinterest",
+            index=models.Index(
+                fields=["updated_at", "id"], name="pois_updated_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+# Existing (name, location) duplicates would make the constraint fail with a
+# bare unique violation; stop first with a count and the query that lists them
+# (see "Sample Data" in the README). No rows are touched.
+CHECK_DUPLICATES_SQL = """
+DO $$
+DECLARE
+    duplicates bigint;
+BEGIN
+    SELECT count(*) INTO duplicates FROM (
+        SELECT 1 FROM pois GROUP BY name, location HAVING count(*) > 1
+    ) AS groups;
+    IF duplicates > 0 THEN
+        RAISE EXCEPTION '% (name, location) pairs occur more than once in pois', duplicates
+            USING HINT = 'List them with: SELECT name, ST_AsText(location), '
+                         'array_agg(id ORDER BY id) FROM pois GROUP BY name, location '
+                         'HAVING count(*) > 1; then merge, rename or delete them and '
+                         'migrate again.';
+    END IF;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0004_updated_at_id_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CHECK_DUPLICATES_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="pointofinterest",
+            constraint=models.UniqueConstraint(
+                fields=("name", "location"), name="pois_name_location_uniq"
+            ),
+        ),
+    ]
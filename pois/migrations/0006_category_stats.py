@@ -0,0 +1,108 @@
+from django.db import migrations, models
+
+# One function serves every trigger; each branch only reads the transition
+# tables its event provides. Rows are merged in category order so concurrent
+# statements lock summary rows without deadlocking. updated_at is now(), the
+# start time of the writing transaction rather than its commit time.
+STATS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION poi_category_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    delta text;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM poi_category_stats;
+        RETURN NULL;
+    END IF;
+
+    delta := CASE TG_OP
+        WHEN 'INSERT' THEN
+            'SELECT category, 1 AS n, rating, (rating IS NOT NULL)::int AS rated '
+            'FROM new_rows'
+        WHEN 'DELETE' THEN
+            'SELECT category, -1 AS n, -rating AS rating, '
+            '-(rating IS NOT NULL)::int AS rated FROM old_rows'
+        ELSE
+            'SELECT category, 1 AS n, rating, (rating IS NOT NULL)::int AS rated '
+            'FROM new_rows UNION ALL '
+            'SELECT category, -1, -rating, -(rating IS NOT NULL)::int FROM old_rows'
+    END;
+
+    -- Updates touching neither category nor rating leave the totals alone
+    EXECUTE
+        'INSERT INTO poi_category_stats AS s '
+        '(category, poi_count, rating_sum, rating_count, updated_at) '
+        'SELECT category, sum(n), coalesce(sum(rating), 0), sum(rated), now() '
+        'FROM (' || delta || ') AS delta GROUP BY category '
+        'HAVING sum(n) <> 0 OR coalesce(sum(rating), 0) <> 0 OR sum(rated) <> 0 '
+        'ORDER BY category '
+        'ON CONFLICT (category) DO UPDATE SET '
+        'poi_count = s.poi_count + EXCLUDED.poi_count, '
+        'rating_sum = s.rating_sum + EXCLUDED.rating_sum, '
+        'rating_count = s.rating_count + EXCLUDED.rating_count, '
+        'updated_at = EXCLUDED.updated_at';
+    RETURN NULL;
+END;
+$$;
+"""
+
+TRIGGERS_SQL = """
+LOCK TABLE pois IN SHARE ROW EXCLUSIVE MODE;
+
+CREATE TRIGGER pois_category_stats_insert
+    AFTER INSERT ON pois REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_category_stats_apply();
+CREATE TRIGGER pois_category_stats_update
+    AFTER UPDATE ON pois REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_category_stats_apply();
+CREATE TRIGGER pois_category_stats_delete
+    AFTER DELETE ON pois REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_category_stats_apply();
+CREATE TRIGGER pois_category_stats_truncate
+    AFTER TRUNCATE ON pois
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_category_stats_apply();
+
+-- Backfill under the lock, so no write lands between it and the triggers;
+-- updated_at is the migration transaction's start time
+INSERT INTO poi_category_stats (category, poi_count, rating_sum, rating_count, updated_at)
+SELECT category, count(*), coalesce(sum(rating), 0), count(rating), now()
+FROM pois GROUP BY category;
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS pois_category_stats_insert ON pois;
+DROP TRIGGER IF EXISTS pois_category_stats_update ON pois;
+DROP TRIGGER IF EXISTS pois_category_stats_delete ON pois;
+DROP TRIGGER IF EXISTS pois_category_stats_truncate ON pois;
+DROP FUNCTION IF EXISTS poi_category_stats_apply();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0005_name_location_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryStats",
+            fields=[
+                (
+                    "category",
+                    models.CharField(max_length=20, primary_key=True, serialize=False),
+                ),
+                ("poi_count", models.BigIntegerField(default=0)),
+                (
+                    "rating_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("rating_count", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "poi_category_stats",
+            },
+        ),
+        migrations.RunSQL(sql=STATS_FUNCTION_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.RunSQL(sql=TRIGGERS_SQL, reverse_sql=DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,22 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0006_category_stats"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="pointofinterest",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass("name", name="gin_trgm_ops"),
+                django.contrib.postgres.indexes.OpClass("address", name="gin_trgm_ops"),
+                django.contrib.postgres.indexes.OpClass("description", name="gin_trgm_ops"),
+                name="pois_text_trgm_idx",
+            ),
+        ),
+    ]
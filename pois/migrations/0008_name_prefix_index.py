@@ -0,0 +1,21 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0007_text_trigram_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pointofinterest",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower("name"), name="text_pattern_ops"
+                ),
+                name="pois_name_prefix_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# Statement-level, so a bulk write sends one notification per 500 changed ids
+# (well under the 8000 byte payload limit) rather than one per row. Identical
+# payloads within a transaction are collapsed by Postgres.
+NOTIFY_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION poi_notify_changes() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('poi_changes', '{"truncate": true}');
+        RETURN NULL;
+    END IF;
+
+    EXECUTE
+        'SELECT pg_notify(''poi_changes'', json_build_object(''ids'', array_agg(id))::text) '
+        'FROM (SELECT id, (row_number() OVER () - 1) / 500 AS batch FROM '
+        || CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END
+        || ') AS changed GROUP BY batch';
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER pois_notify_insert
+    AFTER INSERT ON pois REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_notify_changes();
+CREATE TRIGGER pois_notify_update
+    AFTER UPDATE ON pois REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_notify_changes();
+CREATE TRIGGER pois_notify_delete
+    AFTER DELETE ON pois REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_notify_changes();
+CREATE TRIGGER pois_notify_truncate
+    AFTER TRUNCATE ON pois
+    FOR EACH STATEMENT EXECUTE FUNCTION poi_notify_changes();
+"""
+
+DROP_NOTIFY_SQL = """
+DROP TRIGGER IF EXISTS pois_notify_insert ON pois;
+DROP TRIGGER IF EXISTS pois_notify_update ON pois;
+DROP TRIGGER IF EXISTS pois_notify_delete ON pois;
+DROP TRIGGER IF EXISTS pois_notify_truncate ON pois;
+DROP FUNCTION IF EXISTS poi_notify_changes();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pois", "0008_name_prefix_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=NOTIFY_FUNCTION_SQL, reverse_sql=DROP_NOTIFY_SQL),
+    ]
@@ -3,7 +3,9 @@ Point of Interest model with spatial indexing for high-performance queries.
 """
 from django.contrib.gis.db import models
 from django.contrib.gis.geos import Point
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 
@@ -57,11 +59,46 @@ class PointOfInterest(models.Model):
         indexes = [
             models.Index(fields=['category', 'created_at']),
             models.Index(fields=['rating', 'category']),
+            # Keyset pagination for list: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['created_at', 'id'], name='pois_created_id_idx'),
+            # Streaming export: updated_since filter, ORDER BY updated_at, id
+            models.Index(fields=['updated_at', 'id'], name='pois_updated_id_idx'),
+            # Text search (and admin ILIKE search): trigram similarity on
+            # any of the three columns
+            GinIndex(
+                OpClass('name', name='gin_trgm_ops'),
+                OpClass('address', name='gin_trgm_ops'),
+                OpClass('description', name='gin_trgm_ops'),
+                name='pois_text_trgm_idx',
+            ),
+            # Autocomplete: lower(name) LIKE 'prefix%' as an index range scan
+            models.Index(
+                OpClass(Lower('name'), name='text_pattern_ops'),
+                name='pois_name_prefix_idx',
+            ),
+        ]
+        constraints = [
+            # Deduplication key for bulk loads (INSERT ... ON CONFLICT)
+            models.UniqueConstraint(
+                fields=['name', 'location'], name='pois_name_location_uniq'
+            ),
         ]
         # Spatial indexes are created automatically by GeoDjango
         # GIST index on location field for spatial queries
         # SP-GIST index will be created manually in migrations
+        # Functional GIST index on location::geography (migration 0002)
         
+    # Location as read from the database; cache invalidation uses it to
+    # evict the cells a moved POI leaves
+    _loaded_location = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'location' in instance.__dict__:
+            instance._loaded_location = instance.location
+        return instance
+    
     def __str__(self):
         return f"{self.name} ({self.category})"
     
@@ -87,4 +124,28 @@ class PointOfInterest(models.Model):
         """Get coordinates as tuple (longitude, latitude)."""
         if self.location:
             return (self.location.x, self.location.y)
-        return None 
\ No newline at end of file
+        return None
+
+
+class CategoryStats(models.Model):
+    """
+    Per-category POI totals for the stats endpoint.
+    
+    Rows are maintained by statement-level triggers on ``pois`` (migration
+    0006), so inserts, updates, deletes and COPY loads all keep them exact
+    and reading statistics never scans the POI table.
+    """
+    
+    category = models.CharField(max_length=20, primary_key=True)
+    poi_count = models.BigIntegerField(default=0)
+    # Sum and count of non-null ratings, for the average
+    rating_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    rating_count = models.BigIntegerField(default=0)
+    # Start time (now()) of the transaction that last changed these totals, not its commit time
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'poi_category_stats'
+    
+    def __str__(self):
+        return f"{self.category}: {self.poi_count}"
@@ -0,0 +1,225 @@
+"""
+Keyset (cursor) pagination for POI endpoints.
+
+Pages are selected with a row-value comparison on the ordering key, e.g.
+``WHERE (created_at, id) < (%s, %s) ORDER BY created_at DESC, id DESC LIMIT n``,
+so every page is a bounded index range scan instead of an OFFSET and page 500
+costs the same as page 1. Cursors are opaque base64-encoded JSON positions.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import BooleanField, F, Func, Value
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowCompare(Func):
+    """Row-value comparison ``(a, b) > (x, y)`` usable as an index seek."""
+    output_field = BooleanField()
+
+    def __init__(self, lhs, rhs, operator):
+        self.operator = operator
+        super().__init__(*lhs, *rhs)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        parts, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            parts.append(sql)
+            params.extend(expression_params)
+        half = len(parts) // 2
+        lhs, rhs = ', '.join(parts[:half]), ', '.join(parts[half:])
+        return f'(({lhs}) {self.operator} ({rhs}))', params
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``ordering``.
+
+    All ordering fields must sort in the same direction and the last one must
+    be unique (``id``) so positions are total.
+    """
+
+    ordering = ()
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 100
+        self.max_page_size = settings.POI_MAX_PAGE_SIZE
+        self.next_position = None
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    @property
+    def descending(self):
+        return self.ordering[0].startswith('-')
+
+    def parse_position(self, values):
+        """Convert decoded cursor values back to database values."""
+        return values
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return tuple(self.parse_position(values))
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        values = [v.isoformat() if isinstance(v, datetime) else v for v in position]
+        payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def get_position(self, item):
+        if isinstance(item, dict):
+            return tuple(item[field] for field in self.fields)
+        return tuple(getattr(item, field) for field in self.fields)
+
+    def filter_queryset(self, queryset, position):
+        """Restrict ``queryset`` to rows strictly after ``position``."""
+        return queryset.filter(RowCompare(
+            [F(field) for field in self.fields],
+            [Value(value) for value in position],
+            '<' if self.descending else '>',
+        ))
+
+    def page_queryset(self, queryset, request):
+        """
+        Slice ``queryset`` to the requested page plus one lookahead row.
+
+        Evaluate it (sync or async) and pass the rows to ``paginate_rows``.
+        """
+        self.request = request
+        self.current_page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = self.filter_queryset(queryset, position)
+
+        # Fetch one extra row to learn whether a next page exists
+        return queryset.order_by(*self.ordering)[:self.current_page_size + 1]
+
+    def paginate_rows(self, rows):
+        """Drop the lookahead row from ``page_queryset`` results."""
+        page = rows[:self.current_page_size]
+        if len(rows) > self.current_page_size:
+            self.next_position = self.get_position(page[-1])
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.page_queryset(queryset, request)))
+
+    def paginate_sequence(self, items, request):
+        """Keyset-paginate rows already sorted by ``ordering`` in process."""
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            if self.descending:
+                items = [item for item in items if self.get_position(item) < position]
+            else:
+                items = [item for item in items if self.get_position(item) > position]
+
+        page = items[:page_size]
+        if len(items) > page_size:
+            self.next_position = self.get_position(page[-1])
+        return page
+
+    def get_next_cursor(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned as "next" by the previous page',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Results per page (max {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Newest first, keyed on (created_at, id); served by ``pois_created_id_idx``."""
+
+    ordering = ('-created_at', '-id')
+
+    def parse_position(self, values):
+        created_at = parse_datetime(values[0])
+        if created_at is None:
+            raise ValueError(values[0])
+        return created_at, int(values[1])
+
+
+class DistanceKeysetPagination(KeysetPagination):
+    """Nearest first, keyed on the ``distance_m`` annotation and id."""
+
+    ordering = ('distance_m', 'id')
+
+    def parse_position(self, values):
+        return float(values[0]), int(values[1])
+
+
+class RoutePositionKeysetPagination(KeysetPagination):
+    """Along a route, keyed on the ``route_position`` annotation and id."""
+
+    ordering = ('route_position', 'id')
+
+    def parse_position(self, values):
+        return float(values[0]), int(values[1])
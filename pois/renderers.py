@@ -0,0 +1,34 @@
+"""
+Response renderers for the POI API.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, falling back to the stock renderer.
+
+    Output matches ``JSONRenderer`` with the default (compact, unicode,
+    strict) settings: types orjson cannot encode natively go through DRF's
+    encoder, UTC datetimes end in ``Z`` and U+2028/U+2029 are escaped.
+    """
+
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        # Same escaping as JSONRenderer: these are invalid in JavaScript strings
+        return content.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,104 @@
+"""
+Text search building blocks for the POI API.
+
+Matches use pg_trgm word similarity (``q <% column``) on name, address and
+description, all served by the multicolumn ``pois_text_trgm_idx`` GIN index,
+so misspellings and partial words still match. Combined with a radius or
+bbox filter on the GIST indexes, the planner scans whichever index is more
+selective for the query, or ANDs both bitmaps: "pizza" near a city centre
+starts from the few POIs nearby, a rare name from its few trigram matches.
+
+Autocomplete is a cheaper path for typeahead: a ``lower(name) LIKE 'prefix%'``
+range scan on the ``text_pattern_ops`` index, or a KNN walk of the geography
+index filtered on the prefix, bounded to a small pool of nearest matches that
+is then ranked by proximity and rating.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import Greatest, Lower
+
+from .spatial import STX, STY, AsGeography, KNNDistance, make_point
+
+# Weight of a match in each column, relative to a match in the name
+SEARCH_COLUMN_WEIGHTS = (('name', 1.0), ('address', 0.6), ('description', 0.4))
+
+
+def text_search(queryset, q):
+    """
+    Filter ``queryset`` to trigram matches of ``q``.
+
+    Adds a ``text_score`` annotation (0-1): the best weighted word similarity
+    of ``q`` across the searched columns.
+    """
+    matches = Q()
+    for column, _ in SEARCH_COLUMN_WEIGHTS:
+        matches |= Q(**{f'{column}__trigram_word_similar': q})
+    return queryset.filter(matches).annotate(text_score=Greatest(*(
+        TrigramWordSimilarity(q, column) * Value(weight)
+        for column, weight in SEARCH_COLUMN_WEIGHTS
+    )))
+
+
+def rank_by_proximity(queryset, radius_km):
+    """
+    Add a ``rank`` annotation blending ``text_score`` with proximity.
+
+    Proximity falls linearly from 1 at the centre to 0 at ``radius_km``;
+    ``POI_SEARCH_TEXT_WEIGHT`` is the share given to text similarity.
+    ``queryset`` must carry ``text_score`` and ``distance_m``.
+    """
+    weight = settings.POI_SEARCH_TEXT_WEIGHT
+    proximity = Value(1.0) - F('distance_m') / Value(radius_km * 1000)
+    return queryset.annotate(rank=ExpressionWrapper(
+        Value(weight) * F('text_score') + Value(1 - weight) * proximity,
+        output_field=FloatField()
+    ))
+
+
+def autocomplete_candidates(queryset, prefix, lng, lat, pool):
+    """
+    The ``pool`` POIs nearest to (lng, lat) whose name starts with ``prefix``.
+
+    Case-insensitive; rows are dicts with ``id``, ``name``, ``category``,
+    ``rating``, ``lng``, ``lat`` and ``distance_m`` (sphere metres).
+    """
+    location = AsGeography(F('location'))
+    target = AsGeography(make_point(lng, lat))
+    return queryset.annotate(
+        name_lower=Lower('name')
+    ).filter(
+        name_lower__startswith=prefix.lower()
+    ).annotate(
+        distance_m=KNNDistance(location, target)
+    ).order_by('distance_m').values(
+        'id', 'name', 'category', 'rating', 'distance_m',
+        lng=STX('location'), lat=STY('location')
+    )[:pool]
+
+
+def rank_completions(rows, limit):
+    """
+    Order candidate rows by proximity and rating; return the top ``limit``.
+
+    Proximity halves every ``POI_AUTOCOMPLETE_DISTANCE_SCALE_KM``;
+    ``POI_AUTOCOMPLETE_RATING_WEIGHT`` is the share given to rating.
+    """
+    scale_m = settings.POI_AUTOCOMPLETE_DISTANCE_SCALE_KM * 1000
+    weight = settings.POI_AUTOCOMPLETE_RATING_WEIGHT
+
+    def score(row):
+        proximity = 1 / (1 + row['distance_m'] / scale_m)
+        rating = float(row['rating'] or 0) / 5
+        return (1 - weight) * proximity + weight * rating
+
+    ranked = sorted(rows, key=lambda row: (-score(row), row['id']))[:limit]
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'category': row['category'],
+            'coordinates': [row['lng'], row['lat']],
+        }
+        for row in ranked
+    ]
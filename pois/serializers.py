@@ -1,10 +1,44 @@
 """
 Serializers for Point of Interest API.
 """
+import numpy as np
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.gis.geos import Point
-from django.contrib.gis.db.models.functions import Distance
+from django.utils import timezone
 from .models import PointOfInterest
+from .cache import normalize_radius_query
+from .spatial import (
+    GRID_SHAPES, HEX_GRID, RADIUS_ENGINES, STX, STY, bounding_box, decode_polyline,
+    grid_cell_count, grid_cell_size
+)
+
+DUPLICATE_POI_MESSAGE = "A POI with this name already exists at these coordinates"
+
+
+class BBoxField(serializers.CharField):
+    """
+    Bounding box given as ``min_lng,min_lat,max_lng,max_lat``.
+    """
+    
+    default_error_messages = {
+        'invalid_bbox': 'Expected "min_lng,min_lat,max_lng,max_lat".',
+        'out_of_range': 'Bounding box must lie within [-180,-90,180,90] with min < max.',
+    }
+    
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            bbox = tuple(float(part) for part in value.split(','))
+        except ValueError:
+            self.fail('invalid_bbox')
+        if len(bbox) != 4:
+            self.fail('invalid_bbox')
+        
+        min_lng, min_lat, max_lng, max_lat = bbox
+        if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+            self.fail('out_of_range')
+        return bbox
 
 
 class PointOfInterestSerializer(serializers.ModelSerializer):
@@ -15,6 +49,7 @@ class PointOfInterestSerializer(serializers.ModelSerializer):
     - Distance calculation from query point
     - Optimized field selection for performance
     - Coordinate formatting for API responses
+    - Sparse fieldsets via the ``fields`` argument
     """
     
     distance_km = serializers.SerializerMethodField()
@@ -29,11 +64,30 @@ class PointOfInterestSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    def __init__(self, *args, **kwargs):
+        # Optional subset of Meta.fields to output
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+    
+    def validate(self, data):
+        """Reject renames onto another POI's (name, location) uniqueness key."""
+        name = data.get('name')
+        if self.instance is not None and name is not None and self.instance.location:
+            if PointOfInterest.objects.filter(
+                name=name, location=self.instance.location
+            ).exclude(pk=self.instance.pk).exists():
+                raise serializers.ValidationError(DUPLICATE_POI_MESSAGE)
+        return data
+    
     def get_distance_km(self, obj):
         """Calculate distance in kilometers from query point."""
-        if hasattr(obj, 'distance') and obj.distance is not None:
+        distance_m = getattr(obj, 'distance_m', None)
+        if distance_m is not None:
             # Convert meters to kilometers
-            return round(obj.distance.km, 2)
+            return round(distance_m / 1000, 2)
         return None
     
     def get_coordinates(self, obj):
@@ -43,6 +97,136 @@ class PointOfInterestSerializer(serializers.ModelSerializer):
         return None
 
 
+# Named field sets for the ``profile`` query parameter; None means all fields
+RESPONSE_PROFILES = {
+    'full': None,
+    'slim': ('id', 'name', 'category', 'rating', 'coordinates', 'distance_km'),
+}
+
+# Model columns behind response fields that are not plain columns
+FIELD_COLUMNS = {'coordinates': 'location', 'distance_km': None}
+
+
+def requested_fields(query_params):
+    """
+    Response fields selected by ``fields`` or ``profile``; None for all.
+    
+    ``fields`` (comma separated) takes precedence over ``profile``; ``id`` is
+    always included. Fields keep the serializer's order.
+    """
+    available = PointOfInterestSerializer.Meta.fields
+    if query_params.get('fields'):
+        requested = {name.strip() for name in query_params['fields'].split(',') if name.strip()}
+        unknown = requested - set(available)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': [f"Unknown fields: {', '.join(sorted(unknown))}. "
+                           f"Choose from: {', '.join(available)}."]
+            })
+    else:
+        profile = query_params.get('profile', 'full')
+        if profile not in RESPONSE_PROFILES:
+            raise serializers.ValidationError({
+                'profile': [f"Choose one of: {', '.join(RESPONSE_PROFILES)}."]
+            })
+        requested = RESPONSE_PROFILES[profile]
+        if requested is None:
+            return None
+    
+    requested = set(requested) | {'id'}
+    return tuple(name for name in available if name in requested)
+
+
+def model_columns(fields):
+    """Model columns that must be loaded to render ``fields``."""
+    columns = (FIELD_COLUMNS.get(name, name) for name in fields)
+    return [column for column in columns if column is not None]
+
+
+# Columns read by the serializer-free fast path, in response order
+FAST_PATH_FIELDS = (
+    'id', 'name', 'category', 'description', 'address', 'phone', 'website',
+    'rating', 'created_at'
+)
+
+
+def fast_point_rows(queryset, fields=None):
+    """
+    Read radius results as plain dicts for ``fast_point_representation``.
+    
+    Coordinates come from ST_X / ST_Y in SQL; ``queryset`` must carry the
+    ``distance_m`` annotation. With ``fields``, only their columns are read.
+    """
+    if fields is None:
+        return queryset.values(
+            *FAST_PATH_FIELDS, 'distance_m', lng=STX('location'), lat=STY('location')
+        )
+    
+    columns = [name for name in FAST_PATH_FIELDS if name in fields]
+    coordinates = {}
+    if 'coordinates' in fields:
+        coordinates = {'lng': STX('location'), 'lat': STY('location')}
+    return queryset.values(*columns, 'distance_m', **coordinates)
+
+
+def _datetime_representation(value):
+    # Same output as DRF's DateTimeField with the default ISO 8601 format
+    if value is None:
+        return None
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _rating_representation(rating):
+    # Same output as DRF's DecimalField (coerced to a string)
+    return None if rating is None else '{:f}'.format(rating)
+
+
+def _distance_representation(distance_m):
+    return None if distance_m is None else round(distance_m / 1000, 2)
+
+
+# Builders for sparse fast-path rows, one per response field
+FAST_FIELD_BUILDERS = {
+    'rating': lambda row: _rating_representation(row['rating']),
+    'coordinates': lambda row: [row['lng'], row['lat']],
+    'distance_km': lambda row: _distance_representation(row['distance_m']),
+    'created_at': lambda row: _datetime_representation(row['created_at']),
+}
+
+
+def fast_point_representation(row, fields=None):
+    """
+    Build the ``PointOfInterestSerializer`` output for a ``fast_point_rows`` row.
+    
+    No model instance, GEOS geometry or field machinery is involved; ratings
+    are rendered as strings the way DRF's DecimalField does.
+    """
+    if fields is not None:
+        return {
+            name: FAST_FIELD_BUILDERS[name](row) if name in FAST_FIELD_BUILDERS else row[name]
+            for name in fields
+        }
+    
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'category': row['category'],
+        'description': row['description'],
+        'address': row['address'],
+        'phone': row['phone'],
+        'website': row['website'],
+        'rating': _rating_representation(row['rating']),
+        'coordinates': [row['lng'], row['lat']],
+        'distance_km': _distance_representation(row['distance_m']),
+        'created_at': _datetime_representation(row['created_at']),
+    }
+
+
 class PointOfInterestCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating Point of Interest with coordinate validation.
@@ -78,6 +262,15 @@ class PointOfInterestCreateSerializer(serializers.ModelSerializer):
         
         return value
     
+    def validate(self, data):
+        """Reject duplicates of the (name, location) uniqueness key."""
+        longitude, latitude = data['coordinates']
+        if PointOfInterest.objects.filter(
+            name=data['name'], location=Point(longitude, latitude, srid=4326)
+        ).exists():
+            raise serializers.ValidationError(DUPLICATE_POI_MESSAGE)
+        return data
+    
     def create(self, validated_data):
         """Create POI with proper Point object."""
         coordinates = validated_data.pop('coordinates')
@@ -92,6 +285,53 @@ class PointOfInterestCreateSerializer(serializers.ModelSerializer):
         )
 
 
+class PointOfInterestBulkItemSerializer(PointOfInterestCreateSerializer):
+    """
+    Per-item serializer for bulk upserts.
+    
+    Coordinate ranges are checked for the whole batch by
+    ``validate_coordinate_batch`` and existing (name, location) pairs are
+    updated rather than rejected.
+    """
+    
+    def validate_coordinates(self, value):
+        return value
+    
+    def validate(self, data):
+        return data
+
+
+def validate_coordinate_batch(items):
+    """
+    Range-check the ``coordinates`` of every item with one numpy comparison.
+    
+    Returns a list aligned with ``items`` holding an error message or None.
+    Structurally invalid coordinates are left to per-item validation.
+    """
+    errors = [None] * len(items)
+    positions, pairs = [], []
+    for index, item in enumerate(items):
+        try:
+            longitude, latitude = (float(v) for v in item['coordinates'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        positions.append(index)
+        pairs.append((longitude, latitude))
+    if not pairs:
+        return errors
+    
+    coordinates = np.array(pairs, dtype=np.float64)
+    # Negated so NaN, which fails every comparison, is out of range too
+    bad_longitude = ~((coordinates[:, 0] >= -180) & (coordinates[:, 0] <= 180))
+    bad_latitude = ~((coordinates[:, 1] >= -90) & (coordinates[:, 1] <= 90))
+    for row in np.flatnonzero(bad_longitude | bad_latitude):
+        errors[positions[row]] = (
+            "Longitude must be between -180 and 180 degrees" if bad_longitude[row]
+            else "Latitude must be between -90 and 90 degrees"
+        )
+    return errors
+
+
 class RadiusQuerySerializer(serializers.Serializer):
     """
     Serializer for radius query parameters with validation.
@@ -124,6 +364,11 @@ class RadiusQuerySerializer(serializers.Serializer):
         required=False,
         help_text="Minimum rating filter"
     )
+    engine = serializers.ChoiceField(
+        choices=RADIUS_ENGINES,
+        required=False,
+        help_text="Radius engine (defaults to POI_RADIUS_ENGINE)"
+    )
     
     def validate(self, data):
         """Additional validation for query parameters."""
@@ -132,4 +377,448 @@ class RadiusQuerySerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 "Radius cannot exceed 100 km for performance reasons"
             )
-        return data 
\ No newline at end of file
+        
+        # Snapped (lng, lat, radius_km) superset served from cache, unless
+        # the client pinned an engine
+        data['superset'] = None
+        if not data.get('engine'):
+            data['superset'] = normalize_radius_query(
+                data['lng'], data['lat'], data.get('radius_km', 10)
+            )
+        return data 
+
+
+class NearestQuerySerializer(serializers.Serializer):
+    """
+    Serializer for k-nearest-neighbour query parameters.
+    """
+    
+    lat = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
+        help_text="Latitude of the center point"
+    )
+    lng = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
+        help_text="Longitude of the center point"
+    )
+    k = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text="Number of nearest POIs to return"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """
+    Serializer for streaming export parameters.
+    """
+    
+    output = serializers.ChoiceField(
+        choices=['geojson', 'ndjson'],
+        default='geojson',
+        help_text="GeoJSON FeatureCollection or newline-delimited Features"
+    )
+    bbox = BBoxField(
+        required=False,
+        help_text="Restrict to min_lng,min_lat,max_lng,max_lat"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    updated_since = serializers.DateTimeField(
+        required=False,
+        help_text="Only POIs updated at or after this time"
+    )
+
+
+class BBoxQuerySerializer(serializers.Serializer):
+    """
+    Serializer for map viewport query parameters.
+    """
+    
+    bbox = BBoxField(help_text="Viewport as min_lng,min_lat,max_lng,max_lat")
+    zoom = serializers.IntegerField(
+        min_value=0,
+        max_value=22,
+        help_text="Map zoom level; sets the cluster grid size"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
+
+
+class RadiusBatchItemSerializer(serializers.Serializer):
+    """
+    One radius query of a batch.
+    """
+    
+    lat = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
+        help_text="Latitude of the center point"
+    )
+    lng = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
+        help_text="Longitude of the center point"
+    )
+    radius_km = serializers.FloatField(
+        min_value=0.1,
+        max_value=100,
+        default=10.0,
+        help_text="Search radius in kilometers"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        required=False,
+        help_text="Nearest POIs returned for this query (defaults to the batch limit)"
+    )
+
+
+class RadiusBatchSerializer(serializers.Serializer):
+    """
+    Serializer for batch radius search bodies.
+    """
+    
+    queries = RadiusBatchItemSerializer(many=True, allow_empty=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text="Nearest POIs returned per query"
+    )
+    dedupe = serializers.BooleanField(
+        default=False,
+        help_text="Return each POI only for the first query that found it"
+    )
+    
+    def validate_queries(self, value):
+        if len(value) > settings.POI_BATCH_MAX_QUERIES:
+            raise serializers.ValidationError(
+                f"At most {settings.POI_BATCH_MAX_QUERIES} queries per batch."
+            )
+        return value
+    
+    def validate(self, data):
+        for query in data['queries']:
+            query.setdefault('limit', data['limit'])
+        return data
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """
+    Serializer for text search parameters.
+    
+    An optional spatial constraint is either ``bbox`` or a
+    ``lat``/``lng``/``radius_km`` circle.
+    """
+    
+    q = serializers.CharField(
+        min_length=2,
+        max_length=200,
+        help_text="Text matched against name, address and description"
+    )
+    bbox = BBoxField(
+        required=False,
+        help_text="Restrict to min_lng,min_lat,max_lng,max_lat"
+    )
+    lat = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
+        required=False,
+        help_text="Latitude of the center point (with lng and radius_km)"
+    )
+    lng = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
+        required=False,
+        help_text="Longitude of the center point (with lat and radius_km)"
+    )
+    radius_km = serializers.FloatField(
+        min_value=0.1,
+        max_value=100,
+        required=False,
+        help_text="Search radius in kilometers"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text="Number of results"
+    )
+    
+    def validate(self, data):
+        """Allow at most one spatial constraint, and only a complete circle."""
+        circle = [data.get(key) is not None for key in ('lat', 'lng', 'radius_km')]
+        if any(circle) and not all(circle):
+            raise serializers.ValidationError(
+                "lat, lng and radius_km must be given together"
+            )
+        if all(circle) and data.get('bbox') is not None:
+            raise serializers.ValidationError(
+                "Give either bbox or lat/lng/radius_km, not both"
+            )
+        return data
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    """
+    Serializer for name autocomplete parameters.
+    
+    Adds ``center``: (lng, lat) snapped to ``POI_AUTOCOMPLETE_SNAP_DEGREES``,
+    which completions are ranked and cached by.
+    """
+    
+    q = serializers.CharField(
+        min_length=1,
+        max_length=100,
+        trim_whitespace=False,
+        help_text="Name prefix typed so far"
+    )
+    lat = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
+        help_text="Latitude of the user"
+    )
+    lng = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
+        help_text="Longitude of the user"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=20,
+        default=8,
+        help_text="Number of completions"
+    )
+    
+    def validate(self, data):
+        step = settings.POI_AUTOCOMPLETE_SNAP_DEGREES
+        lng, lat = data['lng'], data['lat']
+        if step > 0:
+            lng = max(min(round(lng / step) * step, 180.0), -180.0)
+            lat = max(min(round(lat / step) * step, 90.0), -90.0)
+        data['center'] = (round(lng, 6), round(lat, 6))
+        return data
+
+
+class CorridorQuerySerializer(serializers.Serializer):
+    """
+    Serializer for corridor (along-a-route) query parameters.
+    
+    The route is an encoded ``polyline`` or a GeoJSON LineString; either is
+    decoded to (lng, lat) pairs in ``line``.
+    """
+    
+    polyline = serializers.CharField(
+        required=False,
+        trim_whitespace=False,
+        help_text="Route as an encoded polyline"
+    )
+    precision = serializers.ChoiceField(
+        choices=[5, 6],
+        default=5,
+        help_text="Encoded polyline precision (decimal places)"
+    )
+    geojson = serializers.JSONField(
+        required=False,
+        help_text="Route as a GeoJSON LineString"
+    )
+    distance_km = serializers.FloatField(
+        min_value=0.01,
+        max_value=50,
+        default=2.0,
+        help_text="Corridor half-width: distance from the route in kilometers"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
+    
+    def validate(self, data):
+        """Decode the route to (lng, lat) pairs and check its vertices."""
+        if ('polyline' in data) == ('geojson' in data):
+            raise serializers.ValidationError("Give exactly one of polyline or geojson")
+        
+        if 'polyline' in data:
+            try:
+                line = decode_polyline(data['polyline'], int(data['precision']))
+            except ValueError as exc:
+                raise serializers.ValidationError({'polyline': str(exc)})
+        else:
+            geometry = data['geojson']
+            if not isinstance(geometry, dict) or geometry.get('type') != 'LineString':
+                raise serializers.ValidationError({'geojson': "Expected a GeoJSON LineString"})
+            try:
+                line = [(float(point[0]), float(point[1])) for point in geometry['coordinates']]
+            except (KeyError, IndexError, TypeError, ValueError):
+                raise serializers.ValidationError({'geojson': "Invalid LineString coordinates"})
+        
+        if len(line) < 2:
+            raise serializers.ValidationError("A route needs at least 2 points")
+        if len(line) > settings.POI_CORRIDOR_MAX_POINTS:
+            raise serializers.ValidationError(
+                f"A route may have at most {settings.POI_CORRIDOR_MAX_POINTS} points"
+            )
+        if not all(-180 <= lng <= 180 and -90 <= lat <= 90 for lng, lat in line):
+            raise serializers.ValidationError("Route coordinates out of range")
+        
+        data['line'] = line
+        return data
+
+
+class AggregateQuerySerializer(serializers.Serializer):
+    """
+    Serializer for density aggregate parameters.
+    
+    The region is either ``bbox`` or a ``lat``/``lng``/``radius_km`` circle.
+    Adds ``region`` (the bbox grid cells are counted over) and ``cell_size``
+    (Web Mercator metres) to the validated data.
+    """
+    
+    bbox = BBoxField(
+        required=False,
+        help_text="Region as min_lng,min_lat,max_lng,max_lat"
+    )
+    lat = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
+        required=False,
+        help_text="Latitude of the region centre (with lng and radius_km)"
+    )
+    lng = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
+        required=False,
+        help_text="Longitude of the region centre (with lat and radius_km)"
+    )
+    radius_km = serializers.FloatField(
+        min_value=0.1,
+        max_value=100,
+        required=False,
+        help_text="Region radius in kilometers"
+    )
+    cell_km = serializers.FloatField(
+        min_value=0.01,
+        max_value=1000,
+        help_text="Cell size in kilometers (square side or hexagon edge)"
+    )
+    shape = serializers.ChoiceField(
+        choices=GRID_SHAPES,
+        default=HEX_GRID,
+        help_text="Grid cell shape"
+    )
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
+    
+    def validate(self, data):
+        """Require exactly one region and bound the number of cells."""
+        circle = [data.get(key) is not None for key in ('lat', 'lng', 'radius_km')]
+        if data.get('bbox') is not None:
+            if any(circle):
+                raise serializers.ValidationError(
+                    "Give either bbox or lat/lng/radius_km, not both"
+                )
+            region = data['bbox']
+        elif all(circle):
+            region = bounding_box(data['lng'], data['lat'], data['radius_km'] * 1000)
+        else:
+            raise serializers.ValidationError(
+                "A region is required: bbox or lat, lng and radius_km"
+            )
+        
+        data['region'] = region
+        data['cell_size'] = grid_cell_size(data['cell_km'], (region[1] + region[3]) / 2)
+        cells = grid_cell_count(region, data['cell_size'], data['shape'])
+        if cells > settings.POI_AGGREGATE_MAX_CELLS:
+            raise serializers.ValidationError(
+                f"Region would span about {cells} cells (max "
+                f"{settings.POI_AGGREGATE_MAX_CELLS}); use a larger cell_km or a smaller region"
+            )
+        return data
+
+
+class TileQuerySerializer(serializers.Serializer):
+    """
+    Serializer for vector tile filter parameters.
+    """
+    
+    category = serializers.ChoiceField(
+        choices=PointOfInterest.CATEGORY_CHOICES,
+        required=False,
+        help_text="Filter by POI category"
+    )
+    min_rating = serializers.FloatField(
+        min_value=0,
+        max_value=5,
+        required=False,
+        help_text="Minimum rating filter"
+    )
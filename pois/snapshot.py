@@ -0,0 +1,423 @@
+"""
+Memory-mapped POI snapshot files, for serving without a database.
+
+``manage.py export_snapshot`` writes every POI to one little-endian file:
+
+    b'POISNAP\\0' | format version (u32) | header length (u32) | JSON header
+    | column sections, each 64-byte aligned
+
+The JSON header records the row count, the extent coordinates were quantised
+over, the directory depth and each section's offset, dtype and length. Rows
+are sorted by the Morton (Z-order) code of their position quantised to 16
+bits per axis, so nearby points share pages. The ``directory`` section holds
+the first row of every cell of a coarser 2^bits x 2^bits grid: a cell's
+Morton code is the prefix of its points' codes, so each cell is one
+contiguous run of rows. Strings are stored as an offsets section plus one
+UTF-8 blob per column.
+
+Readers mmap the file read-only and view sections with ``np.frombuffer``, so
+opening one parses only the header and every process serving the same file
+shares one page-cached copy. Exports are written beside the target and
+renamed over it; readers notice the new file within
+``POI_SNAPSHOT_CHECK_INTERVAL`` seconds and map it, while requests in flight
+finish on the old mapping.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+
+from .memory_index import CATEGORY_CODES, CATEGORY_INDEX, NO_RATING, filter_rows, haversine_m, np
+from .spatial import EARTH_RADIUS_M, bounding_box
+
+MAGIC = b'POISNAP\0'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<8sII')
+SECTION_ALIGNMENT = 64
+
+# Positions are quantised to this many bits per axis over the data extent
+COORDINATE_BITS = 16
+COORDINATE_MAX = (1 << COORDINATE_BITS) - 1
+
+STRING_COLUMNS = ('name', 'description', 'address', 'phone', 'website')
+
+# Column order of the rows ``write_snapshot`` takes
+SNAPSHOT_ROW = (
+    'id', 'name', 'category', 'description', 'address', 'phone', 'website', 'rating',
+    'created_at', 'lng', 'lat'
+)
+
+# Fixed-width sections and their dtypes; strings get offsets and data sections
+COLUMN_DTYPES = {
+    'id': 'int64', 'lng': 'float64', 'lat': 'float64', 'category': 'int8', 'rating': 'int16',
+    'created_at': 'int64',
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class SnapshotError(Exception):
+    """The snapshot file is missing, unreadable or of an unknown format."""
+
+
+def _align(offset):
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+def _spread_bits(values):
+    # Interleave zeros between the low 16 bits: abcd -> 0a0b0c0d
+    values = values.astype(np.uint32)
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    return (values | (values << 1)) & 0x55555555
+
+
+def morton_codes(xs, ys):
+    """Z-order codes of quantised (x, y) cells."""
+    return _spread_bits(xs) | (_spread_bits(ys) << 1)
+
+
+def quantize(values, low, high):
+    """Map coordinates in [low, high] onto 0..COORDINATE_MAX."""
+    scale = COORDINATE_MAX / (high - low)
+    scaled = np.floor((np.asarray(values, dtype=np.float64) - low) * scale)
+    return np.clip(scaled, 0, COORDINATE_MAX).astype(np.uint32)
+
+
+def _column_chunks(rows, chunk_size):
+    """Transpose ``rows`` into per-column tuples, ``chunk_size`` rows at a time."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield dict(zip(SNAPSHOT_ROW, zip(*chunk)))
+
+
+def _gather_strings(data, offsets, order, block_size=65536):
+    """
+    Reorder the strings of a blob by ``order``.
+
+    Returns the reordered blob and its offsets. Byte indexes are built one
+    block of rows at a time, so they never cover the whole blob.
+    """
+    lengths = np.diff(offsets)[order]
+    new_offsets = np.zeros(len(order) + 1, dtype=np.uint64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    gathered = np.empty(int(new_offsets[-1]), dtype=np.uint8)
+    for start in range(0, len(order), block_size):
+        stop = min(start + block_size, len(order))
+        first, last = int(new_offsets[start]), int(new_offsets[stop])
+        block_lengths = lengths[start:stop]
+        # Source offset of each output byte: its row's start plus its position in the row
+        shift = offsets[order[start:stop]] - (new_offsets[start:stop].astype(np.int64) - first)
+        gathered[first:last] = data[
+            np.repeat(shift, block_lengths) + np.arange(last - first, dtype=np.int64)
+        ]
+    return gathered, new_offsets
+
+
+def write_snapshot(path, rows, directory_bits=10, chunk_size=10000):
+    """
+    Write ``rows`` (tuples in ``SNAPSHOT_ROW`` order) to a snapshot at ``path``.
+
+    ``rows`` may be any iterable, such as a chunked queryset iterator: each
+    chunk of ``chunk_size`` rows is converted into typed column buffers, so no
+    full list of rows is held. The file is written next to ``path`` and
+    renamed over it, so readers see either the old snapshot or the complete
+    new one. Returns the row count.
+    """
+    if not 1 <= directory_bits <= COORDINATE_BITS:
+        raise ValueError(f'directory_bits must be between 1 and {COORDINATE_BITS}')
+
+    chunks = {name: [np.empty(0, dtype=dtype)] for name, dtype in COLUMN_DTYPES.items()}
+    blobs = {column: bytearray() for column in STRING_COLUMNS}
+    lengths = {column: [np.empty(0, dtype=np.int64)] for column in STRING_COLUMNS}
+    for values in _column_chunks(rows, chunk_size):
+        chunks['id'].append(np.array(values['id'], dtype=np.int64))
+        chunks['lng'].append(np.array(values['lng'], dtype=np.float64))
+        chunks['lat'].append(np.array(values['lat'], dtype=np.float64))
+        chunks['category'].append(np.array(
+            [CATEGORY_INDEX[code] for code in values['category']], dtype=np.int8
+        ))
+        chunks['rating'].append(np.array(
+            [NO_RATING if rating is None else round(rating * 100) for rating in values['rating']],
+            dtype=np.int16
+        ))
+        chunks['created_at'].append(np.array(
+            [(value - EPOCH) // timedelta(microseconds=1) for value in values['created_at']],
+            dtype=np.int64
+        ))
+        for column in STRING_COLUMNS:
+            encoded = [(value or '').encode('utf-8') for value in values[column]]
+            lengths[column].append(np.array([len(value) for value in encoded], dtype=np.int64))
+            blobs[column] += b''.join(encoded)
+    columns = {name: np.concatenate(parts) for name, parts in chunks.items()}
+    del chunks
+    lngs, lats, ids = columns['lng'], columns['lat'], columns['id']
+
+    # Quantise over the data extent, padded so it never has zero width
+    if len(ids):
+        extent = [float(lngs.min()), float(lats.min()), float(lngs.max()), float(lats.max())]
+    else:
+        extent = [-180.0, -90.0, 180.0, 90.0]
+    for low, high in ((0, 2), (1, 3)):
+        if extent[high] - extent[low] < 1e-6:
+            extent[low] -= 1e-6
+            extent[high] += 1e-6
+    codes = morton_codes(
+        quantize(lngs, extent[0], extent[2]), quantize(lats, extent[1], extent[3])
+    )
+    order = np.lexsort((ids, codes))
+    codes = codes[order]
+
+    sections = {name: columns.pop(name)[order] for name in COLUMN_DTYPES}
+    for column in STRING_COLUMNS:
+        offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(np.concatenate(lengths.pop(column)), out=offsets[1:])
+        data = np.frombuffer(blobs.pop(column), dtype=np.uint8)
+        gathered, gathered_offsets = _gather_strings(data, offsets, order)
+        sections[f'{column}_offsets'] = gathered_offsets
+        sections[f'{column}_data'] = gathered
+    sections['directory'] = np.searchsorted(
+        codes >> (2 * (COORDINATE_BITS - directory_bits)),
+        np.arange((1 << (2 * directory_bits)) + 1, dtype=np.uint32)
+    ).astype(np.uint64)
+
+    # Section offsets are relative to the (aligned) end of the header
+    layout, offset = {}, 0
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        sections[name] = array
+        layout[name] = {'offset': offset, 'dtype': array.dtype.str, 'length': len(array)}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({
+        'count': len(ids),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'extent': extent,
+        'directory_bits': directory_bits,
+        'sections': layout,
+    }).encode('utf-8')
+    data_start = _align(PREAMBLE.size + len(header))
+
+    temporary = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb') as output:
+            output.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            output.write(header)
+            for name, array in sections.items():
+                output.seek(data_start + layout[name]['offset'])
+                output.write(array.tobytes())
+            output.truncate(data_start + offset)
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return len(ids)
+
+
+class Snapshot:
+    """A snapshot file mapped read-only, queried in place."""
+
+    def __init__(self, path):
+        try:
+            with open(path, 'rb') as snapshot_file:
+                stat = os.fstat(snapshot_file.fileno())
+                self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f'Cannot open POI snapshot {path}: {e}') from e
+        self.path = path
+        self.file_id = (stat.st_dev, stat.st_ino)
+
+        try:
+            magic, version, header_length = PREAMBLE.unpack_from(self._mmap)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            raise SnapshotError(f'{path} is not a POI snapshot')
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f'{path} has unsupported snapshot format version {version}')
+        header = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + header_length])
+        data_start = _align(PREAMBLE.size + header_length)
+
+        self.count = header['count']
+        self.created_at = header['created_at']
+        self.extent = header['extent']
+        self.directory_bits = header['directory_bits']
+        self.columns = {
+            name: np.frombuffer(
+                self._mmap, dtype=section['dtype'], count=section['length'],
+                offset=data_start + section['offset']
+            )
+            for name, section in header['sections'].items()
+        }
+
+    def __len__(self):
+        return self.count
+
+    def covers_extent(self, xmin, ymin, xmax, ymax):
+        min_lng, min_lat, max_lng, max_lat = self.extent
+        return xmin <= min_lng and ymin <= min_lat and max_lng <= xmax and max_lat <= ymax
+
+    def candidates(self, xmin, ymin, xmax, ymax):
+        """Row indexes of every directory cell overlapping the box."""
+        min_lng, min_lat, max_lng, max_lat = self.extent
+        shift = COORDINATE_BITS - self.directory_bits
+        xs = quantize([xmin, xmax], min_lng, max_lng) >> shift
+        ys = quantize([ymin, ymax], min_lat, max_lat) >> shift
+        cells = morton_codes(*np.meshgrid(
+            np.arange(xs[0], xs[1] + 1), np.arange(ys[0], ys[1] + 1)
+        )).ravel().astype(np.int64)
+
+        directory = self.columns['directory']
+        starts = directory[cells].astype(np.int64)
+        lengths = directory[cells + 1].astype(np.int64) - starts
+        # Concatenated ranges start..start+length, without a Python loop
+        return (
+            np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            + np.arange(lengths.sum(), dtype=np.int64)
+        )
+
+    def within_box(self, bbox, category=None, min_rating=None):
+        """Row indexes inside (min_lng, min_lat, max_lng, max_lat) matching the filters."""
+        xmin, ymin, xmax, ymax = bbox
+        indexes = filter_rows(self.columns, self.candidates(*bbox), category, min_rating)
+        lngs, lats = self.columns['lng'][indexes], self.columns['lat'][indexes]
+        return indexes[(lngs >= xmin) & (lngs <= xmax) & (lats >= ymin) & (lats <= ymax)]
+
+    def _by_distance(self, lng, lat, indexes, radius_m=None):
+        distances = haversine_m(
+            lng, lat, self.columns['lng'][indexes], self.columns['lat'][indexes]
+        )
+        if radius_m is not None:
+            inside = distances <= radius_m
+            indexes, distances = indexes[inside], distances[inside]
+        order = np.lexsort((self.columns['id'][indexes], distances))
+        return indexes[order], distances[order]
+
+    def within(self, lng, lat, radius_m, category=None, min_rating=None):
+        """
+        Rows within ``radius_m`` of (lng, lat) matching the filters.
+
+        Returns (row indexes, distances in metres) ordered by (distance, id).
+        """
+        indexes = filter_rows(
+            self.columns, self.candidates(*bounding_box(lng, lat, radius_m)), category, min_rating
+        )
+        return self._by_distance(lng, lat, indexes, radius_m)
+
+    def nearest(self, lng, lat, k, category=None, min_rating=None):
+        """The ``k`` rows closest to (lng, lat), as (row indexes, distances)."""
+        radius_m = 500.0
+        while True:
+            box = bounding_box(lng, lat, radius_m)
+            if self.covers_extent(*box) or radius_m > math.pi * EARTH_RADIUS_M:
+                # Every row is a candidate
+                indexes = filter_rows(
+                    self.columns, np.arange(self.count, dtype=np.int64), category, min_rating
+                )
+                indexes, distances = self._by_distance(lng, lat, indexes)
+                return indexes[:k], distances[:k]
+            indexes, distances = self.within(lng, lat, radius_m, category, min_rating)
+            if len(indexes) >= k:
+                return indexes[:k], distances[:k]
+            radius_m *= 2
+
+    def by_rating(self, indexes):
+        """Order rows by rating descending (unrated first, as in Postgres), then id."""
+        ratings = self.columns['rating'][indexes].astype(np.int32)
+        ratings[ratings == NO_RATING] = np.iinfo(np.int16).max
+        return indexes[np.lexsort((self.columns['id'][indexes], -ratings))]
+
+    def clusters(self, indexes, cell_size):
+        """(count, lng, lat) per ``ST_SnapToGrid`` cell, largest first."""
+        lngs, lats = self.columns['lng'][indexes], self.columns['lat'][indexes]
+        cells = np.stack((np.rint(lngs / cell_size), np.rint(lats / cell_size)), axis=1)
+        _, cell_of_row = np.unique(cells, axis=0, return_inverse=True)
+        cell_of_row = cell_of_row.ravel()
+        counts = np.bincount(cell_of_row)
+        mean_lngs = np.bincount(cell_of_row, weights=lngs) / counts
+        mean_lats = np.bincount(cell_of_row, weights=lats) / counts
+        order = np.argsort(-counts, kind='stable')
+        return list(zip(
+            counts[order].tolist(), mean_lngs[order].tolist(), mean_lats[order].tolist()
+        ))
+
+    def _string(self, column, index):
+        offsets = self.columns[f'{column}_offsets']
+        start, end = int(offsets[index]), int(offsets[index + 1])
+        return self.columns[f'{column}_data'][start:end].tobytes().decode('utf-8')
+
+    def rows(self, indexes, distances=None):
+        """``fast_point_representation`` rows for the given row indexes."""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        columns = {
+            name: self.columns[name][indexes].tolist()
+            for name in ('id', 'lng', 'lat', 'category', 'rating', 'created_at')
+        }
+        if distances is None:
+            distances = [None] * len(indexes)
+        else:
+            distances = np.asarray(distances).tolist()
+        rows = []
+        for i, index in enumerate(indexes.tolist()):
+            rating = columns['rating'][i]
+            row = {
+                'id': columns['id'][i],
+                'category': CATEGORY_CODES[columns['category'][i]],
+                'rating': None if rating == NO_RATING else Decimal(rating).scaleb(-2),
+                'lng': columns['lng'][i],
+                'lat': columns['lat'][i],
+                'distance_m': distances[i],
+                'created_at': EPOCH + timedelta(microseconds=columns['created_at'][i]),
+            }
+            for column in STRING_COLUMNS:
+                row[column] = self._string(column, index)
+            rows.append(row)
+        return rows
+
+
+class SnapshotFile:
+    """
+    The snapshot at ``path``, remapped after it is replaced.
+
+    The path is checked at most every ``POI_SNAPSHOT_CHECK_INTERVAL``
+    seconds; a swapped file is recognised by its inode.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._snapshot = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The current ``Snapshot``; raises ``SnapshotError`` if there is none."""
+        now = time.monotonic()
+        if (self._checked_at is not None
+                and now - self._checked_at < settings.POI_SNAPSHOT_CHECK_INTERVAL):
+            return self._snapshot
+        with self._lock:
+            path = self.path or settings.POI_SNAPSHOT_PATH
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                if self._snapshot is None:
+                    raise SnapshotError(f'Cannot open POI snapshot {path}: {e}') from e
+            else:
+                if self._snapshot is None or self._snapshot.file_id != (stat.st_dev, stat.st_ino):
+                    self._snapshot = Snapshot(path)
+            self._checked_at = now
+        return self._snapshot
+
+
+snapshot_file = SnapshotFile()
@@ -0,0 +1,484 @@
+"""
+Spatial query building blocks for the POI API.
+
+Radius engines:
+- ``geography``: ST_DWithin / ST_Distance on ``location::geography``, served by
+  the ``pois_location_geog_gist`` functional GIST index (metres on the spheroid).
+- ``projected``: ``&&`` bounding-box prefilter on the geometry GIST index, then
+  an exact ST_DWithin recheck in the local UTM zone (metres).
+
+Both engines compute the distance once per row, as the ``distance_m``
+annotation the results are ordered by.
+
+Nearest-neighbour queries order by the ``<->`` operator on the same geography
+index, so the index scan yields rows in distance order and stops shortly
+after k; the candidates are then ranked by exact spheroid distance.
+Batch radius queries run that lookup per centre in one statement: ``unnest``
+of the centres ``CROSS JOIN LATERAL`` an index-ordered, radius-bounded scan.
+
+Corridor queries apply ST_DWithin against a route line on the same geography
+index and order matches by ST_LineLocatePoint, their position along the route.
+
+Viewport queries filter with ``&&`` against ``ST_MakeEnvelope`` and, when too
+many points match, aggregate them into ``ST_SnapToGrid`` clusters.
+
+Density aggregates bin points into square or hexagonal Web Mercator cells
+(the grids of ``ST_SquareGrid`` / ``ST_HexagonGrid``) in one grouped query.
+"""
+import math
+
+from django.conf import settings
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.gis.db.models.functions import LineLocatePoint, SnapToGrid
+from django.db import connections, router
+from django.db.models import Avg, BooleanField, Count, F, FloatField, Func, Value
+
+GEOGRAPHY_ENGINE = 'geography'
+PROJECTED_ENGINE = 'projected'
+RADIUS_ENGINES = (GEOGRAPHY_ENGINE, PROJECTED_ENGINE)
+
+# Mean length of one degree of latitude, used to size bounding boxes
+METERS_PER_DEGREE = 111_320.0
+
+# Mean Earth radius (IUGG), for in-process great-circle distances
+EARTH_RADIUS_M = 6_371_008.8
+
+# WGS84 ellipsoid, as used by PostGIS for geography distances
+WGS84_A = 6_378_137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+# Web Mercator, the plane density grids are laid out in
+WEB_MERCATOR_SRID = 3857
+WEB_MERCATOR_RADIUS_M = 6_378_137.0
+# Web Mercator's latitude limit
+MERCATOR_MAX_LAT = 85.05112878
+
+# ``<->`` on geography orders by sphere distance, which differs from the
+# spheroid distance results are ranked by by under 1%. KNN scans read
+# KNN_OVERFETCH_FACTOR * k + KNN_OVERFETCH_ROWS rows and keep the k closest
+# on the spheroid, so a row just outside the sphere top k is not dropped
+KNN_OVERFETCH_FACTOR = 2
+KNN_OVERFETCH_ROWS = 10
+
+# One radius query per unnested centre, each a bounded KNN index scan
+BATCH_RADIUS_SQL = """
+SELECT q.idx, hit.id, hit.distance_m
+FROM unnest(
+    %s::int[], %s::float8[], %s::float8[], %s::float8[], %s::text[], %s::numeric[], %s::int[]
+) AS q(idx, lng, lat, radius_m, category, min_rating, max_rows)
+CROSS JOIN LATERAL (
+    SELECT ST_SetSRID(ST_MakePoint(q.lng, q.lat), 4326)::geography AS center
+) AS c
+CROSS JOIN LATERAL (
+    SELECT knn.id, knn.distance_m
+    FROM (
+        SELECT p.id, ST_Distance(p.location::geography, c.center) AS distance_m
+        FROM {table} AS p
+        WHERE ST_DWithin(p.location::geography, c.center, q.radius_m)
+          AND (q.category IS NULL OR p.category = q.category)
+          AND (q.min_rating IS NULL OR p.rating >= q.min_rating)
+        ORDER BY p.location::geography <-> c.center
+        LIMIT q.max_rows * {overfetch_factor} + {overfetch_rows}
+    ) AS knn
+    ORDER BY knn.distance_m, knn.id
+    LIMIT q.max_rows
+) AS hit
+ORDER BY q.idx, hit.distance_m, hit.id
+"""
+
+SQUARE_GRID = 'square'
+HEX_GRID = 'hex'
+GRID_SHAPES = (HEX_GRID, SQUARE_GRID)
+
+# Per point: index (i, j) of the grid cell containing its projection ``m``.
+# Hexagons come from ST_HexagonGrid over the point itself; the grid is
+# anchored at the origin, so indexes agree across points. Points on a shared
+# edge go to one cell only.
+GRID_CELL_SQL = {
+    SQUARE_GRID: 'SELECT floor(ST_X(m) / %s)::int AS i, floor(ST_Y(m) / %s)::int AS j',
+    HEX_GRID: (
+        'SELECT h.i, h.j FROM ST_HexagonGrid(%s, m) AS h '
+        'WHERE ST_Intersects(h.geom, m) LIMIT 1'
+    ),
+}
+
+# Cell geometry from its index, for the centre reported per cell
+GRID_SHAPE_FUNCTIONS = {SQUARE_GRID: 'ST_Square', HEX_GRID: 'ST_Hexagon'}
+
+AGGREGATE_SQL = """
+WITH points AS (
+    SELECT ST_Transform(location, {srid}) AS m, category, rating
+    FROM ({points}) AS p
+), binned AS (
+    SELECT cell.i, cell.j, points.category, count(*) AS n,
+           count(points.rating) AS rated, avg(points.rating) AS avg_rating
+    FROM points CROSS JOIN LATERAL ({cell}) AS cell
+    GROUP BY cell.i, cell.j, points.category
+)
+SELECT i, j, ST_X(centre), ST_Y(centre), category, n, rated, avg_rating
+FROM binned CROSS JOIN LATERAL ST_Transform(
+    ST_Centroid(ST_SetSRID({shape}(%s, i, j), {srid})), 4326
+) AS centre
+ORDER BY i, j, category
+"""
+
+
+class MakePoint(Func):
+    """``ST_SetSRID(ST_MakePoint(lng, lat), 4326)`` from plain float parameters."""
+    template = 'ST_SetSRID(ST_MakePoint(%(expressions)s), 4326)'
+    output_field = GeometryField(srid=4326)
+
+
+class MakeEnvelope(Func):
+    """``ST_MakeEnvelope(xmin, ymin, xmax, ymax, 4326)``."""
+    template = 'ST_MakeEnvelope(%(expressions)s, 4326)'
+    output_field = GeometryField(srid=4326)
+
+
+class AsGeography(Func):
+    """Cast a geometry to geography; matches the functional GIST index."""
+    template = '(%(expressions)s)::geography'
+    output_field = GeometryField(srid=4326, geography=True)
+
+
+class GeomFromText(Func):
+    """``ST_GeomFromText(wkt, 4326)``."""
+    template = 'ST_GeomFromText(%(expressions)s, 4326)'
+    output_field = GeometryField(srid=4326)
+
+
+class ToSRID(Func):
+    """``ST_Transform(geom, srid)``."""
+    function = 'ST_Transform'
+    output_field = GeometryField()
+
+
+class BBoxOverlaps(Func):
+    """Index-assisted bounding-box overlap (``a && b``)."""
+    template = '(%(expressions)s)'
+    arg_joiner = ' && '
+    output_field = BooleanField()
+
+
+class DWithin(Func):
+    function = 'ST_DWithin'
+    output_field = BooleanField()
+
+
+class STDistance(Func):
+    function = 'ST_Distance'
+    output_field = FloatField()
+
+
+class STX(Func):
+    function = 'ST_X'
+    output_field = FloatField()
+
+
+class STY(Func):
+    function = 'ST_Y'
+    output_field = FloatField()
+
+
+class KNNDistance(Func):
+    """Index-ordered KNN distance (``a <-> b``); sphere metres for geography."""
+    template = '(%(expressions)s)'
+    arg_joiner = ' <-> '
+    output_field = FloatField()
+
+
+def make_point(lng, lat):
+    """Build a WGS84 point expression from coordinates."""
+    return MakePoint(Value(float(lng)), Value(float(lat)))
+
+
+def utm_srid(lng, lat):
+    """EPSG code of the WGS84 / UTM zone containing the point."""
+    zone = min(int((lng + 180) // 6) + 1, 60)
+    return (32600 if lat >= 0 else 32700) + zone
+
+
+def bounding_box(lng, lat, radius_m):
+    """
+    Return (xmin, ymin, xmax, ymax) in degrees enclosing a circle of ``radius_m``.
+
+    Boxes crossing the antimeridian are widened to the full longitude range.
+    """
+    dlat = radius_m / METERS_PER_DEGREE
+    max_lat = min(abs(lat) + dlat, 89.9)
+    dlng = radius_m / (METERS_PER_DEGREE * math.cos(math.radians(max_lat)))
+    xmin, xmax = lng - dlng, lng + dlng
+    if xmin < -180 or xmax > 180:
+        xmin, xmax = -180.0, 180.0
+    return xmin, max(lat - dlat, -90.0), xmax, min(lat + dlat, 90.0)
+
+
+def haversine_m(lng1, lat1, lng2, lat2):
+    """Great-circle distance in metres on the mean-radius sphere."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def spheroid_distance_m(lng1, lat1, lng2, lat2):
+    """
+    Geodesic distance in metres on the WGS84 spheroid (Vincenty's inverse).
+
+    Agrees with geography ``ST_Distance`` / ``ST_DWithin`` to well under a
+    millimetre. Falls back to ``haversine_m`` for nearly antipodal points,
+    where the iteration does not converge.
+    """
+    U1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1)))
+    U2 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat2)))
+    sin_u1, cos_u1 = math.sin(U1), math.cos(U1)
+    sin_u2, cos_u2 = math.sin(U2), math.cos(U2)
+    L = math.radians(lng2 - lng1)
+    lam = L
+    for _ in range(100):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        if sin_sigma == 0:
+            return 0.0
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha ** 2
+        # Zero on the equator, where the geodesic runs along it
+        cos_2sm = cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha if cos2_alpha else 0.0
+        C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        previous, lam = lam, L + (1 - C) * WGS84_F * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sm + C * cos_sigma * (2 * cos_2sm ** 2 - 1))
+        )
+        if abs(lam - previous) < 1e-12:
+            break
+    else:
+        return haversine_m(lng1, lat1, lng2, lat2)
+
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (
+        cos_sigma * (2 * cos_2sm ** 2 - 1)
+        - B / 6 * cos_2sm * (4 * sin_sigma ** 2 - 3) * (4 * cos_2sm ** 2 - 3)
+    ))
+    return WGS84_B * A * (sigma - delta_sigma)
+
+
+def decode_polyline(encoded, precision=5):
+    """
+    Decode an encoded polyline (Google polyline algorithm) to (lng, lat) pairs.
+
+    Raises ValueError on malformed input.
+    """
+    coordinates = []
+    index = lat = lng = 0
+    factor = 10 ** precision
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                if index >= len(encoded):
+                    raise ValueError('Truncated polyline')
+                byte = ord(encoded[index]) - 63
+                index += 1
+                if not 0 <= byte < 64:
+                    raise ValueError('Invalid polyline character')
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        coordinates.append((lng / factor, lat / factor))
+    return coordinates
+
+
+def make_line(coordinates):
+    """Build a WGS84 LineString expression from (lng, lat) pairs."""
+    points = ', '.join(f'{float(lng)!r} {float(lat)!r}' for lng, lat in coordinates)
+    return GeomFromText(Value(f'LINESTRING({points})'))
+
+
+def corridor_queryset(queryset, coordinates, distance_km):
+    """
+    Filter ``queryset`` to POIs within ``distance_km`` of a route.
+
+    Adds ``distance_m`` (metres from the route) and ``route_position`` (0 at
+    the start of the route, 1 at its end) annotations; callers order by the
+    position.
+    """
+    line = make_line(coordinates)
+    location = AsGeography(F('location'))
+    route = AsGeography(line)
+    return queryset.filter(
+        DWithin(location, route, Value(distance_km * 1000))
+    ).annotate(
+        distance_m=STDistance(location, route),
+        route_position=LineLocatePoint(line, F('location')),
+    )
+
+
+def make_envelope(xmin, ymin, xmax, ymax):
+    """Build a WGS84 envelope expression from bounds."""
+    return MakeEnvelope(*(Value(float(v)) for v in (xmin, ymin, xmax, ymax)))
+
+
+def radius_queryset(queryset, lng, lat, radius_km, engine=None):
+    """
+    Filter ``queryset`` to POIs within ``radius_km`` of (lng, lat).
+
+    Adds a ``distance_m`` annotation (metres) computed by the selected engine;
+    callers order by it. Defaults to ``settings.POI_RADIUS_ENGINE``.
+    """
+    engine = engine or settings.POI_RADIUS_ENGINE
+    radius_m = radius_km * 1000
+    center = make_point(lng, lat)
+
+    if engine == GEOGRAPHY_ENGINE:
+        location = AsGeography(F('location'))
+        target = AsGeography(center)
+        queryset = queryset.filter(DWithin(location, target, Value(radius_m)))
+    elif engine == PROJECTED_ENGINE:
+        srid = utm_srid(lng, lat)
+        location = ToSRID(F('location'), Value(srid))
+        target = ToSRID(center, Value(srid))
+        queryset = queryset.filter(
+            # GIST-indexed prefilter, then exact metric recheck on survivors
+            BBoxOverlaps(F('location'), make_envelope(*bounding_box(lng, lat, radius_m))),
+            DWithin(location, target, Value(radius_m)),
+        )
+    else:
+        raise ValueError(f"Unknown radius engine: {engine}")
+
+    return queryset.annotate(distance_m=STDistance(location, target))
+
+
+def nearest_queryset(queryset, lng, lat, k):
+    """
+    Return the ``k`` POIs of ``queryset`` closest to (lng, lat).
+
+    The inner query walks the geography GIST index in ``<->`` (sphere) order
+    and stops after a few more than ``k`` rows; the outer query rechecks those
+    rows with the exact spheroid distance (``distance_m``) and keeps the ``k``
+    closest.
+    """
+    location = AsGeography(F('location'))
+    target = AsGeography(make_point(lng, lat))
+    candidates = queryset.order_by(KNNDistance(location, target)).values('pk')[
+        :KNN_OVERFETCH_FACTOR * k + KNN_OVERFETCH_ROWS
+    ]
+
+    return queryset.model.objects.filter(pk__in=candidates).annotate(
+        distance_m=STDistance(location, target)
+    ).order_by('distance_m', 'id')[:k]
+
+
+def batch_radius_hits(model, queries):
+    """
+    Run many radius queries in one statement.
+
+    ``queries`` are dicts with ``lng``, ``lat``, ``radius_km``, ``limit`` and
+    optional ``category`` / ``min_rating``. Each is answered by its own
+    lateral scan of the geography GIST index in ``<->`` order, stopping after
+    ``limit`` rows inside the radius. Returns ``(query_index, pk, distance_m)``
+    rows ordered by query, exact distance and id.
+    """
+    columns = list(zip(*(
+        (index, query['lng'], query['lat'], query['radius_km'] * 1000,
+         query.get('category'), query.get('min_rating'), query['limit'])
+        for index, query in enumerate(queries)
+    )))
+    connection = connections[router.db_for_read(model)]
+    sql = BATCH_RADIUS_SQL.format(
+        table=connection.ops.quote_name(model._meta.db_table),
+        overfetch_factor=KNN_OVERFETCH_FACTOR, overfetch_rows=KNN_OVERFETCH_ROWS
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [list(column) for column in columns])
+        return cursor.fetchall()
+
+
+def cluster_cell_size(bbox, zoom):
+    """
+    Grid cell size in degrees for clustering a viewport at ``zoom``.
+
+    Cells cover ``1 / POI_CLUSTER_GRID_PER_TILE`` of a web-map tile, but never
+    less than the viewport split into ``POI_CLUSTER_MAX_CELLS_PER_AXIS`` cells
+    per side, so the number of clusters is bounded for any request.
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+    tile_degrees = 360.0 / (2 ** zoom)
+    per_axis = settings.POI_CLUSTER_MAX_CELLS_PER_AXIS
+    return max(
+        tile_degrees / settings.POI_CLUSTER_GRID_PER_TILE,
+        (max_lng - min_lng) / per_axis,
+        (max_lat - min_lat) / per_axis,
+    )
+
+
+def grid_clusters(queryset, cell_size):
+    """Aggregate ``queryset`` into grid cells with counts and centroids."""
+    return queryset.annotate(
+        cell=SnapToGrid('location', cell_size)
+    ).values('cell').annotate(
+        count=Count('id'), lng=Avg(STX('location')), lat=Avg(STY('location'))
+    ).values_list('count', 'lng', 'lat').order_by('-count')
+
+
+def mercator_xy(lng, lat):
+    """Project (lng, lat) to Web Mercator metres, clamping polar latitudes."""
+    lat = max(min(lat, MERCATOR_MAX_LAT), -MERCATOR_MAX_LAT)
+    x = WEB_MERCATOR_RADIUS_M * math.radians(lng)
+    y = WEB_MERCATOR_RADIUS_M * math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+    return x, y
+
+
+def grid_cell_size(cell_km, lat):
+    """
+    Web Mercator cell size (metres) for cells ``cell_km`` across at ``lat``.
+
+    Mercator stretches distances by ``1 / cos(lat)``; sizing the grid at the
+    region's latitude keeps cells close to the requested ground size.
+    """
+    lat = max(min(lat, MERCATOR_MAX_LAT), -MERCATOR_MAX_LAT)
+    return cell_km * 1000 / math.cos(math.radians(lat))
+
+
+def grid_cell_count(bbox, cell_size, shape):
+    """Approximate number of grid cells covering ``bbox``."""
+    min_x, min_y = mercator_xy(bbox[0], bbox[1])
+    max_x, max_y = mercator_xy(bbox[2], bbox[3])
+    if shape == HEX_GRID:
+        # ``cell_size`` is the hexagon's edge length
+        cell_area = 3 * math.sqrt(3) / 2 * cell_size ** 2
+    else:
+        cell_area = cell_size ** 2
+    return math.ceil((max_x - min_x) * (max_y - min_y) / cell_area)
+
+
+def aggregate_cells(queryset, cell_size, shape):
+    """
+    Count POIs of ``queryset`` per grid cell and category in one query.
+
+    Returns ``(i, j, lng, lat, category, count, rated, avg_rating)`` rows,
+    where (lng, lat) is the cell centre and ``rated`` counts non-null ratings.
+    Only the filtered rows are binned, so the region filter should be index
+    backed (``&&`` / ST_DWithin).
+    """
+    points_sql, params = queryset.values(
+        'location', 'category', 'rating'
+    ).order_by().query.sql_with_params()
+    cell_params = [cell_size, cell_size] if shape == SQUARE_GRID else [cell_size]
+
+    sql = AGGREGATE_SQL.format(
+        srid=WEB_MERCATOR_SRID, points=points_sql, cell=GRID_CELL_SQL[shape],
+        shape=GRID_SHAPE_FUNCTIONS[shape]
+    )
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, [*params, *cell_params, cell_size])
+        return cursor.fetchall()
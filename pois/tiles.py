@@ -0,0 +1,129 @@
+"""
+Mapbox Vector Tiles for Points of Interest.
+
+Tiles are encoded by PostGIS in one statement: ``ST_TileEnvelope`` gives the
+Web Mercator bounds of z/x/y, the ``&&`` filter runs on the geometry GIST
+index, ``ST_AsMVTGeom`` clips and quantizes points to tile coordinates and
+``ST_AsMVT`` packs the layer.
+
+Encoded tiles are cached per (z, x, y, filters) with a content ETag. Every
+tile has a generation counter that is part of its cache key; a write bumps
+the counters of the tiles containing the changed point at each zoom level,
+so only those tiles are re-rendered and every other cached tile stays warm.
+"""
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+
+from .cache import EPOCH_KEY, bump_generations, get_generations
+from .models import PointOfInterest
+
+TILE_CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+TILE_LAYER = 'pois'
+TILE_EXTENT = 4096
+
+# Web Mercator is undefined at the poles; tiles stop at +/-85.0511 degrees
+MAX_MERCATOR_LAT = 85.0511287798066
+
+# Points on a tile edge belong to both tiles; nudge by this much (degrees)
+# when looking for the tiles a point touches
+EDGE_EPSILON = 1e-9
+
+TILE_SQL = """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(%s, %s, %s) AS geom
+    ),
+    features AS (
+        SELECT ST_AsMVTGeom(ST_Transform(p.location, 3857), bounds.geom, %s, 0, true) AS geom,
+               p.id, p.name, p.category, p.rating::float8 AS rating
+        FROM pois p, bounds
+        WHERE p.location && ST_Transform(bounds.geom, 4326){filters}
+    )
+    SELECT ST_AsMVT(features.*, %s, %s, 'geom', 'id') FROM features
+"""
+
+
+def tile_exists(z, x, y):
+    """Whether z/x/y addresses a tile of the Web Mercator pyramid."""
+    return 0 <= z <= settings.POI_TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_coordinates(lng, lat, z):
+    """Fractional (x, y) tile coordinates of a WGS84 point at zoom ``z``."""
+    lat = max(min(lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    n = 2 ** z
+    x = (lng + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tiles_for_point(lng, lat, z):
+    """Set of (x, y) tiles at zoom ``z`` whose envelope contains the point."""
+    n = 2 ** z
+    tiles = set()
+    for dlng in (-EDGE_EPSILON, EDGE_EPSILON):
+        for dlat in (-EDGE_EPSILON, EDGE_EPSILON):
+            x, y = tile_coordinates(lng + dlng, lat + dlat, z)
+            tiles.add((min(max(int(x), 0), n - 1), min(max(int(y), 0), n - 1)))
+    return tiles
+
+
+def _generation_key(z, x, y):
+    return f'poi_tile_gen_{z}_{x}_{y}'
+
+
+def tile_cache_key(z, x, y, category=None, min_rating=None):
+    """Cache key of an encoded tile at its current generation."""
+    epoch, generation = get_generations(EPOCH_KEY, _generation_key(z, x, y))
+    filters = f'{category or ""}:{"" if min_rating is None else min_rating}'
+    return f'poi_tile_{epoch}_{z}_{x}_{y}_{generation}_{filters}'
+
+
+def render_tile(z, x, y, category=None, min_rating=None):
+    """Encode one tile with ST_AsMVT; returns the protobuf bytes."""
+    filters, params = [], []
+    if category:
+        filters.append('p.category = %s')
+        params.append(category)
+    if min_rating is not None:
+        filters.append('p.rating >= %s')
+        params.append(min_rating)
+
+    sql = TILE_SQL.format(filters=''.join(f' AND {clause}' for clause in filters))
+    # Rendered on the request's read database (a replica when routed there)
+    with connections[router.db_for_read(PointOfInterest)].cursor() as cursor:
+        cursor.execute(sql, [z, x, y, TILE_EXTENT, *params, TILE_LAYER, TILE_EXTENT])
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile is not None else b''
+
+
+def get_tile(z, x, y, category=None, min_rating=None):
+    """
+    Return ``(tile bytes, etag)`` for z/x/y, rendering on a cache miss.
+    """
+    key = tile_cache_key(z, x, y, category, min_rating)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    tile = render_tile(z, x, y, category, min_rating)
+    etag = '"{}"'.format(hashlib.md5(tile).hexdigest())
+    cache.set(key, (tile, etag), settings.POI_TILE_CACHE_TTL)
+    return tile, etag
+
+
+def point_generation_keys(lng, lat):
+    """Generation keys of every tile containing (lng, lat), at every zoom."""
+    return {
+        _generation_key(z, x, y)
+        for z in range(settings.POI_TILE_MAX_ZOOM + 1)
+        for x, y in tiles_for_point(lng, lat, z)
+    }
+
+
+def invalidate_point(lng, lat):
+    """Bump the generation of every tile containing (lng, lat), at every zoom."""
+    bump_generations(point_generation_keys(lng, lat))
@@ -3,11 +3,15 @@ URL configuration for POI API endpoints.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'pois', views.PointOfInterestViewSet, basename='pointofinterest')
 
 urlpatterns = [
+    path('pois/tiles/<int:z>/<int:x>/<int:y>.mvt', views.vector_tile, name='poi-tile'),
+    # Async variants for ASGI deployments
+    path('pois/async/radius/', async_views.radius_search, name='poi-async-radius'),
+    path('pois/async/nearest/', async_views.nearest, name='poi-async-nearest'),
     path('', include(router.urls)),
 ] 
\ No newline at end of file
@@ -1,53 +1,191 @@
 """
 Views for Point of Interest API with optimized spatial queries.
 """
-from django.contrib.gis.db.models.functions import Distance, Transform
 from django.contrib.gis.geos import Point
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+)
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.core.cache import cache
+from django.conf import settings
+import hashlib
+import json
 import logging
 
-from .models import PointOfInterest
+from .bulk import bulk_upsert
+from .memory_index import SNAPSHOT_FIELDS, memory_index
+from .models import CategoryStats, PointOfInterest
+from .parsers import NDJSONParser
+from .renderers import FastJSONRenderer
+from .snapshot import SnapshotError, snapshot_file
+from .export import aiter_sync, export_rows, iter_geojson, iter_ndjson
+from .cache import (
+    SUPERSET_RADIUS_MARGIN, autocomplete_cache_key, list_cache_key, radius_cache_key, record_superset_lookup,
+    superset_cache_key, superset_stats
+)
+from .tiles import TILE_CONTENT_TYPE, get_tile, tile_exists
+from .pagination import DistanceKeysetPagination, RoutePositionKeysetPagination
+from .search import (
+    autocomplete_candidates, rank_by_proximity, rank_completions, text_search
+)
+from .spatial import (
+    BBoxOverlaps, aggregate_cells, batch_radius_hits, cluster_cell_size, corridor_queryset,
+    grid_clusters, haversine_m, make_envelope, nearest_queryset, radius_queryset,
+    spheroid_distance_m
+)
 from .serializers import (
     PointOfInterestSerializer,
     PointOfInterestCreateSerializer,
-    RadiusQuerySerializer
+    RadiusQuerySerializer,
+    NearestQuerySerializer,
+    RadiusBatchSerializer,
+    SearchQuerySerializer,
+    AutocompleteQuerySerializer,
+    CorridorQuerySerializer,
+    ExportQuerySerializer,
+    BBoxQuerySerializer,
+    AggregateQuerySerializer,
+    TileQuerySerializer,
+    PointOfInterestBulkItemSerializer,
+    DUPLICATE_POI_MESSAGE,
+    fast_point_representation,
+    fast_point_rows,
+    model_columns,
+    requested_fields,
+    validate_coordinate_batch
 )
 
 logger = logging.getLogger(__name__)
 
 
+class SnapshotServingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Not available while serving from a POI snapshot.'
+    default_code = 'snapshot_unavailable'
+
+
 class PointOfInterestViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Point of Interest with optimized spatial queries.
     
     Features:
-    - ST_DWithin for efficient radius queries
-    - ST_Transform for coordinate system optimization
+    - Index-backed radius queries (geography or local projected engine)
     - GIST and SP-GIST spatial indexing
-    - Caching for frequently accessed queries
+    - Write-aware caching: writes evict only the cells they touch
     - Distance calculation in responses
+    - Sparse fieldsets (``fields`` / ``profile``) narrow SQL and output
+    - Database-free serving from a snapshot file (``POI_SNAPSHOT_SERVING``)
     """
     
     serializer_class = PointOfInterestSerializer
     
+    # Read actions that honour ``fields`` / ``profile``
+    field_selection_actions = (
+        'list', 'retrieve', 'radius_search', 'radius_batch', 'search', 'corridor', 'nearest',
+        'bbox'
+    )
+    
+    # Actions answered from the snapshot file under POI_SNAPSHOT_SERVING
+    snapshot_actions = ('radius_search', 'nearest', 'bbox')
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if settings.POI_SNAPSHOT_SERVING and self.action not in self.snapshot_actions:
+            raise SnapshotServingUnavailable()
+    
+    def get_snapshot(self):
+        """The mapped snapshot file; 503 when it cannot be opened."""
+        try:
+            return snapshot_file.get()
+        except SnapshotError:
+            logger.exception('POI snapshot unavailable')
+            raise SnapshotServingUnavailable('POI snapshot unavailable.')
+    
     def get_serializer_class(self):
         """Use different serializers for different actions."""
         if self.action == 'create':
             return PointOfInterestCreateSerializer
         return PointOfInterestSerializer
     
+    def save_unique(self, serializer):
+        """
+        Save, turning a (name, location) collision into a 400.
+        
+        Serializers check the pair first; this covers a concurrent write
+        taking it between that check and the save.
+        """
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError as exc:
+            if 'pois_name_location_uniq' not in str(exc):
+                raise
+            raise ValidationError(DUPLICATE_POI_MESSAGE)
+    
+    def perform_create(self, serializer):
+        self.save_unique(serializer)
+    
+    def perform_update(self, serializer):
+        self.save_unique(serializer)
+    
     def get_queryset(self):
         """Optimize queryset with select_related and prefetch_related."""
-        return PointOfInterest.objects.select_related().prefetch_related()
+        # created_at is the list pagination key
+        return self.project(
+            PointOfInterest.objects.select_related().prefetch_related(), 'created_at'
+        )
     
-    @method_decorator(cache_page(300))  # Cache for 5 minutes
-    @action(detail=False, methods=['get'], url_path='pois')
+    def get_response_fields(self):
+        """Fields requested with ``fields`` / ``profile``; None for all."""
+        if not hasattr(self, '_response_fields'):
+            self._response_fields = None
+            if self.action in self.field_selection_actions:
+                self._response_fields = requested_fields(self.request.query_params)
+        return self._response_fields
+    
+    def memory_index_fields(self):
+        """
+        Response fields, when the in-process index can produce them all.
+        
+        Starts the index for this process on first use; None means query
+        PostGIS (index disabled, or fields outside the snapshot columns).
+        """
+        if not memory_index.enabled:
+            return None
+        fields = self.get_response_fields()
+        if fields is None or not SNAPSHOT_FIELDS.issuperset(fields):
+            return None
+        memory_index.start()
+        return fields
+    
+    def fast_results(self, rows):
+        """Encode memory index or snapshot rows like the serializer would."""
+        fields = self.get_response_fields()
+        return [fast_point_representation(row, fields) for row in rows]
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.get_serializer_class() is PointOfInterestSerializer:
+            kwargs.setdefault('fields', self.get_response_fields())
+        return super().get_serializer(*args, **kwargs)
+    
+    def project(self, queryset, *extra_columns):
+        """Load only the columns the requested fields need (plus ``extra_columns``)."""
+        fields = self.get_response_fields()
+        if fields is None:
+            return queryset
+        return queryset.only(*model_columns(fields), *extra_columns)
+    
+    @action(detail=False, methods=['get'], url_path='pois',
+            renderer_classes=[FastJSONRenderer])
     def radius_search(self, request):
         """
         Search POIs within a radius using optimized spatial queries.
@@ -58,12 +196,23 @@ class PointOfInterestViewSet(viewsets.ModelViewSet):
         - radius_km: Search radius in kilometers
         - category: Filter by POI category (optional)
         - min_rating: Minimum rating filter (optional)
+        - engine: Radius engine, ``geography`` or ``projected`` (optional)
+        - cursor / page_size: Keyset pagination on (distance, id) (optional)
         
         Performance optimizations:
-        - ST_DWithin for efficient spatial filtering
-        - ST_Transform (EPSG 4326→3857) for better performance
-        - GIST spatial index utilization
+        - ST_DWithin evaluated in metres against an indexed expression
+        - Exactly one distance computation per row, reused for ordering
+        - Keyset pages instead of OFFSET or a hard result cap
         - Distance calculation in meters then converted to km
+        - Optional serializer-free path (``POI_RADIUS_FAST_PATH``): columns,
+          ST_X / ST_Y and distance read with ``values()`` and encoded by orjson
+        - Cached per geohash cell; writes nearby evict the cell
+        - Optionally (``POI_RADIUS_SNAP_DEGREES``), nearby queries share one
+          cached superset (snapped centre, radius bucket), filtered and sorted
+          in process on the spheroid; ``X-Cache`` reports it
+        - Inside ``POI_MEMORY_INDEX_REGIONS``, answered from the in-process
+          grid snapshot when the requested fields allow it
+        - Under ``POI_SNAPSHOT_SERVING``, answered from the mapped snapshot file
         """
         
         # Validate query parameters
@@ -77,15 +226,43 @@ class PointOfInterestViewSet(viewsets.ModelViewSet):
         radius_km = data['radius_km']
         category = data.get('category')
         min_rating = data.get('min_rating')
+        engine = data.get('engine') or settings.POI_RADIUS_ENGINE
+        query = {
+            'center': {'lat': lat, 'lng': lng},
+            'radius_km': radius_km,
+            'category': category,
+            'min_rating': min_rating,
+            'engine': engine
+        }
+        
+        if settings.POI_SNAPSHOT_SERVING:
+            return self._radius_from_snapshot(request, data, query)
+        
+        if not data.get('engine') and self.memory_index_fields() is not None:
+            rows = memory_index.radius(lng, lat, radius_km * 1000, category, min_rating)
+            if rows is not None:
+                paginator = DistanceKeysetPagination()
+                results = self.fast_results(paginator.paginate_sequence(rows, request))
+                return Response({
+                    'count': len(results),
+                    'next': paginator.get_next_link(),
+                    'query': query,
+                    'results': results
+                }, headers={'X-Memory-Index': 'HIT'})
         
-        # Create center point
-        center_point = Point(lng, lat, srid=4326)
+        if data['superset'] is not None:
+            response = self._radius_from_superset(request, data, query)
+            if response is not None:
+                return response
         
-        # Build base queryset with spatial filtering
-        queryset = PointOfInterest.objects.annotate(
-            distance=Distance('location', center_point)
-        ).filter(
-            location__dwithin=(center_point, radius_km * 1000)  # Convert km to meters
+        cache_key = radius_cache_key(request, lng, lat, radius_km)
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return Response(cached_result)
+        
+        # Build base queryset with spatial filtering and distance annotation
+        queryset = radius_queryset(
+            self.project(PointOfInterest.objects.all()), lng, lat, radius_km, engine=engine
         )
         
         # Apply additional filters
@@ -95,43 +272,807 @@ class PointOfInterestViewSet(viewsets.ModelViewSet):
         if min_rating is not None:
             queryset = queryset.filter(rating__gte=min_rating)
         
-        # Optimize query with spatial indexing
-        # Use ST_Transform for better performance on large datasets
-        queryset = queryset.extra(
-            select={
-                'distance_meters': """
-                    ST_Distance(
-                        ST_Transform(location, 3857),
-                        ST_Transform(ST_GeomFromText(%s, 4326), 3857)
-                    )
-                """
-            },
-            select_params=[center_point.wkt]
+        # Page through results nearest first, keyed on (distance, id)
+        paginator = DistanceKeysetPagination()
+        fields = self.get_response_fields()
+        if settings.POI_RADIUS_FAST_PATH:
+            page = paginator.paginate_queryset(
+                fast_point_rows(queryset, fields), request, view=self
+            )
+            results = [fast_point_representation(row, fields) for row in page]
+        else:
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            results = self.get_serializer(page, many=True).data
+        
+        # Add metadata
+        response_data = {
+            'count': len(results),
+            'next': paginator.get_next_link(),
+            'query': query,
+            'results': results
+        }
+        
+        cache.set(cache_key, response_data, settings.POI_RADIUS_CACHE_TTL)
+        return Response(response_data)
+    
+    def _radius_from_snapshot(self, request, data, query):
+        """Answer a radius query from the snapshot file, without the database."""
+        snapshot = self.get_snapshot()
+        indexes, distances = snapshot.within(
+            data['lng'], data['lat'], data['radius_km'] * 1000,
+            data.get('category'), data.get('min_rating')
         )
+        matches = [
+            {'distance_m': distance_m, 'id': pk, 'row': row}
+            for row, pk, distance_m in zip(
+                indexes.tolist(), snapshot.columns['id'][indexes].tolist(), distances.tolist()
+            )
+        ]
         
-        # Order by distance for most relevant results first
-        queryset = queryset.order_by('distance')
+        paginator = DistanceKeysetPagination()
+        page = paginator.paginate_sequence(matches, request)
+        results = self.fast_results(snapshot.rows(
+            [match['row'] for match in page], [match['distance_m'] for match in page]
+        ))
         
-        # Limit results for performance (max 100 POIs)
-        queryset = queryset[:100]
+        return Response({
+            'count': len(results),
+            'next': paginator.get_next_link(),
+            'query': query,
+            'results': results
+        })
+    
+    def _radius_from_superset(self, request, data, query):
+        """
+        Answer a radius query from the cached superset of its snapped query.
         
-        # Serialize results
+        Returns None when the superset has more than
+        ``POI_RADIUS_SUPERSET_MAX_ROWS`` rows; the caller queries exactly.
+        """
+        superset_lng, superset_lat, superset_radius_km = data['superset']
+        category = data.get('category')
+        min_rating = data.get('min_rating')
+        
+        # Rows keep coordinates for the in-process distance filter
+        fields = self.get_response_fields()
+        row_fields = None
+        if fields is not None:
+            row_fields = tuple(
+                name for name in PointOfInterestSerializer.Meta.fields
+                if name in fields or name == 'coordinates'
+            )
+        cache_key = superset_cache_key(
+            superset_lng, superset_lat, superset_radius_km, category, min_rating, row_fields
+        )
+        
+        rows = cache.get(cache_key)
+        outcome = 'hits' if rows is not None else 'misses'
+        if rows is None:
+            queryset = PointOfInterest.objects.all()
+            if row_fields is not None:
+                queryset = queryset.only(*model_columns(row_fields))
+            queryset = radius_queryset(
+                queryset, superset_lng, superset_lat, superset_radius_km
+            )
+            if category:
+                queryset = queryset.filter(category=category)
+            
+            if min_rating is not None:
+                queryset = queryset.filter(rating__gte=min_rating)
+            
+            max_rows = settings.POI_RADIUS_SUPERSET_MAX_ROWS
+            if settings.POI_RADIUS_FAST_PATH:
+                rows = [fast_point_representation(row, row_fields)
+                        for row in fast_point_rows(queryset, row_fields)[:max_rows + 1]]
+            else:
+                rows = self.get_serializer(
+                    queryset[:max_rows + 1], many=True, fields=row_fields
+                ).data
+            # Oversized supersets are remembered as such, not stored
+            rows = rows if len(rows) <= max_rows else False
+            cache.set(cache_key, rows, settings.POI_RADIUS_CACHE_TTL)
+        
+        if rows is False:
+            record_superset_lookup('bypassed')
+            return None
+        
+        # Exact filter and (distance, id) order against the requested centre,
+        # on the spheroid like the geography engine, so boundary rows,
+        # distances and order match the database path. The sphere distance
+        # cheaply skips rows clearly outside first
+        lng, lat = data['lng'], data['lat']
+        radius_m = data['radius_km'] * 1000
+        matches = []
+        for row in rows:
+            if haversine_m(lng, lat, *row['coordinates']) > radius_m * SUPERSET_RADIUS_MARGIN:
+                continue
+            distance_m = spheroid_distance_m(lng, lat, *row['coordinates'])
+            if distance_m <= radius_m:
+                matches.append({'distance_m': distance_m, 'id': row['id'], 'row': row})
+        matches.sort(key=lambda match: (match['distance_m'], match['id']))
+        record_superset_lookup(outcome, len(rows), len(matches))
+        
+        paginator = DistanceKeysetPagination()
+        page = paginator.paginate_sequence(matches, request)
+        results = []
+        for match in page:
+            row = {**match['row'], 'distance_km': round(match['distance_m'] / 1000, 2)}
+            if fields is not None:
+                row = {name: row[name] for name in fields}
+            results.append(row)
+        
+        return Response({
+            'count': len(results),
+            'next': paginator.get_next_link(),
+            'query': query,
+            'results': results
+        }, headers={'X-Cache': 'HIT' if outcome == 'hits' else 'MISS'})
+    
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """
+        Return the k POIs closest to a point, with no radius cap.
+        
+        Query Parameters:
+        - lat: Latitude of center point
+        - lng: Longitude of center point
+        - k: Number of POIs to return (default 20, max 100)
+        - category: Filter by POI category (optional)
+        - min_rating: Minimum rating filter (optional)
+        
+        Performance optimizations:
+        - KNN ``<->`` ordering on the geography GIST index stops after about 2k rows
+        - Exact spheroid distance recheck on those candidates only
+        - Inside ``POI_MEMORY_INDEX_REGIONS``, answered from the in-process
+          grid snapshot when the requested fields allow it
+        - Under ``POI_SNAPSHOT_SERVING``, answered from the mapped snapshot file
+        """
+        serializer = NearestQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        lat = data['lat']
+        lng = data['lng']
+        k = data['k']
+        category = data.get('category')
+        min_rating = data.get('min_rating')
+        query = {
+            'center': {'lat': lat, 'lng': lng},
+            'k': k,
+            'category': category,
+            'min_rating': min_rating
+        }
+        
+        if settings.POI_SNAPSHOT_SERVING:
+            snapshot = self.get_snapshot()
+            results = self.fast_results(
+                snapshot.rows(*snapshot.nearest(lng, lat, k, category, min_rating))
+            )
+            return Response({
+                'count': len(results),
+                'query': query,
+                'results': results
+            })
+        
+        if self.memory_index_fields() is not None:
+            rows = memory_index.nearest(lng, lat, k, category, min_rating)
+            if rows is not None:
+                results = self.fast_results(rows)
+                return Response({
+                    'count': len(results),
+                    'query': query,
+                    'results': results
+                }, headers={'X-Memory-Index': 'HIT'})
+        
+        # Filters are applied inside the index-ordered scan
+        queryset = PointOfInterest.objects.all()
+        if category:
+            queryset = queryset.filter(category=category)
+        
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
+        
+        queryset = self.project(nearest_queryset(queryset, lng, lat, k))
         serializer = self.get_serializer(queryset, many=True)
         
-        # Add metadata
-        response_data = {
+        return Response({
             'count': len(serializer.data),
+            'query': query,
+            'results': serializer.data
+        })
+    
+    @action(detail=False, methods=['post'], url_path='radius-batch',
+            renderer_classes=[FastJSONRenderer])
+    def radius_batch(self, request):
+        """
+        Run many radius searches in one request and one query.
+        
+        Body:
+        - queries: List of {lat, lng, radius_km, category, min_rating, limit}
+        - limit: Nearest POIs per query without its own limit (default 20, max 100)
+        - dedupe: Return each POI only under the first query that found it
+        
+        Query Parameters:
+        - fields / profile: Sparse fieldsets, as for radius search
+        
+        Results are grouped per query, in input order, nearest first.
+        
+        Performance optimizations:
+        - One statement: ``unnest`` of the centres ``CROSS JOIN LATERAL`` a
+          KNN scan of the geography GIST index per centre, stopping at its limit
+        - Each POI is loaded and serialized once, however many queries found it
+        """
+        serializer = RadiusBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queries = data['queries']
+        
+        hits = batch_radius_hits(PointOfInterest, queries)
+        if data['dedupe']:
+            # Hits are ordered by query, so the first query keeps each POI
+            seen = set()
+            unique_hits = []
+            for hit in hits:
+                if hit[1] not in seen:
+                    seen.add(hit[1])
+                    unique_hits.append(hit)
+            hits = unique_hits
+        
+        pois = list(self.project(
+            PointOfInterest.objects.filter(pk__in={pk for _, pk, _ in hits})
+        ))
+        representations = {
+            poi.pk: poi_data
+            for poi, poi_data in zip(pois, self.get_serializer(pois, many=True).data)
+        }
+        
+        fields = self.get_response_fields()
+        with_distance = fields is None or 'distance_km' in fields
+        groups = [[] for _ in queries]
+        for index, pk, distance_m in hits:
+            poi_data = representations[pk]
+            if with_distance:
+                # Distance from this query's centre; a POI may be in several groups
+                poi_data = {**poi_data, 'distance_km': round(distance_m / 1000, 2)}
+            groups[index].append(poi_data)
+        
+        return Response({
+            'count': len(hits),
+            'dedupe': data['dedupe'],
+            'results': [
+                {
+                    'query': {
+                        'center': {'lat': query['lat'], 'lng': query['lng']},
+                        'radius_km': query['radius_km'],
+                        'category': query.get('category'),
+                        'min_rating': query.get('min_rating'),
+                        'limit': query['limit']
+                    },
+                    'count': len(group),
+                    'results': group
+                }
+                for query, group in zip(queries, groups)
+            ]
+        })
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Search POIs by text, optionally within a radius or bounding box.
+        
+        Query Parameters:
+        - q: Text matched against name, address and description (typo tolerant)
+        - lat, lng, radius_km: Restrict to a circle and rank nearer POIs higher (optional)
+        - bbox: min_lng,min_lat,max_lng,max_lat (optional)
+        - category: Filter by POI category (optional)
+        - min_rating: Minimum rating filter (optional)
+        - limit: Number of results (default 20, max 100)
+        
+        Results are ordered by ``score``: trigram similarity, blended with
+        proximity (``POI_SEARCH_TEXT_WEIGHT``) when a radius is given.
+        
+        Performance optimizations:
+        - pg_trgm GIN index on name, address and description
+        - Spatial filter on the GIST indexes; the planner starts from the
+          more selective index
+        """
+        serializer = SearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        category = data.get('category')
+        min_rating = data.get('min_rating')
+        
+        queryset = text_search(self.project(PointOfInterest.objects.all()), data['q'])
+        if data.get('radius_km') is not None:
+            queryset = rank_by_proximity(
+                radius_queryset(queryset, data['lng'], data['lat'], data['radius_km']),
+                data['radius_km']
+            )
+        else:
+            if data.get('bbox'):
+                queryset = queryset.filter(
+                    BBoxOverlaps('location', make_envelope(*data['bbox']))
+                )
+            queryset = queryset.annotate(rank=F('text_score'))
+        
+        if category:
+            queryset = queryset.filter(category=category)
+        
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
+        
+        page = list(queryset.order_by('-rank', 'id')[:data['limit']])
+        results = [
+            {**poi_data, 'score': round(poi.rank, 4)}
+            for poi, poi_data in zip(page, self.get_serializer(page, many=True).data)
+        ]
+        
+        return Response({
+            'count': len(results),
             'query': {
-                'center': {'lat': lat, 'lng': lng},
-                'radius_km': radius_km,
+                'q': data['q'],
+                'center': (
+                    {'lat': data['lat'], 'lng': data['lng']}
+                    if data.get('radius_km') is not None else None
+                ),
+                'radius_km': data.get('radius_km'),
+                'bbox': data.get('bbox'),
                 'category': category,
                 'min_rating': min_rating
             },
-            'results': serializer.data
-        }
+            'results': results
+        })
+    
+    @action(detail=False, methods=['get'], renderer_classes=[FastJSONRenderer])
+    def autocomplete(self, request):
+        """
+        Complete a name prefix with nearby, well-rated POIs (typeahead).
+        
+        Query Parameters:
+        - q: Name prefix (case-insensitive)
+        - lat, lng: User position
+        - category: Filter by POI category (optional)
+        - limit: Number of completions (default 8, max 20)
+        
+        Returns only id, name, category and coordinates.
+        
+        Performance optimizations:
+        - ``lower(name) text_pattern_ops`` index for the prefix range scan, or
+          KNN on the geography index filtered on the prefix, whichever the
+          planner finds cheaper; at most ``POI_AUTOCOMPLETE_POOL`` rows read
+        - Cached per prefix and snapped position for
+          ``POI_AUTOCOMPLETE_CACHE_TTL`` seconds
+        """
+        serializer = AutocompleteQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        lng, lat = data['center']
+        category = data.get('category')
+        cache_key = autocomplete_cache_key(data['q'], lng, lat, category, data['limit'])
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return Response(cached_result)
+        
+        queryset = PointOfInterest.objects.all()
+        if category:
+            queryset = queryset.filter(category=category)
+        
+        rows = autocomplete_candidates(
+            queryset, data['q'], lng, lat, settings.POI_AUTOCOMPLETE_POOL
+        )
+        results = rank_completions(rows, data['limit'])
+        response_data = {'count': len(results), 'results': results}
+        
+        cache.set(cache_key, response_data, settings.POI_AUTOCOMPLETE_CACHE_TTL)
+        return Response(response_data)
+    
+    @action(detail=False, methods=['get'], renderer_classes=[FastJSONRenderer])
+    def corridor(self, request):
+        """
+        Search POIs within a distance of a route, in order along it.
+        
+        Query Parameters:
+        - polyline: Route as an encoded polyline, or
+        - geojson: Route as a GeoJSON LineString
+        - precision: Encoded polyline precision, 5 (default) or 6
+        - distance_km: Distance from the route in kilometers (default 2, max 50)
+        - category: Filter by POI category (optional)
+        - min_rating: Minimum rating filter (optional)
+        - cursor / page_size: Keyset pagination on (route position, id) (optional)
+        
+        Each result carries ``distance_km`` from the route and
+        ``route_position``, its fraction of the way along the route (0-1).
+        
+        Performance optimizations:
+        - ST_DWithin against the route on the geography GIST index, one query
+          instead of many overlapping radius searches
+        - Keyset pages on the ST_LineLocatePoint position
+        """
+        serializer = CorridorQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        category = data.get('category')
+        min_rating = data.get('min_rating')
+        
+        queryset = corridor_queryset(
+            self.project(PointOfInterest.objects.all()), data['line'], data['distance_km']
+        )
+        if category:
+            queryset = queryset.filter(category=category)
+        
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
+        
+        paginator = RoutePositionKeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        results = [
+            {**poi_data, 'route_position': round(poi.route_position, 6)}
+            for poi, poi_data in zip(page, self.get_serializer(page, many=True).data)
+        ]
+        
+        return Response({
+            'count': len(results),
+            'next': paginator.get_next_link(),
+            'query': {
+                'points': len(data['line']),
+                'distance_km': data['distance_km'],
+                'category': category,
+                'min_rating': min_rating
+            },
+            'results': results
+        })
+    
+    @action(detail=False, methods=['get'])
+    def bbox(self, request):
+        """
+        Return everything in a map viewport, clustered when dense.
+        
+        Query Parameters:
+        - bbox: min_lng,min_lat,max_lng,max_lat
+        - zoom: Map zoom level (0-22)
+        - category: Filter by POI category (optional)
+        - min_rating: Minimum rating filter (optional)
+        
+        Up to ``POI_BBOX_MAX_POINTS`` matches are returned as points. Above
+        that, and below ``POI_CLUSTER_MAX_ZOOM``, the viewport is returned as
+        grid clusters with counts and centroids, so payload size stays bounded.
+        
+        Performance optimizations:
+        - ST_MakeEnvelope with the ``&&`` operator on the GIST index
+        - Bounded COUNT (LIMIT threshold + 1) to choose points or clusters
+        - ST_SnapToGrid aggregation in a single grouped query
+        - Under ``POI_SNAPSHOT_SERVING``, answered from the mapped snapshot file
+        """
+        serializer = BBoxQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        bbox = data['bbox']
+        zoom = data['zoom']
+        category = data.get('category')
+        min_rating = data.get('min_rating')
+        
+        if settings.POI_SNAPSHOT_SERVING:
+            return self._bbox_from_snapshot(bbox, zoom, category, min_rating)
+        
+        queryset = PointOfInterest.objects.filter(
+            BBoxOverlaps('location', make_envelope(*bbox))
+        )
+        if category:
+            queryset = queryset.filter(category=category)
+        
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
+        
+        threshold = settings.POI_BBOX_MAX_POINTS
+        matched = queryset.order_by()[:threshold + 1].count()
+        
+        if matched <= threshold or zoom >= settings.POI_CLUSTER_MAX_ZOOM:
+            points = self.project(queryset).order_by('-rating', 'id')[:threshold]
+            serializer = self.get_serializer(points, many=True)
+            return Response({
+                'type': 'points',
+                'count': len(serializer.data),
+                'truncated': matched > threshold,
+                'zoom': zoom,
+                'results': serializer.data
+            })
+        
+        cell_size = cluster_cell_size(bbox, zoom)
+        clusters = [
+            {'count': count, 'coordinates': [lng, lat]}
+            for count, lng, lat in grid_clusters(queryset, cell_size)
+        ]
+        return Response({
+            'type': 'clusters',
+            'count': sum(cluster['count'] for cluster in clusters),
+            'zoom': zoom,
+            'cell_size': cell_size,
+            'clusters': clusters
+        })
+    
+    def _bbox_from_snapshot(self, bbox, zoom, category, min_rating):
+        """Answer a viewport query from the snapshot file, without the database."""
+        snapshot = self.get_snapshot()
+        indexes = snapshot.within_box(bbox, category, min_rating)
+        threshold = settings.POI_BBOX_MAX_POINTS
+        
+        if len(indexes) <= threshold or zoom >= settings.POI_CLUSTER_MAX_ZOOM:
+            results = self.fast_results(snapshot.rows(snapshot.by_rating(indexes)[:threshold]))
+            return Response({
+                'type': 'points',
+                'count': len(results),
+                'truncated': len(indexes) > threshold,
+                'zoom': zoom,
+                'results': results
+            })
+        
+        cell_size = cluster_cell_size(bbox, zoom)
+        clusters = [
+            {'count': count, 'coordinates': [lng, lat]}
+            for count, lng, lat in snapshot.clusters(indexes, cell_size)
+        ]
+        return Response({
+            'type': 'clusters',
+            'count': sum(cluster['count'] for cluster in clusters),
+            'zoom': zoom,
+            'cell_size': cell_size,
+            'clusters': clusters
+        })
+    
+    @action(detail=False, methods=['get'])
+    def aggregate(self, request):
+        """
+        Count POIs per grid cell over a region, for heatmaps.
+        
+        Query Parameters:
+        - bbox: min_lng,min_lat,max_lng,max_lat, or
+        - lat, lng, radius_km: Circular region (max 100 km)
+        - cell_km: Cell size in kilometers (square side or hexagon edge)
+        - shape: ``hex`` (default) or ``square``
+        - category: Filter by POI category (optional)
+        - min_rating: Minimum rating filter (optional)
+        
+        Each non-empty cell reports its index, centre, count and average
+        rating, overall and per category. Regions spanning more than
+        ``POI_AGGREGATE_MAX_CELLS`` cells are rejected.
+        
+        Performance optimizations:
+        - Region filtered on the GIST indexes (``&&`` or ST_DWithin)
+        - Cells computed and grouped in the database in a single query
+        - Only non-empty cells are returned
+        """
+        serializer = AggregateQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if data.get('bbox'):
+            queryset = PointOfInterest.objects.filter(
+                BBoxOverlaps('location', make_envelope(*data['bbox']))
+            )
+        else:
+            queryset = radius_queryset(
+                PointOfInterest.objects.all(), data['lng'], data['lat'], data['radius_km']
+            )
+        
+        if data.get('category'):
+            queryset = queryset.filter(category=data['category'])
+        
+        if data.get('min_rating') is not None:
+            queryset = queryset.filter(rating__gte=data['min_rating'])
+        
+        cells = {}
+        for i, j, lng, lat, category, count, rated, avg_rating in aggregate_cells(
+            queryset, data['cell_size'], data['shape']
+        ):
+            cell = cells.setdefault((i, j), {
+                'cell': [i, j],
+                'coordinates': [lng, lat],
+                'count': 0,
+                'rated': 0,
+                'rating_sum': 0,
+                'categories': {}
+            })
+            cell['count'] += count
+            if rated:
+                cell['rated'] += rated
+                cell['rating_sum'] += avg_rating * rated
+            cell['categories'][category] = {
+                'count': count,
+                'avg_rating': round(float(avg_rating), 2) if rated else None
+            }
+        
+        results = []
+        for cell in cells.values():
+            rated, rating_sum = cell.pop('rated'), cell.pop('rating_sum')
+            cell['avg_rating'] = round(float(rating_sum / rated), 2) if rated else None
+            results.append(cell)
+        
+        return Response({
+            'shape': data['shape'],
+            'cell_km': data['cell_km'],
+            'cell_size_m': data['cell_size'],
+            'count': sum(cell['count'] for cell in results),
+            'cells': results
+        })
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every matching POI as GeoJSON or NDJSON.
+        
+        Query Parameters:
+        - output: ``geojson`` (FeatureCollection, default) or ``ndjson``
+        - bbox: min_lng,min_lat,max_lng,max_lat (optional)
+        - category: Filter by POI category (optional)
+        - updated_since: ISO 8601 timestamp (optional)
+        
+        Performance optimizations:
+        - Keyset pages of ``POI_EXPORT_CHUNK_SIZE`` rows on (updated_at, id);
+          no transaction or cursor is held open while a client downloads
+        - Features encoded from values_list tuples, no model instances
+        - Ordered by (updated_at, id) for resumable incremental syncs
+        - Under ASGI, streamed as an async iterator so memory stays flat
+        """
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        queryset = PointOfInterest.objects.all()
+        if data.get('bbox'):
+            queryset = queryset.filter(
+                BBoxOverlaps('location', make_envelope(*data['bbox']))
+            )
+        
+        if data.get('category'):
+            queryset = queryset.filter(category=data['category'])
+        
+        if data.get('updated_since'):
+            queryset = queryset.filter(updated_at__gte=data['updated_since'])
+        
+        rows = export_rows(queryset, settings.POI_EXPORT_CHUNK_SIZE)
+        if data['output'] == 'ndjson':
+            content, content_type = iter_ndjson(rows), 'application/x-ndjson'
+        else:
+            content, content_type = iter_geojson(rows), 'application/geo+json'
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_sync(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        
+        response['Content-Disposition'] = f'attachment; filename="pois.{data["output"]}"'
+        return response
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Create or update many POIs in one request and one transaction.
+        
+        Body: a JSON array (or ``{"items": [...]}``) or an NDJSON stream of
+        POIs in the create format. Existing (name, location) pairs are updated.
+        
+        Headers:
+        - Idempotency-Key: Replays the stored response for retried requests
+        
+        Returns per-item results with status ``created``, ``updated``,
+        ``duplicate`` (superseded by a later item) or ``error``.
+        """
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('items')
+        if not isinstance(items, list):
+            return Response(
+                {'detail': 'Expected a list of POIs.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.POI_BULK_MAX_ITEMS:
+            return Response(
+                {'detail': f'At most {settings.POI_BULK_MAX_ITEMS} POIs per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key:
+            cache_key = 'poi_bulk_' + hashlib.sha256(idempotency_key.encode()).hexdigest()
+            fingerprint = hashlib.sha256(
+                json.dumps(items, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            
+            # cache.add is atomic: only the first request with this key proceeds
+            if not cache.add(cache_key, {'fingerprint': fingerprint}, settings.POI_IDEMPOTENCY_TTL):
+                stored = cache.get(cache_key) or {}
+                if stored.get('fingerprint') != fingerprint:
+                    return Response(
+                        {'detail': 'Idempotency-Key was already used with a different payload.'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                if 'response' not in stored:
+                    return Response(
+                        {'detail': 'A request with this Idempotency-Key is in progress.'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                return Response(stored['response'], headers={'Idempotent-Replayed': 'true'})
+        
+        try:
+            response_data = self._upsert_items(items)
+        except Exception:
+            if idempotency_key:
+                # Let the client retry instead of seeing "in progress"
+                cache.delete(cache_key)
+            raise
+        
+        if idempotency_key:
+            cache.set(
+                cache_key,
+                {'fingerprint': fingerprint, 'response': response_data},
+                settings.POI_IDEMPOTENCY_TTL
+            )
         
         return Response(response_data)
     
+    def _upsert_items(self, items):
+        """Validate a batch of raw POIs and upsert the valid ones."""
+        results = [None] * len(items)
+        instances = {}
+        keys = {}
+        for index, (item, coordinate_error) in enumerate(
+            zip(items, validate_coordinate_batch(items))
+        ):
+            if coordinate_error:
+                results[index] = {'index': index, 'status': 'error',
+                                  'errors': {'coordinates': [coordinate_error]}}
+                continue
+            
+            serializer = PointOfInterestBulkItemSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {'index': index, 'status': 'error',
+                                  'errors': serializer.errors}
+                continue
+            
+            data = dict(serializer.validated_data)
+            longitude, latitude = data.pop('coordinates')
+            
+            # Later items win over earlier ones with the same (name, location)
+            key = (data['name'], longitude, latitude)
+            if key in keys:
+                previous = keys[key]
+                del instances[previous]
+                results[previous] = {'index': previous, 'status': 'duplicate',
+                                     'superseded_by': index}
+            keys[key] = index
+            instances[index] = PointOfInterest(
+                location=Point(longitude, latitude, srid=4326), **data
+            )
+        
+        for index, (item_status, poi_id) in bulk_upsert(instances).items():
+            results[index] = {'index': index, 'status': item_status, 'id': poi_id}
+        
+        return {
+            'created': sum(1 for r in results if r['status'] == 'created'),
+            'updated': sum(1 for r in results if r['status'] == 'updated'),
+            'errors': sum(1 for r in results if r['status'] == 'error'),
+            'results': results
+        }
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """
+        Report radius superset cache counters for tuning the snapping grid.
+        
+        ``rows_per_match`` is the superset rows scanned per row returned:
+        coarser grids and buckets raise the hit rate and this overhead.
+        """
+        return Response({
+            'radius_superset': superset_stats(),
+            'settings': {
+                'snap_degrees': settings.POI_RADIUS_SNAP_DEGREES,
+                'radius_buckets_km': settings.POI_RADIUS_BUCKETS_KM,
+                'max_rows': settings.POI_RADIUS_SUPERSET_MAX_ROWS
+            }
+        })
+    
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """Get list of available POI categories."""
@@ -141,37 +1082,82 @@ class PointOfInterestViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get basic statistics about POIs."""
-        from django.db.models import Count, Avg
+        """
+        Get basic statistics about POIs.
         
-        stats = PointOfInterest.objects.aggregate(
-            total_count=Count('id'),
-            avg_rating=Avg('rating'),
-            category_count=Count('category', distinct=True)
-        )
+        Performance optimizations:
+        - Read from the trigger-maintained ``CategoryStats`` summary table:
+          O(categories), never a scan of the POI table
+        - Totals include every committed write; ``as_of`` is when the
+          transaction behind the latest change started
+        """
+        summary = list(CategoryStats.objects.order_by('-poi_count', 'category'))
+        # Emptied categories keep their row (and its timestamp) at zero
+        category_stats = [row for row in summary if row.poi_count > 0]
         
-        category_stats = PointOfInterest.objects.values('category').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        total_count = sum(row.poi_count for row in category_stats)
+        rating_count = sum(row.rating_count for row in category_stats)
+        rating_sum = sum(row.rating_sum for row in category_stats)
         
         return Response({
-            'total_pois': stats['total_count'],
-            'average_rating': round(stats['avg_rating'], 2) if stats['avg_rating'] else None,
-            'categories': list(category_stats)
+            'total_pois': total_count,
+            'average_rating': round(rating_sum / rating_count, 2) if rating_count else None,
+            'categories': [
+                {'category': row.category, 'count': row.poi_count}
+                for row in category_stats
+            ],
+            'as_of': max((row.updated_at for row in summary), default=None)
         })
     
     def list(self, request, *args, **kwargs):
         """Override list to add performance optimizations."""
-        # Add caching for list view
-        cache_key = f"poi_list_{request.query_params}"
+        # Cached until the next write to any POI
+        cache_key = list_cache_key(request)
         cached_result = cache.get(cache_key)
         
-        if cached_result:
+        if cached_result is not None:
             return Response(cached_result)
         
         response = super().list(request, *args, **kwargs)
         
-        # Cache for 2 minutes
-        cache.set(cache_key, response.data, 120)
+        cache.set(cache_key, response.data, settings.POI_LIST_CACHE_TTL)
         
-        return response 
\ No newline at end of file
+        return response 
+
+
+@require_GET
+def vector_tile(request, z, x, y):
+    """
+    Serve POIs as a Mapbox Vector Tile (layer ``pois``).
+    
+    Query Parameters:
+    - category: Filter by POI category (optional)
+    - min_rating: Minimum rating filter (optional)
+    
+    Features carry ``name``, ``category`` and ``rating`` properties and the
+    POI id as feature id. Responses carry an ETag; ``If-None-Match`` returns
+    304 while the tile is unchanged.
+    
+    Performance optimizations:
+    - One ST_AsMVT statement per tile, filtered on the GIST index
+    - Encoded tiles cached per (z, x, y, filters)
+    - Writes invalidate only the tiles containing the changed POI
+    """
+    if not tile_exists(z, x, y):
+        raise Http404('Tile out of range')
+    
+    serializer = TileQuerySerializer(data=request.GET)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    data = serializer.validated_data
+    
+    tile, etag = get_tile(z, x, y, data.get('category'), data.get('min_rating'))
+    # Weak If-None-Match comparison over the ETag list, including "*"
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(tile, content_type=TILE_CONTENT_TYPE)
+    
+    response['ETag'] = etag
+    # Clients revalidate every time; unchanged tiles cost a 304
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Load-test the sync (WSGI) and async (ASGI) radius endpoints side by side.
+
+Each run keeps N clients busy for a fixed duration, every request using a
+random centre in the region so neither cache can answer it, and prints
+throughput and latency percentiles per endpoint and concurrency level.
+
+    docker-compose up -d web asgi
+    python scripts/loadtest.py --concurrency 100 500 1000 --duration 30
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sync-url', default='http://localhost:8000/api/pois/pois/',
+        help='Radius endpoint served by the WSGI server'
+    )
+    parser.add_argument(
+        '--async-url', default='http://localhost:8001/api/pois/async/radius/',
+        help='Radius endpoint served by the ASGI server'
+    )
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per run')
+    parser.add_argument('--radius-km', type=float, default=2.0)
+    parser.add_argument(
+        '--region', type=float, nargs=4, default=[-74.26, 40.48, -73.70, 40.92],
+        metavar=('MIN_LNG', 'MIN_LAT', 'MAX_LNG', 'MAX_LAT'),
+        help='Area request centres are drawn from (default: NYC)'
+    )
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout')
+    return parser.parse_args()
+
+
+def random_params(args):
+    min_lng, min_lat, max_lng, max_lat = args.region
+    return {
+        'lat': f'{random.uniform(min_lat, max_lat):.6f}',
+        'lng': f'{random.uniform(min_lng, max_lng):.6f}',
+        'radius_km': args.radius_km,
+        # An explicit engine skips the normalised superset cache
+        'engine': 'geography',
+        'profile': 'slim',
+    }
+
+
+async def client_loop(client, url, args, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, params=random_params(args))
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors.append(time.perf_counter() - start)
+        else:
+            latencies.append(time.perf_counter() - start)
+
+
+async def run(url, concurrency, args):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, errors = [], []
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            client_loop(client, url, args, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(label, concurrency, latencies, errors, elapsed):
+    latencies.sort()
+    if latencies:
+        timings = (
+            f'p50 {statistics.median(latencies) * 1000:8.1f}ms  '
+            f'p95 {percentile(latencies, 0.95) * 1000:8.1f}ms  '
+            f'p99 {percentile(latencies, 0.99) * 1000:8.1f}ms'
+        )
+    else:
+        timings = 'no successful requests'
+    print(
+        f'{label:<6} {concurrency:>5} clients  {len(latencies) / elapsed:8.1f} req/s  '
+        f'{timings}  errors {len(errors)}'
+    )
+
+
+async def main():
+    args = parse_args()
+    for concurrency in args.concurrency:
+        for label, url in (('sync', args.sync_url), ('async', args.async_url)):
+            report(label, concurrency, *await run(url, concurrency, args))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Runs once when the primary's data directory is initialised: accept
+# streaming replication connections from the compose network.
+set -e
+echo "host replication all all trust" >> "$PGDATA/pg_hba.conf"
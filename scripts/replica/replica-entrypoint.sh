@@ -0,0 +1,15 @@
+#!/bin/bash
+# Start a hot standby of the `db` service, cloning it on first start.
+set -e
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h "$PRIMARY_HOST" -U "$POSTGRES_USER"; do
+        echo "Waiting for primary $PRIMARY_HOST"
+        sleep 2
+    done
+    # -R writes standby.signal and primary_conninfo
+    pg_basebackup -h "$PRIMARY_HOST" -U "$POSTGRES_USER" -D "$PGDATA" -X stream -R
+    chmod 0700 "$PGDATA"
+fi
+
+exec postgres -c hot_standby=on
@@ -3,11 +3,16 @@ Test suite for Point of Interest API.
 """
 import json
 from decimal import Decimal
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.gis.geos import Point
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from pois.async_db import close_pools
 from pois.models import PointOfInterest
 
 
@@ -48,6 +53,9 @@ class PointOfInterestAPITest(APITestCase):
     
     def setUp(self):
         """Set up test POIs with known coordinates."""
+        # Cached responses are invalidated on commit, which tests never reach
+        cache.clear()
+        
         # Create test POIs around NYC
         self.pois = [
             PointOfInterest.objects.create(
@@ -88,7 +96,61 @@ class PointOfInterestAPITest(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+    
+    def test_list_pois_keyset_pagination(self):
+        """Test list pages newest first and follows the next cursor."""
+        url = reverse('pointofinterest-list')
+        
+        seen = []
+        response = self.client.get(url, {'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(poi['id'] for poi in response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        
+        expected = list(
+            PointOfInterest.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+    
+    def test_list_pois_invalid_cursor(self):
+        """Test a malformed cursor is rejected."""
+        url = reverse('pointofinterest-list')
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_list_pois_slim_profile(self):
+        """Test the slim profile returns map-pin fields without reading others."""
+        url = reverse('pointofinterest-list')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'profile': 'slim'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(response.data['results'][0]),
+            ['id', 'name', 'category', 'rating', 'coordinates', 'distance_km']
+        )
+        self.assertFalse(any('"description"' in query['sql'] for query in queries))
+    
+    def test_list_pois_invalid_fields(self):
+        """Test unknown fields and profiles are rejected."""
+        url = reverse('pointofinterest-list')
+        
+        self.assertEqual(
+            self.client.get(url, {'fields': 'name,secret'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(url, {'profile': 'tiny'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
     
     def test_radius_search_basic(self):
         """Test basic radius search functionality."""
@@ -161,6 +223,350 @@ class PointOfInterestAPITest(APITestCase):
         # Should find all POIs within 40km
         self.assertEqual(len(response.data['results']), 5)
     
+    def test_radius_search_keyset_pagination(self):
+        """Test radius pages continue by (distance, id) without gaps or repeats."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 40.0, 'page_size': 2}
+        
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = response.data['results']
+        self.assertEqual(len(first_page), 2)
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second_page = response.data['results']
+        self.assertEqual(len(second_page), 2)
+        
+        self.assertFalse({p['id'] for p in first_page} & {p['id'] for p in second_page})
+        self.assertLessEqual(first_page[-1]['distance_km'], second_page[0]['distance_km'])
+    
+    def test_radius_search_engines_agree(self):
+        """Test geography and projected engines return the same POIs in order."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 5.0}
+        
+        results = {}
+        for engine in ('geography', 'projected'):
+            response = self.client.get(url, {**params, 'engine': engine})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['query']['engine'], engine)
+            results[engine] = [poi['id'] for poi in response.data['results']]
+        
+        self.assertEqual(results['geography'], results['projected'])
+        # Brooklyn Bridge is ~5.8km from Times Square
+        brooklyn_bridge = self.pois[3]
+        self.assertNotIn(brooklyn_bridge.id, results['geography'])
+    
+    def test_radius_search_cache_invalidated_by_write(self):
+        """Test a cached radius result is evicted by a write inside the circle."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -73.9855, 'radius_km': 2}
+        before = self.client.get(url, params).data['count']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            PointOfInterest.objects.create(
+                name="Bryant Park",
+                category="park",
+                location=Point(-73.9832, 40.7536, srid=4326),
+                rating=4.6
+            )
+        
+        response = self.client.get(url, params)
+        self.assertEqual(response.data['count'], before + 1)
+    
+    def test_radius_search_cache_survives_distant_write(self):
+        """Test a write far away leaves cached radius results in place."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -73.9855, 'radius_km': 2}
+        self.client.get(url, params)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            PointOfInterest.objects.create(
+                name="Tower Bridge",
+                category="landmark",
+                location=Point(-0.0754, 51.5055, srid=4326)
+            )
+        
+        with self.assertNumQueries(0):
+            self.client.get(url, params)
+    
+    def test_list_cache_invalidated_by_update(self):
+        """Test list pages reflect updates made after they were cached."""
+        url = reverse('pointofinterest-list')
+        self.client.get(url)
+        
+        poi = self.pois[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('pointofinterest-detail', args=[poi.id]),
+                {'name': 'Renamed Square'},
+                format='json'
+            )
+        
+        names = [item['name'] for item in self.client.get(url).data['results']]
+        self.assertIn('Renamed Square', names)
+    
+    @override_settings(POI_RADIUS_SNAP_DEGREES=0.01)
+    def test_radius_search_superset_shared_by_nearby_queries(self):
+        """Test nearby raw-GPS queries share a superset and match exact results."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.758012, 'lng': -74.006031, 'radius_km': 5.0}
+        
+        first = self.client.get(url, params)
+        second = self.client.get(url, {**params, 'lat': 40.758377, 'lng': -74.005894})
+        
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        with override_settings(POI_RADIUS_SNAP_DEGREES=0):
+            exact = self.client.get(url, params)
+        self.assertNotIn('X-Cache', exact)
+        self.assertEqual(
+            [(poi['id'], poi['distance_km']) for poi in first.data['results']],
+            [(poi['id'], poi['distance_km']) for poi in exact.data['results']]
+        )
+    
+    @override_settings(POI_RADIUS_SNAP_DEGREES=0)
+    def test_radius_search_fast_path_matches_serializer(self):
+        """Test the serializer-free fast path renders byte-identical responses."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 40.0, 'page_size': 3}
+        
+        contents = []
+        for fast_path in (False, True):
+            cache.clear()
+            with override_settings(POI_RADIUS_FAST_PATH=fast_path):
+                first = self.client.get(url, params)
+                second = self.client.get(first.data['next'])
+            contents.append((first.content, second.content))
+        
+        self.assertEqual(contents[0], contents[1])
+    
+    def test_radius_search_sparse_fields(self):
+        """Test ``fields`` narrows radius results on every response path."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 40.0, 'fields': 'rating,name'}
+        
+        for snap_degrees in (0, 0.01):
+            for fast_path in (False, True):
+                cache.clear()
+                with override_settings(POI_RADIUS_SNAP_DEGREES=snap_degrees,
+                                       POI_RADIUS_FAST_PATH=fast_path):
+                    response = self.client.get(url, params)
+                
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.data['results']), 5)
+                for poi in response.data['results']:
+                    self.assertEqual(list(poi), ['id', 'name', 'rating'])
+    
+    @override_settings(POI_RADIUS_SNAP_DEGREES=0.01)
+    def test_cache_stats(self):
+        """Test superset hit/miss counters are exposed."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 5.0}
+        self.client.get(url, params)
+        self.client.get(url, params)
+        
+        response = self.client.get(reverse('pointofinterest-cache-stats'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['radius_superset']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+    
+    def test_nearest(self):
+        """Test nearest returns k POIs ordered by distance."""
+        url = reverse('pointofinterest-nearest')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'k': 3}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        names = [poi['name'] for poi in response.data['results']]
+        self.assertEqual(names[0], 'Times Square')
+        self.assertEqual(names[1], 'Empire State Building')
+        distances = [poi['distance_km'] for poi in response.data['results']]
+        self.assertEqual(distances, sorted(distances))
+    
+    def test_nearest_with_category_filter(self):
+        """Test nearest applies category filter before taking k rows."""
+        url = reverse('pointofinterest-nearest')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'k': 5, 'category': 'museum'}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Metropolitan Museum')
+    
+    def test_radius_batch_grouped_per_query(self):
+        """Test batch radius results come back per query, nearest first."""
+        url = reverse('pointofinterest-radius-batch')
+        body = {'queries': [
+            {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 3},
+            {'lat': 40.7829, 'lng': -73.9654, 'radius_km': 1, 'category': 'museum'},
+            {'lat': 0.0, 'lng': 0.0, 'radius_km': 1},
+        ]}
+        
+        with self.assertNumQueries(2):
+            response = self.client.post(url, body, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        groups = response.data['results']
+        self.assertEqual(
+            [poi['name'] for poi in groups[0]['results']],
+            ['Times Square', 'Empire State Building']
+        )
+        self.assertEqual([poi['name'] for poi in groups[1]['results']], ['Metropolitan Museum'])
+        self.assertGreater(groups[1]['results'][0]['distance_km'], 0)
+        self.assertEqual(groups[2]['count'], 0)
+        self.assertEqual(response.data['count'], 3)
+    
+    def test_radius_batch_dedupe(self):
+        """Test dedupe keeps each POI only under the first query that found it."""
+        url = reverse('pointofinterest-radius-batch')
+        body = {
+            'queries': [
+                {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 3},
+                {'lat': 40.7484, 'lng': -73.9857, 'radius_km': 3, 'limit': 1},
+            ],
+            'dedupe': True
+        }
+        
+        response = self.client.post(url + '?profile=slim', body, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second = response.data['results']
+        self.assertEqual(first['count'], 2)
+        # Its only hit, the Empire State Building, was already returned
+        self.assertEqual(second['count'], 0)
+        self.assertNotIn('description', first['results'][0])
+    
+    @override_settings(POI_BATCH_MAX_QUERIES=2)
+    def test_radius_batch_too_many_queries(self):
+        """Test batches above POI_BATCH_MAX_QUERIES are rejected."""
+        url = reverse('pointofinterest-radius-batch')
+        body = {'queries': [{'lat': 40.75, 'lng': -73.99}] * 3}
+        
+        response = self.client.post(url, body, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_search_tolerates_typos(self):
+        """Test text search ranks trigram matches, including misspellings."""
+        url = reverse('pointofinterest-search')
+        
+        response = self.client.get(url, {'q': 'Metropolitn'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Metropolitan Museum')
+        self.assertGreater(response.data['results'][0]['score'], 0)
+    
+    def test_search_blends_proximity(self):
+        """Test equally similar matches rank nearer ones first within a radius."""
+        url = reverse('pointofinterest-search')
+        for name, lng in (("Joe's Pizza Uptown", -73.95), ("Joe's Pizza", -73.9860)):
+            PointOfInterest.objects.create(
+                name=name, category='restaurant', location=Point(lng, 40.7484, srid=4326)
+            )
+        params = {'q': 'pizza', 'lat': 40.7484, 'lng': -73.9857, 'radius_km': 5}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [poi['name'] for poi in response.data['results']]
+        self.assertEqual(names, ["Joe's Pizza", "Joe's Pizza Uptown"])
+        self.assertIsNotNone(response.data['results'][0]['distance_km'])
+    
+    def test_search_bbox_and_validation(self):
+        """Test search applies a bbox and rejects a partial circle."""
+        url = reverse('pointofinterest-search')
+        
+        response = self.client.get(url, {'q': 'Bridge', 'bbox': '-74.01,40.74,-73.98,40.76'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+        
+        response = self.client.get(url, {'q': 'Bridge', 'lat': 40.7})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_autocomplete_prefix_near_user(self):
+        """Test autocomplete completes a prefix, nearest and best rated first."""
+        url = reverse('pointofinterest-autocomplete')
+        PointOfInterest.objects.create(
+            name="Empire Diner", category='restaurant',
+            location=Point(-74.0020, 40.7460, srid=4326), rating=3.0
+        )
+        params = {'q': 'emp', 'lat': 40.7484, 'lng': -73.9857}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(
+            [poi['name'] for poi in results], ['Empire State Building', 'Empire Diner']
+        )
+        self.assertEqual(set(results[0]), {'id', 'name', 'category', 'coordinates'})
+    
+    def test_autocomplete_cached_per_prefix(self):
+        """Test repeated prefixes near the same position are served from cache."""
+        url = reverse('pointofinterest-autocomplete')
+        params = {'q': 'Cen', 'lat': 40.7829, 'lng': -73.9654}
+        self.client.get(url, params)
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {**params, 'q': 'cen', 'lng': -73.9651})
+        
+        self.assertEqual(response.data['results'][0]['name'], 'Central Park')
+    
+    def test_corridor_ordered_along_route(self):
+        """Test corridor results follow the route and page by position."""
+        url = reverse('pointofinterest-corridor')
+        # Brooklyn Bridge -> Empire State Building -> Central Park
+        route = {'type': 'LineString', 'coordinates': [
+            [-73.9969, 40.7061], [-73.9857, 40.7484], [-73.9654, 40.7829]
+        ]}
+        params = {'geojson': json.dumps(route), 'distance_km': 1, 'page_size': 2}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [poi['name'] for poi in response.data['results']],
+            ['Brooklyn Bridge', 'Empire State Building']
+        )
+        self.assertEqual(response.data['results'][0]['route_position'], 0)
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get(response.data['next'])
+        
+        self.assertEqual(
+            [poi['name'] for poi in response.data['results']],
+            ['Metropolitan Museum', 'Central Park']
+        )
+        self.assertIsNone(response.data['next'])
+    
+    def test_corridor_encoded_polyline(self):
+        """Test corridor accepts an encoded polyline and excludes distant POIs."""
+        url = reverse('pointofinterest-corridor')
+        params = {'polyline': 'clmwFrosbMkgG_eAsvE{}B', 'distance_km': 1, 'category': 'landmark'}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [poi['name'] for poi in response.data['results']]
+        self.assertEqual(names, ['Brooklyn Bridge', 'Empire State Building'])
+        self.assertNotIn('Times Square', names)
+    
+    def test_corridor_invalid_route(self):
+        """Test corridor rejects missing or malformed routes."""
+        url = reverse('pointofinterest-corridor')
+        
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'polyline': 'clmwF'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
     def test_radius_search_invalid_coordinates(self):
         """Test radius search with invalid coordinates."""
         url = reverse('pointofinterest-radius-search')
@@ -208,6 +614,271 @@ class PointOfInterestAPITest(APITestCase):
         self.assertEqual(poi.category, 'restaurant')
         self.assertEqual(poi.coordinates, (-73.9857, 40.7484))
     
+    def test_bbox_points(self):
+        """Test viewport query returns points inside the bounding box."""
+        url = reverse('pointofinterest-bbox')
+        params = {'bbox': '-74.01,40.74,-73.98,40.76', 'zoom': 15}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['type'], 'points')
+        names = sorted(poi['name'] for poi in response.data['results'])
+        self.assertEqual(names, ['Empire State Building', 'Times Square'])
+    
+    @override_settings(POI_BBOX_MAX_POINTS=2)
+    def test_bbox_clusters_above_threshold(self):
+        """Test dense viewports are returned as grid clusters."""
+        url = reverse('pointofinterest-bbox')
+        params = {'bbox': '-74.3,40.5,-73.7,40.9', 'zoom': 10}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['type'], 'clusters')
+        self.assertEqual(response.data['count'], 5)
+        for cluster in response.data['clusters']:
+            self.assertGreater(cluster['count'], 0)
+            self.assertEqual(len(cluster['coordinates']), 2)
+    
+    def test_aggregate_hex_cells(self):
+        """Test hexbin aggregates count every POI once with per-category stats."""
+        url = reverse('pointofinterest-aggregate')
+        params = {'bbox': '-74.3,40.5,-73.7,40.9', 'cell_km': 50}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['shape'], 'hex')
+        self.assertEqual(response.data['count'], 5)
+        # 50 km hexagons put all of Manhattan in one or two cells
+        landmarks = sum(
+            cell['categories'].get('landmark', {}).get('count', 0)
+            for cell in response.data['cells']
+        )
+        self.assertEqual(landmarks, 3)
+    
+    def test_aggregate_square_cells_in_radius(self):
+        """Test square cells over a circular region separate distant POIs."""
+        url = reverse('pointofinterest-aggregate')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 3, 'cell_km': 0.5,
+                  'shape': 'square'}
+        
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Times Square and the Empire State Building, in different cells
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['cells']), 2)
+        for cell in response.data['cells']:
+            self.assertEqual(cell['count'], 1)
+            self.assertEqual(cell['categories'], {
+                'landmark': {'count': 1, 'avg_rating': cell['avg_rating']}
+            })
+    
+    @override_settings(POI_AGGREGATE_MAX_CELLS=100)
+    def test_aggregate_rejects_too_many_cells(self):
+        """Test regions spanning too many cells are rejected."""
+        url = reverse('pointofinterest-aggregate')
+        
+        response = self.client.get(url, {'bbox': '-74.3,40.5,-73.7,40.9', 'cell_km': 0.1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.get(url, {'cell_km': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_vector_tile_etag(self):
+        """Test vector tiles are served with an ETag and revalidated with 304."""
+        url = reverse('poi-tile', kwargs={'z': 10, 'x': 301, 'y': 384})
+        
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertGreater(len(response.content), 0)
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_vector_tile_if_none_match_list(self):
+        """Test If-None-Match is parsed as an ETag list and honours "*"."""
+        url = reverse('poi-tile', kwargs={'z': 10, 'x': 301, 'y': 384})
+        etag = self.client.get(url)['ETag']
+        
+        for header, expected in (
+            (f'"stale", W/{etag}', status.HTTP_304_NOT_MODIFIED),
+            ('*', status.HTTP_304_NOT_MODIFIED),
+            ('"stale", "other"', status.HTTP_200_OK),
+            (f'"x{etag[1:]}', status.HTTP_200_OK),
+        ):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, expected, header)
+    
+    def test_vector_tile_invalidated_by_write(self):
+        """Test creating a POI through the API refreshes the tiles it falls in."""
+        tile_url = reverse('poi-tile', kwargs={'z': 10, 'x': 301, 'y': 384})
+        untouched_url = reverse('poi-tile', kwargs={'z': 10, 'x': 0, 'y': 0})
+        etag = self.client.get(tile_url)['ETag']
+        untouched_etag = self.client.get(untouched_url)['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('pointofinterest-list'), {
+                'name': 'Tile Test POI',
+                'category': 'restaurant',
+                'coordinates': [-73.9857, 40.7484],
+                'rating': 4.0
+            }, format='json')
+        
+        self.assertNotEqual(self.client.get(tile_url)['ETag'], etag)
+        response = self.client.get(untouched_url, HTTP_IF_NONE_MATCH=untouched_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_vector_tile_out_of_range(self):
+        """Test tile coordinates outside the zoom level return 404."""
+        url = reverse('poi-tile', kwargs={'z': 2, 'x': 4, 'y': 0})
+        
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_export_geojson(self):
+        """Test streaming export returns a GeoJSON FeatureCollection."""
+        url = reverse('pointofinterest-export')
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        document = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(document['type'], 'FeatureCollection')
+        self.assertEqual(len(document['features']), 5)
+        feature = document['features'][0]
+        self.assertEqual(feature['geometry']['type'], 'Point')
+        self.assertIn('name', feature['properties'])
+    
+    def test_export_ndjson_with_filters(self):
+        """Test NDJSON export applies bbox and category filters."""
+        url = reverse('pointofinterest-export')
+        params = {
+            'output': 'ndjson',
+            'category': 'landmark',
+            'bbox': '-74.01,40.74,-73.98,40.76'  # Midtown only
+        }
+        response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        names = sorted(json.loads(line)['properties']['name'] for line in lines)
+        self.assertEqual(names, ['Empire State Building', 'Times Square'])
+    
+    @override_settings(POI_EXPORT_CHUNK_SIZE=2)
+    def test_export_pages_through_every_row(self):
+        """Test export reads keyset pages and emits each POI once, in order."""
+        url = reverse('pointofinterest-export')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'output': 'ndjson'})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        
+        features = [json.loads(line) for line in lines]
+        self.assertEqual(len({feature['id'] for feature in features}), 5)
+        self.assertEqual(
+            [(f['properties']['updated_at'], f['id']) for f in features],
+            sorted((f['properties']['updated_at'], f['id']) for f in features)
+        )
+        self.assertEqual(len(queries), 3)
+    
+    def test_export_invalid_bbox(self):
+        """Test export rejects a malformed bbox."""
+        url = reverse('pointofinterest-export')
+        response = self.client.get(url, {'bbox': '1,2,3'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_create_duplicate_poi(self):
+        """Test creating a POI with an existing name and location is rejected."""
+        url = reverse('pointofinterest-list')
+        data = {
+            'name': 'Times Square',
+            'category': 'landmark',
+            'coordinates': [-74.0060, 40.7580]
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(PointOfInterest.objects.count(), 5)
+    
+    def test_rename_onto_duplicate_poi(self):
+        """Test renaming a POI onto another's name and location is rejected."""
+        poi = PointOfInterest.objects.create(
+            name="Times Square Visitor Center", category="landmark",
+            location=Point(-74.0060, 40.7580, srid=4326)
+        )
+        url = reverse('pointofinterest-detail', args=[poi.pk])
+        
+        response = self.client.patch(url, {'name': 'Times Square'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        poi.refresh_from_db()
+        self.assertEqual(poi.name, "Times Square Visitor Center")
+    
+    def test_bulk_upsert(self):
+        """Test bulk endpoint creates, updates and reports per-item errors."""
+        url = reverse('pointofinterest-bulk')
+        items = [
+            {'name': 'Times Square', 'category': 'landmark',
+             'coordinates': [-74.0060, 40.7580], 'rating': 3.9},
+            {'name': 'New Cafe', 'category': 'restaurant',
+             'coordinates': [-73.99, 40.75]},
+            {'name': 'Nowhere', 'category': 'park', 'coordinates': [-200, 40]},
+            {'name': 'New Cafe', 'category': 'restaurant',
+             'coordinates': [-73.99, 40.75], 'rating': 4.1},
+        ]
+        
+        response = self.client.post(url, items, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['updated', 'duplicate', 'error', 'created'])
+        self.assertEqual(PointOfInterest.objects.count(), 6)
+        self.assertEqual(
+            PointOfInterest.objects.get(name='Times Square').rating, Decimal('3.90')
+        )
+        self.assertEqual(
+            PointOfInterest.objects.get(name='New Cafe').rating, Decimal('4.10')
+        )
+    
+    def test_bulk_upsert_ndjson(self):
+        """Test bulk endpoint accepts an NDJSON body."""
+        url = reverse('pointofinterest-bulk')
+        body = '\n'.join(json.dumps({
+            'name': f'Kiosk {i}', 'category': 'shopping',
+            'coordinates': [-73.98 + i / 1000, 40.75]
+        }) for i in range(3))
+        
+        response = self.client.post(url, body, content_type='application/x-ndjson')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 3)
+    
+    def test_bulk_upsert_idempotency_key(self):
+        """Test retries with the same Idempotency-Key replay the first response."""
+        url = reverse('pointofinterest-bulk')
+        items = [{'name': 'Food Truck', 'category': 'restaurant',
+                  'coordinates': [-73.97, 40.76]}]
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'retry-123'}
+        
+        first = self.client.post(url, items, format='json', **headers)
+        second = self.client.post(url, items, format='json', **headers)
+        
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(PointOfInterest.objects.filter(name='Food Truck').count(), 1)
+        
+        items[0]['category'] = 'hotel'
+        conflict = self.client.post(url, items, format='json', **headers)
+        self.assertEqual(conflict.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+    
     def test_categories_endpoint(self):
         """Test categories endpoint."""
         url = reverse('pointofinterest-categories')
@@ -236,6 +907,27 @@ class PointOfInterestAPITest(APITestCase):
         self.assertIn('categories', response.data)
         
         self.assertEqual(response.data['total_pois'], 5)
+        self.assertIsNotNone(response.data['as_of'])
+        self.assertEqual(response.data['categories'][0], {'category': 'landmark', 'count': 3})
+        self.assertEqual(response.data['average_rating'], Decimal('4.52'))
+    
+    def test_stats_maintained_on_write(self):
+        """Test the stats summary follows updates, deletes and queryset updates."""
+        url = reverse('pointofinterest-stats')
+        self.pois[0].category = 'museum'
+        self.pois[0].save()
+        self.pois[1].delete()
+        PointOfInterest.objects.filter(category='museum').update(rating=None)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        
+        self.assertEqual(response.data['total_pois'], 4)
+        self.assertEqual(response.data['categories'], [
+            {'category': 'landmark', 'count': 2},
+            {'category': 'museum', 'count': 2},
+        ])
+        self.assertEqual(response.data['average_rating'], Decimal('4.45'))
     
     def test_distance_calculation(self):
         """Test that distance is calculated correctly in responses."""
@@ -263,6 +955,8 @@ class PointOfInterestPerformanceTest(APITestCase):
     
     def setUp(self):
         """Set up many POIs for performance testing."""
+        cache.clear()
+        
         # Create 100 random POIs for performance testing
         import random
         
@@ -313,4 +1007,78 @@ class PointOfInterestPerformanceTest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Should find many POIs within 40km
-        self.assertGreater(len(response.data['results']), 0) 
\ No newline at end of file
+        self.assertGreater(len(response.data['results']), 0) 
+
+
+class AsyncEndpointTest(TransactionTestCase):
+    """Test async endpoints; committed rows are visible to the async pool."""
+    
+    def setUp(self):
+        """Set up committed POIs around Times Square."""
+        cache.clear()
+        for name, lng, lat in [
+            ("Times Square", -73.9855, 40.7580),
+            ("Bryant Park", -73.9832, 40.7536),
+            ("Empire State Building", -73.9857, 40.7484),
+            ("Central Park", -73.9654, 40.7829),
+        ]:
+            PointOfInterest.objects.create(
+                name=name, category="landmark",
+                location=Point(lng, lat, srid=4326), rating=4.5
+            )
+    
+    async def test_async_radius_matches_sync(self):
+        """Test the async radius endpoint returns the sync endpoint's results."""
+        params = {'lat': 40.7580, 'lng': -73.9855, 'radius_km': 2.0,
+                  'engine': 'geography', 'page_size': 2}
+        try:
+            response = await self.async_client.get(reverse('poi-async-radius'), params)
+            expected = await sync_to_async(self.client.get)(
+                reverse('pointofinterest-radius-search'), params
+            )
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['results'], expected.json()['results'])
+            self.assertIsNotNone(response.json()['next'])
+        finally:
+            await close_pools()
+    
+    async def test_async_nearest(self):
+        """Test the async nearest endpoint orders by distance."""
+        params = {'lat': 40.7580, 'lng': -73.9855, 'k': 2}
+        try:
+            response = await self.async_client.get(reverse('poi-async-nearest'), params)
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names = [poi['name'] for poi in response.json()['results']]
+            self.assertEqual(names, ['Times Square', 'Bryant Park'])
+        finally:
+            await close_pools()
+    
+    async def test_export_streams_asynchronously(self):
+        """Test export under ASGI streams an async iterator instead of buffering."""
+        response = await self.async_client.get(
+            reverse('pointofinterest-export'), {'output': 'ndjson'}
+        )
+        
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 4)
+    
+    async def test_async_radius_invalid_params(self):
+        """Test validation errors are returned as 400."""
+        response = await self.async_client.get(
+            reverse('poi-async-radius'), {'lat': 200, 'lng': 0}
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    async def test_async_radius_invalid_cursor(self):
+        """Test a malformed cursor is a 404, as on the sync endpoint."""
+        response = await self.async_client.get(
+            reverse('poi-async-radius'),
+            {'lat': 40.7580, 'lng': -73.9855, 'radius_km': 1, 'cursor': 'not-a-cursor'}
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('detail', response.json())
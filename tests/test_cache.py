@@ -0,0 +1,91 @@
+"""
+Test suite for geohash-keyed response cache invalidation.
+"""
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from pois.cache import (
+    _cell_generation_key, cell_index, geohash, get_generations, invalidate_point,
+    neighbour_cells, normalize_radius_query, radius_precision
+)
+from pois.spatial import haversine_m, spheroid_distance_m
+
+
+class GeohashCellTest(SimpleTestCase):
+    """Test geohash cell arithmetic."""
+    
+    def test_geohash_matches_reference(self):
+        """Test cells encode to standard geohashes."""
+        self.assertEqual(geohash(*cell_index(-5.6, 42.6, 5), 5), 'ezs42')
+        self.assertEqual(geohash(*cell_index(-73.9857, 40.7484, 7), 7), 'dr5ru6j')
+    
+    def test_neighbours_wrap_antimeridian(self):
+        """Test neighbours of a cell on the antimeridian include the far side."""
+        cells = neighbour_cells(179.99, 0.0, 1)
+        self.assertIn(geohash(*cell_index(-179.99, 0.0, 1), 1), cells)
+        self.assertEqual(len(cells), 9)
+    
+    @override_settings(POI_CACHE_MAX_PRECISION=6)
+    def test_radius_precision_cells_cover_circle(self):
+        """Test larger radii use coarser cells and huge ones the world cell."""
+        self.assertEqual(radius_precision(-73.98, 40.75, 0.5), 6)
+        self.assertLess(radius_precision(-73.98, 40.75, 50), 6)
+        self.assertEqual(radius_precision(179.9, 0.0, 50), 0)
+
+
+@override_settings(POI_RADIUS_SNAP_DEGREES=0.01, POI_RADIUS_BUCKETS_KM=[1, 2, 5, 10])
+class NormalizeRadiusQueryTest(SimpleTestCase):
+    """Test radius queries snap to a superset containing the exact circle."""
+    
+    def test_superset_contains_exact_circle(self):
+        """Test the snapped circle covers the requested one."""
+        lng, lat, radius_km = -74.006031, 40.758012, 1.5
+        
+        snapped_lng, snapped_lat, bucket_km = normalize_radius_query(lng, lat, radius_km)
+        
+        self.assertEqual((snapped_lng, snapped_lat), (-74.01, 40.76))
+        self.assertEqual(bucket_km, 2)
+        offset_km = haversine_m(lng, lat, snapped_lng, snapped_lat) / 1000
+        self.assertGreaterEqual(bucket_km, radius_km + offset_km)
+    
+    def test_no_bucket_large_enough(self):
+        """Test radii beyond the largest bucket are not normalised."""
+        self.assertIsNone(normalize_radius_query(-74.0, 40.75, 9.99))
+    
+    @override_settings(POI_RADIUS_SNAP_DEGREES=0)
+    def test_disabled(self):
+        """Test a zero grid disables normalisation."""
+        self.assertIsNone(normalize_radius_query(-74.0, 40.75, 1))
+
+
+class SpheroidDistanceTest(SimpleTestCase):
+    """Test the in-process distance used to filter radius supersets."""
+    
+    def test_matches_reference_geodesics(self):
+        """Test WGS84 distances match published values (and PostGIS geography)."""
+        # Flinders Peak to Buninyong, Vincenty (1975)
+        self.assertAlmostEqual(
+            spheroid_distance_m(144.424868, -37.951033, 143.926496, -37.652821),
+            54972.271, delta=0.5
+        )
+        self.assertAlmostEqual(spheroid_distance_m(0, 0, 1, 0), 111319.491, places=2)
+        self.assertEqual(spheroid_distance_m(-74.006, 40.758, -74.006, 40.758), 0.0)
+
+
+@override_settings(POI_CACHE_MAX_PRECISION=6)
+class InvalidatePointTest(SimpleTestCase):
+    """Test writes bump only the cells around them."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_invalidate_point_bumps_nearby_cells_only(self):
+        """Test a write bumps its own cell's generation, not distant ones."""
+        here = _cell_generation_key(geohash(*cell_index(-73.98, 40.75, 6), 6))
+        there = _cell_generation_key(geohash(*cell_index(-0.07, 51.5, 6), 6))
+        
+        invalidate_point(-73.98, 40.75)
+        first, untouched = get_generations(here, there)
+        invalidate_point(-73.98, 40.75)
+        
+        self.assertNotIn(first, (0, get_generations(here)[0]))
+        self.assertEqual(untouched, 0)
@@ -0,0 +1,125 @@
+"""
+Test suite for read-replica routing.
+"""
+import threading
+import time
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from pois.cache import get_generations
+from pois.db_router import (
+    PIN_COOKIE, ReplicaPool, ReplicaRouter, ReplicaRoutingMiddleware, read_alias
+)
+from pois.invalidation import ReplicaLagEvictions
+from pois.models import PointOfInterest
+
+
+@override_settings(
+    POI_REPLICA_MAX_LAG_SECONDS=5, POI_REPLICA_CHECK_INTERVAL=2, POI_READ_YOUR_WRITES_SECONDS=5
+)
+class ReplicaRoutingTest(SimpleTestCase):
+    """Test replica selection, the lag guard and read-your-writes pinning."""
+    
+    def setUp(self):
+        """Two healthy replicas, the second one faster."""
+        self.pool = ReplicaPool(aliases=['replica1', 'replica2'], checks=False)
+        self.pool.record('replica1', lag=0.0, latency=0.004)
+        self.pool.record('replica2', lag=0.5, latency=0.001)
+        
+        self.routed_to = []
+        
+        def get_response(request):
+            self.routed_to.append(read_alias())
+            if request.path == '/api/pois/pois/' and request.method == 'POST':
+                ReplicaRouter().db_for_write(PointOfInterest)
+                return HttpResponse(status=201)
+            return HttpResponse()
+        
+        self.middleware = ReplicaRoutingMiddleware(get_response)
+        self.middleware.pool = self.pool
+        self.factory = RequestFactory()
+    
+    def test_round_robin(self):
+        """Test round-robin alternates between eligible replicas."""
+        chosen = {self.pool.choose() for _ in range(4)}
+        self.assertEqual(chosen, {'replica1', 'replica2'})
+    
+    @override_settings(POI_REPLICA_SELECTION='least_latency')
+    def test_least_latency(self):
+        """Test least-latency selection prefers the fastest replica."""
+        self.assertEqual({self.pool.choose() for _ in range(4)}, {'replica2'})
+    
+    @override_settings(POI_REPLICA_MAX_LAG_SECONDS=0.1)
+    def test_lagging_replicas_fall_back_to_primary(self):
+        """Test replicas beyond the lag limit, or never checked, are skipped."""
+        self.assertEqual(self.pool.eligible(), ['replica1'])
+        
+        self.pool.record('replica1', lag=float('inf'), latency=0.004)
+        self.assertIsNone(self.pool.choose())
+        self.assertIsNone(ReplicaPool(aliases=['replica1'], checks=False).choose())
+    
+    def test_reads_pinned_after_write(self):
+        """Test a client reads from the primary for a while after writing."""
+        self.middleware(self.factory.get('/api/pois/pois/'))
+        response = self.middleware(self.factory.post('/api/pois/pois/'))
+        pinned_until = float(response.cookies[PIN_COOKIE].value)
+        self.assertAlmostEqual(pinned_until, time.time() + 5, delta=1)
+        
+        request = self.factory.get('/api/pois/pois/')
+        request.COOKIES[PIN_COOKIE] = str(pinned_until)
+        self.middleware(request)
+        
+        expired = self.factory.get('/api/pois/pois/')
+        expired.COOKIES[PIN_COOKIE] = str(time.time() - 1)
+        self.middleware(expired)
+        
+        self.assertIn(self.routed_to[0], ('replica1', 'replica2'))
+        self.assertEqual(self.routed_to[1:3], ['default', 'default'])
+        self.assertIn(self.routed_to[3], ('replica1', 'replica2'))
+    
+    def test_read_only_posts_do_not_pin(self):
+        """Test a POST that writes nothing, like batch radius search, leaves reads alone."""
+        response = self.middleware(self.factory.post('/api/pois/radius-batch/'))
+        
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.routed_to, ['default'])
+    
+    def test_router_outside_requests(self):
+        """Test reads outside a routed request, and all writes, use the primary."""
+        router = ReplicaRouter()
+        
+        self.assertIsNone(router.db_for_read(PointOfInterest))
+        self.assertEqual(router.db_for_write(PointOfInterest), 'default')
+        self.assertFalse(router.allow_migrate('replica1', 'pois'))
+
+
+@override_settings(
+    DATABASE_REPLICA_ALIASES=['replica1'], POI_REPLICA_MAX_LAG_SECONDS=60,
+    POI_REPLICA_CHECK_INTERVAL=2
+)
+class ReplicaLagEvictionsTest(SimpleTestCase):
+    """Test repeated invalidation after the replica lag window."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_one_thread_for_all_writes(self):
+        """Test many writes share one thread and pending keys are bumped on flush."""
+        evictions = ReplicaLagEvictions()
+        threads = threading.active_count()
+        for index in range(50):
+            evictions.schedule([f'poi_cell_gen_test{index % 2}'])
+        
+        self.assertLessEqual(threading.active_count(), threads + 1)
+        self.assertEqual(get_generations('poi_cell_gen_test0', 'poi_cell_gen_test1'), [0, 0])
+        
+        evictions.flush()
+        self.assertNotIn(0, get_generations('poi_cell_gen_test0', 'poi_cell_gen_test1'))
+    
+    @override_settings(DATABASE_REPLICA_ALIASES=[])
+    def test_no_replicas(self):
+        """Test nothing is scheduled without replicas."""
+        evictions = ReplicaLagEvictions()
+        evictions.schedule(['poi_cell_gen_test0'])
+        
+        self.assertIsNone(evictions._pid)
@@ -0,0 +1,65 @@
+"""
+Test suite for the health and readiness probes.
+"""
+from django.test import TestCase, override_settings
+from pois import health_views
+
+
+class HealthCheckTest(TestCase):
+    """Test health probes answer from memory."""
+    
+    def setUp(self):
+        """Forget database probes cached by earlier tests."""
+        health_views._database_probe = (None, None, None)
+    
+    def test_health_check_reports_system_sample(self):
+        """Test the health check returns sampled metrics without waiting on them."""
+        response = self.client.get('/health/')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], 'healthy')
+        self.assertTrue(data['postgis_version'])
+        self.assertEqual(
+            set(data['system']),
+            {'memory_percent', 'disk_percent', 'cpu_percent', 'sample_age_seconds'}
+        )
+    
+    @override_settings(POI_HEALTH_DB_TTL=60)
+    def test_database_probe_is_one_cached_query(self):
+        """Test repeated probes within the TTL share one database query."""
+        with self.assertNumQueries(1):
+            self.client.get('/health/')
+            self.client.get('/health/')
+    
+    @override_settings(POI_HEALTH_DB_TTL=0)
+    def test_database_probe_expires(self):
+        """Test an expired probe result is checked again."""
+        with self.assertNumQueries(2):
+            self.client.get('/health/')
+            self.client.get('/health/')
+    
+    @override_settings(POI_HEALTH_DB_TTL=60)
+    def test_ready_check_uses_estimated_count(self):
+        """Test readiness reads the row estimate instead of counting."""
+        self.client.get('/health/')
+        
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get('/health/ready/')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['models'], 'accessible')
+        self.assertTrue(data['poi_count_estimated'])
+        self.assertIn('reltuples', queries.captured_queries[0]['sql'])
+    
+    @override_settings(POI_HEALTH_DB_TTL=60, POI_READY_COUNT='none')
+    def test_ready_check_without_count(self):
+        """Test the count can be left out of readiness entirely."""
+        self.client.get('/health/')
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/health/ready/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('poi_count', response.json())
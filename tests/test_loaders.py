@@ -0,0 +1,85 @@
+"""
+Test suite for COPY-based bulk loading commands.
+"""
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from pois.bulk import BulkLoader
+from pois.models import PointOfInterest
+
+
+class BulkLoaderTest(TestCase):
+    """Test staging, deduplication and merge of bulk loads."""
+    
+    def test_load_deduplicates_on_name_and_location(self):
+        """Test duplicate rows collapse to one POI and reloads insert nothing."""
+        rows = [
+            {'name': 'Cafe', 'category': 'restaurant', 'rating': 4.0,
+             'lng': -74.0, 'lat': 40.7},
+            {'name': 'Cafe', 'category': 'restaurant', 'rating': 4.5,
+             'lng': -74.0, 'lat': 40.7},
+            {'name': 'Cafe', 'category': 'restaurant', 'lng': -74.1, 'lat': 40.7},
+        ]
+        
+        self.assertEqual(BulkLoader(batch_size=2).load(rows), 2)
+        self.assertEqual(BulkLoader().load(rows), 0)
+        self.assertEqual(PointOfInterest.objects.count(), 2)
+        
+        # The last staged duplicate wins
+        cafe = PointOfInterest.objects.get(name='Cafe', rating__isnull=False)
+        self.assertEqual(float(cafe.rating), 4.5)
+        self.assertEqual(cafe.description, '')
+    
+    def test_load_update_existing(self):
+        """Test update_existing overwrites attributes of existing POIs."""
+        row = {'name': 'Museum', 'category': 'museum', 'rating': 3.0,
+               'lng': -73.9, 'lat': 40.8}
+        BulkLoader().load([row])
+        BulkLoader(update_existing=True).load([{**row, 'rating': 4.9}])
+        
+        self.assertEqual(float(PointOfInterest.objects.get(name='Museum').rating), 4.9)
+    
+    def test_load_with_index_rebuild(self):
+        """Test secondary indexes are recreated after a rebuild load."""
+        rows = [{'name': f'POI {i}', 'category': 'park', 'lng': -74 + i / 100, 'lat': 40.7}
+                for i in range(25)]
+        
+        self.assertEqual(BulkLoader(batch_size=10, rebuild_indexes=True).load(rows), 25)
+        
+        from django.db import connection
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, 'pois')
+        self.assertIn('pois_created_id_idx', indexes)
+
+
+class LoadSampleDataCommandTest(TestCase):
+    """Test the load_sample_data management command."""
+    
+    def test_generate_random_pois(self):
+        """Test landmarks are not duplicated across runs."""
+        call_command('load_sample_data', count=15, stdout=StringIO())
+        call_command('load_sample_data', count=15, stdout=StringIO())
+        
+        self.assertEqual(PointOfInterest.objects.filter(name='Times Square').count(), 1)
+        self.assertEqual(PointOfInterest.objects.count(), 20)
+    
+    def test_load_from_csv_skips_bad_rows(self):
+        """Test CSV rows stream through COPY and malformed rows are skipped."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('name,category,longitude,latitude,rating\n')
+            file.write('Pier,landmark,-74.01,40.70,4.1\n')
+            file.write('Pier,landmark,-74.01,40.70,4.1\n')
+            file.write('Broken,landmark,not-a-number,40.70,\n')
+            file.write('Overrated,landmark,-74.02,40.70,12\n')
+            file.write('Unknown,bakery,-74.03,40.70,\n')
+            file.write('Offworld,park,-74.04,95.0,\n')
+            file.write(f'{"x" * 256},park,-74.05,40.70,\n')
+        self.addCleanup(os.unlink, file.name)
+        
+        out = StringIO()
+        call_command('load_sample_data', csv_file=file.name, stdout=out)
+        
+        self.assertEqual(PointOfInterest.objects.count(), 1)
+        self.assertEqual(out.getvalue().count('Error loading row'), 5)
@@ -0,0 +1,116 @@
+"""
+Test suite for the in-process spatial index.
+"""
+import os
+from decimal import Decimal
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from pois.memory_index import RELOAD, MemoryIndex, parse_change
+from pois.models import PointOfInterest
+from pois.spatial import radius_queryset
+
+
+class MemoryIndexTest(TestCase):
+    """Test region snapshots answer like PostGIS and fall back outside."""
+    
+    def setUp(self):
+        """Set up NYC POIs and a loaded index covering Manhattan."""
+        self.pois = [
+            PointOfInterest.objects.create(
+                name=name, category=category, location=Point(lng, lat, srid=4326), rating=rating
+            )
+            for name, category, lng, lat, rating in (
+                ("Times Square", "landmark", -74.0060, 40.7580, 4.2),
+                ("Central Park", "park", -73.9654, 40.7829, 4.8),
+                ("Empire State Building", "landmark", -73.9857, 40.7484, 4.4),
+                ("Brooklyn Bridge", "landmark", -73.9969, 40.7061, 4.5),
+                ("Metropolitan Museum", "museum", -73.9632, 40.7794, 4.7),
+            )
+        ]
+        self.index = MemoryIndex(regions=[('manhattan', (-74.1, 40.6, -73.9, 40.85))])
+        self.index.load()
+    
+    def test_radius_matches_postgis(self):
+        """Test radius rows are the PostGIS matches in (distance, id) order."""
+        for radius_km, category, min_rating in ((3, None, None), (5, 'landmark', 4.3)):
+            queryset = radius_queryset(PointOfInterest.objects.all(), -74.0060, 40.7580, radius_km)
+            if category:
+                queryset = queryset.filter(category=category, rating__gte=min_rating)
+            expected = list(queryset.order_by('distance_m', 'id').values_list('id', flat=True))
+            
+            rows = self.index.radius(-74.0060, 40.7580, radius_km * 1000, category, min_rating)
+            
+            self.assertEqual([row['id'] for row in rows], expected)
+        self.assertEqual(rows[0]['rating'], Decimal('4.40'))
+    
+    def test_nearest_widens_until_k(self):
+        """Test nearest returns the k closest rows."""
+        rows = self.index.nearest(-74.0060, 40.7580, 3)
+        
+        self.assertEqual(
+            [row['name'] for row in rows],
+            ['Times Square', 'Empire State Building', 'Metropolitan Museum']
+        )
+    
+    def test_outside_region_falls_back(self):
+        """Test queries leaving the region, or before a load, return None."""
+        self.assertIsNone(self.index.radius(-73.9654, 40.7829, 10000))
+        self.assertIsNone(self.index.nearest(-74.0060, 40.7580, 10))
+        self.assertIsNone(MemoryIndex(regions=self.index.region_bboxes).radius(-74.0, 40.75, 100))
+    
+    def test_apply_changes(self):
+        """Test re-read rows replace, move out of and leave the snapshot."""
+        times_square, central_park = self.pois[:2]
+        changed_ids = [times_square.id, central_park.id]
+        times_square.location = Point(-73.5, 40.7, srid=4326)
+        times_square.save()
+        central_park.delete()
+        rockefeller = PointOfInterest.objects.create(
+            name="Rockefeller Center", category="landmark",
+            location=Point(-73.9787, 40.7587, srid=4326), rating=4.6
+        )
+        
+        self.index.apply(changed_ids + [rockefeller.id])
+        
+        rows = self.index.radius(-73.98, 40.76, 4000)
+        names = {row['name'] for row in rows}
+        self.assertIn('Rockefeller Center', names)
+        self.assertNotIn('Times Square', names)
+        self.assertNotIn('Central Park', names)
+        self.assertEqual(len(self.index.regions['manhattan']), 4)
+    
+    def test_parse_change(self):
+        """Test payloads become id lists, and truncates or garbage a full reload."""
+        self.assertEqual(parse_change('{"ids": [3, 1]}'), [3, 1])
+        self.assertIs(parse_change('{"truncate": true}'), RELOAD)
+        for payload in ('not json', '[1, 2]', '{"ids": null}', '{"ids": ["x"]}', '{}'):
+            with self.assertLogs('pois.memory_index', 'WARNING'):
+                self.assertIs(parse_change(payload), RELOAD)
+    
+    def test_ready_requires_listener(self):
+        """Test a full read only makes the index ready under one LISTEN session."""
+        index = MemoryIndex(regions=self.index.region_bboxes)
+        index._pid = os.getpid()  # as if start() had launched the threads
+        
+        index.load()
+        self.assertFalse(index.ready)
+        
+        index._set_listening(True)
+        index.load()
+        self.assertTrue(index.ready)
+        self.assertIsNotNone(index.radius(-74.0060, 40.7580, 1000))
+        
+        index._set_listening(False)
+        self.assertIsNone(index.radius(-74.0060, 40.7580, 1000))
+        
+        # The connection drops and comes back while the regions are being read
+        fetch = index.fetch
+        
+        def fetch_across_reconnect(**kwargs):
+            index._set_listening(False)
+            index._set_listening(True)
+            return fetch(**kwargs)
+        
+        index.fetch = fetch_across_reconnect
+        index.load()
+        self.assertFalse(index.ready)
@@ -0,0 +1,117 @@
+"""
+Test suite for snapshot export and database-free serving.
+"""
+import os
+import tempfile
+from io import StringIO
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from pois.models import PointOfInterest
+from pois.snapshot import Snapshot, SnapshotError
+
+
+class SnapshotServingTest(APITestCase):
+    """Test POI endpoints answered from an exported snapshot file."""
+    
+    def setUp(self):
+        """Export NYC POIs to a temporary snapshot and serve from it."""
+        for name, category, lng, lat, rating in (
+            ("Times Square", "landmark", -74.0060, 40.7580, 4.2),
+            ("Central Park", "park", -73.9654, 40.7829, 4.8),
+            ("Empire State Building", "landmark", -73.9857, 40.7484, 4.4),
+            ("Brooklyn Bridge", "landmark", -73.9969, 40.7061, 4.5),
+            ("Metropolitan Museum", "museum", -73.9632, 40.7794, None),
+        ):
+            PointOfInterest.objects.create(
+                name=name, category=category, location=Point(lng, lat, srid=4326),
+                rating=rating, description=f"About {name}"
+            )
+        
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'pois.snapshot')
+        call_command('export_snapshot', output=self.path, directory_bits=4, stdout=StringIO())
+        
+        serving = override_settings(
+            POI_SNAPSHOT_SERVING=True, POI_SNAPSHOT_PATH=self.path, POI_SNAPSHOT_CHECK_INTERVAL=0
+        )
+        serving.enable()
+        self.addCleanup(serving.disable)
+    
+    def test_radius_without_queries(self):
+        """Test radius search reads the snapshot, not the database."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 3}
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(
+            [poi['name'] for poi in results], ['Times Square', 'Empire State Building']
+        )
+        self.assertEqual(results[0]['rating'], '4.20')
+        self.assertEqual(results[0]['description'], 'About Times Square')
+        self.assertEqual(results[0]['coordinates'], [-74.0060, 40.7580])
+    
+    def test_nearest_and_bbox(self):
+        """Test nearest and viewport queries match the database answers."""
+        with self.assertNumQueries(0):
+            nearest = self.client.get(
+                reverse('pointofinterest-nearest'),
+                {'lat': 40.7580, 'lng': -74.0060, 'k': 2, 'profile': 'slim'}
+            )
+            bbox = self.client.get(
+                reverse('pointofinterest-bbox'),
+                {'bbox': '-74.01,40.70,-73.96,40.79', 'zoom': 15}
+            )
+        
+        self.assertEqual(
+            [poi['name'] for poi in nearest.data['results']],
+            ['Times Square', 'Empire State Building']
+        )
+        # Unrated first, as ``-rating`` orders in Postgres
+        self.assertEqual(
+            [poi['name'] for poi in bbox.data['results']],
+            ['Metropolitan Museum', 'Central Park', 'Brooklyn Bridge',
+             'Empire State Building', 'Times Square']
+        )
+    
+    def test_other_endpoints_unavailable(self):
+        """Test writes and non-snapshot reads are refused."""
+        response = self.client.post(
+            reverse('pointofinterest-list'),
+            {'name': 'New', 'category': 'park', 'coordinates': [-74.0, 40.7]},
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(PointOfInterest.objects.count(), 5)
+    
+    def test_replaced_snapshot_is_picked_up(self):
+        """Test a re-export swaps the served file atomically."""
+        url = reverse('pointofinterest-radius-search')
+        params = {'lat': 40.7580, 'lng': -74.0060, 'radius_km': 1}
+        self.assertEqual(self.client.get(url, params).data['count'], 1)
+        
+        PointOfInterest.objects.create(
+            name="Hotel Edison", category="hotel", location=Point(-74.0000, 40.7560, srid=4326)
+        )
+        call_command('export_snapshot', output=self.path, stdout=StringIO())
+        
+        self.assertEqual(self.client.get(url, params).data['count'], 2)
+        self.assertEqual(len(Snapshot(self.path)), 6)
+    
+    def test_rejects_unknown_files(self):
+        """Test files that are not snapshots are refused."""
+        path = os.path.join(os.path.dirname(self.path), 'other.snapshot')
+        with open(path, 'wb') as snapshot:
+            snapshot.write(b'not a snapshot')
+        
+        with self.assertRaises(SnapshotError):
+            Snapshot(path)